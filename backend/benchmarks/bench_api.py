@@ -0,0 +1,292 @@
+"""
+Latency / throughput benchmark for the scoring API.
+
+Drives the FastAPI app in-process through httpx's ASGI transport (or a
+running server with --url) with rows from the test datasets, and reports
+p50/p95/p99 latency and throughput per endpoint, transaction_type and
+batch size:
+  score      POST /score/batch with `batch` records per request
+  run-test   POST /test/run-test with num_samples=`batch` (scores, logs and
+             queues every row like the dashboard scanner)
+
+In-process runs use a scratch SQLite database, the chain worker is off and
+receipt lookups are stubbed, so no request reaches an RPC provider; the
+numbers cover the API, ai_service/transforms and the database only.
+
+Results go to JSON (--json) together with the git commit; --compare takes
+an earlier results file and prints the change per scenario.
+
+--shadow scores every request with challenger versions as well
+(SHADOW_MODELS syntax, e.g. ethereum=v1.0). Challengers run on a thread
+pool in the API process, so comparing a --shadow run against a plain one
+shows what they cost production p95/p99; the challengers' own per-row
+time and the dropped/error counts from /health/shadow are reported too.
+Against --url the server's SHADOW_MODELS applies instead.
+
+Usage (from the repo root):
+    python backend/benchmarks/bench_api.py --types ethereum bank --batch-sizes 1 10 100
+    python backend/benchmarks/bench_api.py --json bench/$(git rev-parse --short HEAD).json
+    python backend/benchmarks/bench_api.py --compare bench/previous.json
+    python backend/benchmarks/bench_api.py --shadow ethereum=v1.0 --types ethereum --compare bench/previous.json
+    python backend/benchmarks/bench_api.py --url http://127.0.0.1:8000 --endpoints score
+
+Rows come from data/test_data/*.csv (see utils/data_generator.py);
+--data-dir points at another generated set.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+TRANSACTION_TYPES = ["vehicle", "bank", "ecommerce", "ethereum"]
+ENDPOINTS = ["score", "run-test"]
+
+
+def prepare_environment(shadow=None):
+    """Settings for an in-process app; must run before main is imported."""
+    scratch = tempfile.mkdtemp(prefix="bench-api-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(scratch, 'fraud.db')}")
+    os.environ["CHAIN_WORKER_ENABLED"] = "false"
+    os.environ["SHADOW_MODELS"] = shadow or ""
+    os.environ["SHADOW_DIR"] = os.path.join(scratch, "shadow")
+
+
+def stub_chain():
+    """Receipt lookups resolve to 'not mined' without an RPC call."""
+    from services import receipt_cache
+
+    async def no_receipt(tx_hash):
+        return None
+
+    async def no_block():
+        return 0
+
+    receipt_cache._receipt_cache = receipt_cache.ReceiptCache(fetch=no_receipt, latest_block=no_block)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def percentile_summary(latencies):
+    import numpy as np
+    values = np.asarray(latencies) * 1000
+    if len(values) == 0:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+
+def build_payloads(store, endpoint, transaction_type, batch_size, count):
+    """Request bodies, built before timing so sampling is not measured."""
+    payloads = []
+    for i in range(count):
+        fraud_label = "fraud" if i % 2 == 0 else "non-fraud"
+        if endpoint == "run-test":
+            payloads.append(("/test/run-test", {
+                "transaction_type": transaction_type, "fraud_label": fraud_label, "num_samples": batch_size
+            }))
+            continue
+        label_column = store.get(transaction_type).label_column
+        records = []
+        while len(records) < batch_size:
+            rows = store.sample(transaction_type, fraud_label, batch_size - len(records))
+            if not rows:
+                # Only one class in the file; use the other one
+                fraud_label = "non-fraud" if fraud_label == "fraud" else "fraud"
+                continue
+            records.extend({k: clean(v) for k, v in row.items() if k != label_column} for row in rows)
+        payloads.append(("/score/batch", {"transaction_type": transaction_type, "records": records}))
+    return payloads
+
+
+def clean(value):
+    # NaN is not valid JSON; the API treats a null feature as missing too
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+async def run_scenario(client, store, endpoint, transaction_type, batch_size, requests, concurrency, warmup):
+    payloads = build_payloads(store, endpoint, transaction_type, batch_size, requests + warmup)
+    for path, body in payloads[:warmup]:
+        await client.post(path, json=body)
+
+    latencies = []
+    errors = 0
+    pending = iter(payloads[warmup:])
+
+    async def worker():
+        nonlocal errors
+        for path, body in pending:
+            started = time.perf_counter()
+            response = await client.post(path, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "endpoint": endpoint,
+        "transaction_type": transaction_type,
+        "batch_size": batch_size,
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 4),
+        "requests_per_sec": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "records_per_sec": round(len(latencies) * batch_size / elapsed, 2) if elapsed else None
+    }
+    result.update(percentile_summary(latencies))
+    return result
+
+
+async def shadow_report(client, timeout):
+    """/health/shadow once queued challenger jobs have finished (or timeout passed)."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        report = (await client.get("/health/shadow")).json()
+        if not report.get("enabled") or report["pending"] == 0 or time.perf_counter() > deadline:
+            break
+        await asyncio.sleep(0.1)
+    if report.get("enabled"):
+        print(f"\nshadow: submitted {report['submitted']}  scored rows {report['scored_rows']}  "
+              f"dropped {report['dropped']}  errors {report['errors']}  pending {report['pending']}")
+        for c in report["comparisons"]:
+            if c["rows"]:
+                print(f"  {c['transaction_type']:<10} {c['production_version']} vs {c['challenger_version']}  "
+                      f"challenger p50 {c['shadow_ms_p50']:.3f} ms/row  p95 {c['shadow_ms_p95']:.3f} ms/row")
+    return report
+
+
+def scenario_key(result):
+    return (result["endpoint"], result["transaction_type"], result["batch_size"])
+
+
+def compare(results, baseline_path):
+    """Print p95 latency and throughput change against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = {scenario_key(r): r for r in json.load(f)["results"]}
+
+    def change(new, old):
+        return f"{(new - old) / old * 100:+.1f}%" if new is not None and old else "n/a"
+
+    print(f"\nCompared with {baseline_path}")
+    for result in results:
+        old = baseline.get(scenario_key(result))
+        if old is None:
+            continue
+        print(f"  {result['endpoint']:<9} {result['transaction_type']:<10} batch {result['batch_size']:>5}  "
+              f"p95 {change(result['p95_ms'], old['p95_ms']):>8}  "
+              f"throughput {change(result['records_per_sec'], old['records_per_sec']):>8}")
+
+
+async def run(args):
+    import httpx
+    from services.dataset_store import DatasetStore, TEST_DATA_FILES
+
+    paths = {t: os.path.join(args.data_dir, os.path.basename(p)) for t, p in TEST_DATA_FILES.items()}
+    store = DatasetStore(paths, seed=args.seed)
+
+    async def run_all(client):
+        results = []
+        for endpoint in args.endpoints:
+            for transaction_type in args.types:
+                for batch_size in args.batch_sizes:
+                    result = await run_scenario(client, store, endpoint, transaction_type, batch_size,
+                                                args.requests, args.concurrency, args.warmup)
+                    results.append(result)
+                    print(f"{endpoint:<9} {transaction_type:<10} batch {batch_size:>5}  "
+                          f"p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+                          f"p99 {result['p99_ms']:>9.2f} ms  {result['records_per_sec']:>10.1f} rec/s"
+                          + (f"  errors {result['errors']}" if result["errors"] else ""))
+        return results, await shadow_report(client, args.timeout)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+            return await run_all(client)
+
+    prepare_environment(args.shadow)
+    import main
+    import routers.test as test_router
+    stub_chain()
+    # /test/run-test samples from the same dataset files
+    test_router.dataset_store = DatasetStore(paths, seed=args.seed)
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            return await run_all(client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='benchmark a running server instead of the in-process app')
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument('--types', nargs='+', choices=TRANSACTION_TYPES, default=TRANSACTION_TYPES)
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 10, 100])
+    parser.add_argument('--requests', type=int, default=50, help='timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--data-dir', default='data/test_data')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', help='earlier --json output to compare against')
+    parser.add_argument('--shadow', help='challenger versions scored next to production, e.g. ethereum=v1.0')
+    args = parser.parse_args()
+
+    results, shadow = asyncio.run(run(args))
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.json:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "target": args.url or "in-process",
+                "requests": args.requests,
+                "warmup": args.warmup,
+                "concurrency": args.concurrency,
+                "shadow": args.shadow
+            },
+            "results": results,
+            "shadow": shadow
+        }
+        directory = os.path.dirname(args.json)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Inference backend comparison: pickle vs. compiled arrays vs. onnxruntime.
+
+For each domain the model pickle is loaded and, in memory, compiled with
+utils/tree_compiler.py and converted with utils/onnx_backend.py (one
+onnxruntime session per --threads value). Every backend then scores the
+same aligned feature matrices (records_to_matrix on jittered records from
+bench_stages.py):
+  per-row   one predict_proba call per row, over --per-row-rows rows
+  batched   one predict_proba call per batch of each --sizes value
+and reports median latency, µs per row and the max |Δp| against the pickle.
+
+Backends that cannot be built (onnxruntime or the converters not
+installed, unsupported model) are skipped; domains without model weights
+are skipped entirely.
+
+Usage (from the repo root):
+    python backend/benchmarks/bench_backends.py
+    python backend/benchmarks/bench_backends.py --domains vehicle --sizes 1 1000 --threads 1 4
+    python backend/benchmarks/bench_backends.py --json backends.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from bench_stages import DOMAINS, make_records, measure
+
+SIZES = [10, 100, 1000, 10_000]
+
+
+def load_pickle(domain):
+    """(model, layout) from the pickle, or (None, None) when the weights are not available."""
+    from utils.load_models import MODEL_FILES, compile_feature_layout, get_model_path, load_model_path
+    try:
+        model = load_model_path(get_model_path(MODEL_FILES[domain]), mmap=False, backend="pickle")
+    except Exception as e:
+        print(f"{domain}: no model ({e}); skipped")
+        return None, None
+    return model, compile_feature_layout(model)
+
+
+def build_backends(model, threads):
+    """Backend name -> object with predict_proba."""
+    backends = {"pickle": model}
+    try:
+        from utils.tree_compiler import compile_model
+        backends["compiled"] = compile_model(model)
+    except NotImplementedError as e:
+        print(f"  compiled: skipped ({e})")
+    try:
+        from utils.onnx_backend import OnnxModel, convert_model
+        serialized = convert_model(model).SerializeToString()
+        for n in threads:
+            backends[f"onnx-{n}t"] = OnnxModel(serialized, intra_op_threads=n)
+    except (ImportError, NotImplementedError) as e:
+        print(f"  onnx: skipped ({e})")
+    return backends
+
+
+def run(domains=DOMAINS, sizes=SIZES, threads=(1,), per_row_rows=200, min_time=0.2, min_rounds=3):
+    from utils.fast_transforms import records_to_matrix
+
+    results = []
+    for domain in domains:
+        model, layout = load_pickle(domain)
+        if model is None:
+            continue
+        if layout is None:
+            print(f"{domain}: model has no feature names; skipped")
+            continue
+        print(f"\n{domain} ({type(model).__module__}.{type(model).__name__})")
+        backends = build_backends(model, threads)
+        largest = max(max(sizes), per_row_rows)
+        X = records_to_matrix(make_records(domain, largest), domain, layout)
+        reference = model.predict_proba(X)[:, 1]
+
+        for name, backend in backends.items():
+            max_diff = float(np.max(np.abs(backend.predict_proba(X)[:, 1] - reference)))
+            rows = X[:per_row_rows]
+
+            def per_row():
+                for i in range(len(rows)):
+                    backend.predict_proba(rows[i:i + 1])
+
+            timing = measure(per_row, min_time=min_time, min_rounds=min_rounds)
+            cases = [("per-row", per_row_rows, timing)]
+            for size in sizes:
+                batch = X[:size]
+                cases.append(("batched", size, measure(lambda: backend.predict_proba(batch),
+                                                       min_time=min_time, min_rounds=min_rounds)))
+
+            for mode, size, timing in cases:
+                us_per_row = timing["median_ms"] * 1000 / size
+                label = f"{mode} x{size}"
+                print(f"  {name:<9} {label:<16} median {timing['median_ms']:10.3f} ms  "
+                      f"{us_per_row:10.2f} µs/row  max |Δp| {max_diff:.1e}")
+                results.append({
+                    "domain": domain,
+                    "backend": name,
+                    "mode": mode,
+                    "rows": size,
+                    "us_per_row": round(us_per_row, 3),
+                    "max_abs_diff": max_diff,
+                    **{k: round(v, 4) if isinstance(v, float) else v for k, v in timing.items()}
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--domains', nargs='+', choices=DOMAINS, default=DOMAINS)
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES, help='batch sizes')
+    parser.add_argument('--threads', nargs='+', type=int, default=[1], help='onnxruntime intra-op threads')
+    parser.add_argument('--per-row-rows', type=int, default=200, help='rows scored one call at a time')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds spent per case')
+    parser.add_argument('--min-rounds', type=int, default=3)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    results = run(args.domains, args.sizes, threads=args.threads, per_row_rows=args.per_row_rows,
+                  min_time=args.min_time, min_rounds=args.min_rounds)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
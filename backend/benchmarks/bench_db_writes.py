@@ -0,0 +1,95 @@
+"""
+Write-throughput benchmark for FraudLog persistence.
+
+Inserts N FraudLogs (each with its chain outbox row, like /test/run-test)
+into a fresh SQLite file three ways:
+  per-row   default pragmas, one commit per decision (the old behaviour)
+  per-row   WAL + synchronous=NORMAL, one commit per decision
+  batched   WAL + synchronous=NORMAL, one commit per batch (save_fraud_logs)
+and reports rows/second for each.
+
+Usage (from the repo root):
+    python backend/benchmarks/bench_db_writes.py --rows 2000 --batch-size 50
+    python backend/benchmarks/bench_db_writes.py --json results.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def make_session_factory(path, tuned):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from core.database import Base, configure_sqlite
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    if tuned:
+        configure_sqlite(engine)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def make_logs(start, n):
+    from models.fraud_log import FraudLog
+    return [
+        FraudLog(tx_hash=f"tx_bench_{i}", transaction_type="vehicle",
+                 fraud_score=i % 101, model_version="v1.0", transaction_data="{}")
+        for i in range(start, start + n)
+    ]
+
+
+def run(label, rows, batch_size, tuned):
+    from core.database import session_scope
+    from services.fraud_log_service import save_fraud_logs
+    # Registers the dashboard rollup insert hook, as in the running app
+    import services.stats_service  # noqa: F401
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, session_factory = make_session_factory(os.path.join(tmp, 'bench.db'), tuned)
+        started = time.perf_counter()
+        for start in range(0, rows, batch_size):
+            with session_scope(session_factory) as db:
+                save_fraud_logs(db, make_logs(start, min(batch_size, rows - start)))
+        elapsed = time.perf_counter() - started
+        engine.dispose()
+
+    result = {
+        'mode': label,
+        'rows': rows,
+        'batch_size': batch_size,
+        'wal': tuned,
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed if elapsed else None,
+    }
+    print(f"{label:>22}: {rows} rows in {elapsed:7.2f}s  ->  {result['rows_per_second']:9.0f} rows/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    results = [
+        run('per-row, default', args.rows, 1, tuned=False),
+        run('per-row, WAL', args.rows, 1, tuned=True),
+        run(f'batched x{args.batch_size}, WAL', args.rows, args.batch_size, tuned=True),
+    ]
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Per-worker memory benchmark for model loading.
+
+Starts N worker processes (spawned, like uvicorn --workers), has each one load
+every available model either from the regular pickles or from the
+memory-mapped *.mmap.joblib artifacts, and reports RSS, PSS and shared memory
+per worker. PSS splits shared pages between the processes mapping them, so it
+is the number that shows whether workers actually share model memory.
+
+Usage (from the repo root):
+    python backend/benchmarks/bench_model_memory.py --workers 4 --export
+    python backend/benchmarks/bench_model_memory.py --workers 4 --json results.json
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def read_memory():
+    """RSS / PSS / shared bytes of the current process from /proc."""
+    mem = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty'):
+                    mem[key] = int(rest.split()[0]) * 1024
+    except OSError:
+        from utils.load_models import current_rss_bytes
+        mem['Rss'] = current_rss_bytes()
+    return {
+        'rss_bytes': mem.get('Rss'),
+        'pss_bytes': mem.get('Pss'),
+        'shared_bytes': mem.get('Shared_Clean', 0) + mem.get('Shared_Dirty', 0) if 'Pss' in mem else None,
+    }
+
+
+def worker(use_mmap, ready, done, results):
+    from utils import load_models
+
+    baseline = read_memory()
+    loaded = []
+    for transaction_type, filename in load_models.MODEL_FILES.items():
+        try:
+            load_models.load_model_file(filename, mmap=use_mmap)
+            loaded.append(transaction_type)
+        except FileNotFoundError:
+            pass
+    # Measure only once every worker has loaded, so shared pages are counted
+    # against all of them
+    ready.wait()
+    after = read_memory()
+    results.put({'pid': os.getpid(), 'loaded': loaded, 'baseline': baseline, 'after': after})
+    done.wait()
+
+
+def run(n_workers, use_mmap):
+    ctx = mp.get_context('spawn')
+    ready = ctx.Barrier(n_workers + 1)
+    done = ctx.Event()
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(use_mmap, ready, done, results)) for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    ready.wait()
+    rows = [results.get() for _ in procs]
+    done.set()
+    for p in procs:
+        p.join()
+    return rows
+
+
+def summarize(label, rows):
+    def mean(key, field):
+        vals = [r[field][key] for r in rows if r[field][key] is not None]
+        return sum(vals) / len(vals) if vals else None
+
+    summary = {
+        'mode': label,
+        'workers': len(rows),
+        'models': rows[0]['loaded'] if rows else [],
+        'rss_bytes_per_worker': mean('rss_bytes', 'after'),
+        'pss_bytes_per_worker': mean('pss_bytes', 'after'),
+        'model_rss_bytes_per_worker': (mean('rss_bytes', 'after') or 0) - (mean('rss_bytes', 'baseline') or 0),
+        'model_pss_bytes_per_worker': (mean('pss_bytes', 'after') or 0) - (mean('pss_bytes', 'baseline') or 0),
+    }
+    mb = lambda v: f"{v / 2**20:8.1f} MB" if v is not None else "     n/a"
+    print(f"{label:>8}: RSS/worker {mb(summary['rss_bytes_per_worker'])}  "
+          f"PSS/worker {mb(summary['pss_bytes_per_worker'])}  "
+          f"models RSS {mb(summary['model_rss_bytes_per_worker'])}  "
+          f"models PSS {mb(summary['model_pss_bytes_per_worker'])}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--export', action='store_true', help='write *.mmap.joblib artifacts first')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    from utils import load_models
+    if args.export:
+        for filename in load_models.MODEL_FILES.values():
+            if os.path.exists(load_models.get_model_path(filename)):
+                print(f"Exported {load_models.export_mmap_artifact(filename)}")
+
+    print(f"Loading models in {args.workers} worker processes")
+    results = [
+        summarize('pickle', run(args.workers, use_mmap=False)),
+        summarize('mmap', run(args.workers, use_mmap=True)),
+    ]
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Per-stage micro-benchmarks of the scoring path.
+
+Times every stage of FraudDetectionService scoring separately, for each
+domain at 1, 100 and 10,000 rows:
+  dataframe       pd.DataFrame(records)
+  transform       the domain function in utils/transforms.py
+  get_dummies     one-hot encoding inside the transform     (vehicle, ecommerce)
+  age_mapping     clean_vehicle_age + categorize_age        (vehicle)
+  category_codes  fillna + category codes                   (bank)
+  cyclical        date parsing + encode_cyclical            (ecommerce, ethereum)
+  align_frame     transformed DataFrame -> model matrix (FeatureLayout)
+  align_fast      records -> model matrix (records_to_matrix, the served path)
+  predict_proba   model.predict_proba on the aligned matrix
+  score_mapping   calculate_fraud_scores
+
+Each stage is repeated until it has run for --min-time seconds (at least
+--min-rounds times), pytest-benchmark style, and min / median / mean /
+stddev are reported along with each stage's share of the pandas path
+(dataframe + transform + align_frame + predict_proba + score_mapping).
+Domains without model weights are timed up to the transform.
+
+The same cases run under pytest-benchmark with
+    pytest backend/benchmarks/test_bench_stages.py
+
+Usage (from the repo root):
+    python backend/benchmarks/bench_stages.py
+    python backend/benchmarks/bench_stages.py --domains vehicle --sizes 1 10000 --json stages.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np
+import pandas as pd
+
+DOMAINS = ["vehicle", "bank", "ecommerce", "ethereum"]
+SIZES = [1, 100, 10_000]
+PANDAS_PATH = ["dataframe", "transform", "align_frame", "predict_proba", "score_mapping"]
+
+# One complete raw record per domain; rows are jittered copies of it
+BASE_RECORDS = {
+    "vehicle": {
+        'Month': 'Dec', 'WeekOfMonth': 5, 'DayOfWeek': 'Wednesday', 'Make': 'Honda', 'AccidentArea': 'Urban',
+        'DayOfWeekClaimed': 'Tuesday', 'MonthClaimed': 'Jan', 'WeekOfMonthClaimed': 1, 'Sex': 'Female',
+        'MaritalStatus': 'Single', 'Age': 21, 'Fault': 'Policy Holder', 'PolicyType': 'Sport - Liability',
+        'VehicleCategory': 'Sport', 'VehiclePrice': 'more than 69000', 'PolicyNumber': 1, 'RepNumber': 12,
+        'Deductible': 300, 'DriverRating': 1, 'Days_Policy_Accident': 'more than 30',
+        'Days_Policy_Claim': 'more than 30', 'PastNumberOfClaims': 'none', 'AgeOfVehicle': '3 years',
+        'AgeOfPolicyHolder': '26 to 30', 'PoliceReportFiled': 'No', 'WitnessPresent': 'No',
+        'AgentType': 'External', 'NumberOfSuppliments': 'none', 'AddressChange_Claim': '1 year',
+        'NumberOfCars': '3 to 4', 'Year': 1994, 'BasePolicy': 'Liability'
+    },
+    "bank": {
+        'income': 0.9, 'name_email_similarity': 0.16, 'prev_address_months_count': -1,
+        'current_address_months_count': 88, 'customer_age': 50, 'days_since_request': 0.02,
+        'intended_balcon_amount': -1.3, 'payment_type': 'AA', 'zip_count_4w': 769, 'velocity_6h': 10650.7,
+        'employment_status': 'CB', 'credit_risk_score': 185, 'email_is_free': 0, 'housing_status': 'BA',
+        'phone_home_valid': 1, 'has_other_cards': 0, 'proposed_credit_limit': 500.0, 'source': 'INTERNET',
+        'session_length_in_minutes': 3.9, 'device_os': 'windows', 'keep_alive_session': 0, 'month': 7
+    },
+    "ecommerce": {
+        'Transaction ID': 'c12e07a0', 'Customer ID': 'd1b87f62', 'Transaction Amount': 58.09,
+        'Transaction Date': '2024-02-20 05:58:41', 'Payment Method': 'bank transfer',
+        'Product Category': 'electronics', 'Quantity': 1, 'Customer Age': 17,
+        'Customer Location': 'Amandaborough', 'Device Used': 'tablet', 'IP Address': '212.195.49.198',
+        'Shipping Address': '123 Main St', 'Billing Address': '123 Main St', 'Account Age Days': 30,
+        'Transaction Hour': 5
+    },
+    "ethereum": {
+        'blockNumber': 17000000, 'confirmations': 120, 'Month': 3, 'Day': 14, 'Hour': 22,
+        'mean_value_received': 0.52, 'variance_value_received': 0.1, 'total_received': 12.5,
+        'time_diff_first_last_received': 86400.0, 'total_tx_sent': 40, 'total_tx_sent_malicious': 2,
+        'total_tx_sent_unique': 31, 'total_tx_sent_malicious_unique': 1,
+        'total_tx_received_malicious_unique': 0, 'received_coef_variation': 1.7
+    },
+}
+
+# Values mixed into categorical columns so one-hot encoding sees realistic cardinality
+CATEGORY_CHOICES = {
+    'Make': ['Honda', 'Toyota', 'Mazda', 'Ford', 'Chevrolet', 'Pontiac', 'VW', 'Accura'],
+    'MonthClaimed': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
+    'PolicyType': ['Sport - Liability', 'Sedan - Collision', 'Sedan - All Perils', 'Utility - All Perils'],
+    'AccidentArea': ['Urban', 'Rural'],
+    'payment_type': ['AA', 'AB', 'AC', 'AD'],
+    'device_os': ['windows', 'linux', 'macintosh', 'other'],
+    'Payment Method': ['bank transfer', 'PayPal', 'credit card', 'debit card'],
+    'Product Category': ['electronics', 'toys & games', 'clothing', 'home & garden'],
+    'Device Used': ['tablet', 'mobile', 'desktop'],
+}
+
+
+def make_records(domain, n, seed=0):
+    """n raw records: numeric fields scaled by U(0.5, 1.5), known categoricals resampled."""
+    rng = np.random.default_rng(seed)
+    base = BASE_RECORDS[domain]
+    columns = {}
+    for key, value in base.items():
+        if key in CATEGORY_CHOICES:
+            choices = CATEGORY_CHOICES[key]
+            columns[key] = [choices[i] for i in rng.integers(0, len(choices), n)]
+        elif isinstance(value, float):
+            columns[key] = (value * rng.uniform(0.5, 1.5, n)).tolist()
+        elif isinstance(value, int) and key not in ('Year', 'Month', 'Day', 'Hour', 'month'):
+            columns[key] = np.rint(value * rng.uniform(0.5, 1.5, n)).astype(int).tolist()
+        else:
+            columns[key] = [value] * n
+    keys = list(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+def load_model(domain):
+    """(model, layout) or (None, None) when the weights are not available."""
+    from utils.load_models import MODEL_LOADERS
+    try:
+        return MODEL_LOADERS[domain]()
+    except Exception as e:
+        print(f"  {domain}: no model ({e}); model stages skipped")
+        return None, None
+
+
+def build_stages(domain, records, model=None, layout=None):
+    """Stage name -> zero-argument callable, each with its input prepared up front."""
+    from utils import transforms
+    from utils.fast_transforms import records_to_matrix
+    from services.ai_service import FraudDetectionService, calculate_fraud_scores
+
+    transform = FraudDetectionService().transforms[domain]
+    frame = pd.DataFrame(records)
+    stages = {
+        "dataframe": lambda: pd.DataFrame(records),
+        "transform": lambda: transform(frame, selected_features=None),
+    }
+
+    if domain == "vehicle":
+        onehot = [c for c in transforms.VEHICLE_ONEHOT_COLS if c in frame.columns]
+        stages["get_dummies"] = lambda: pd.get_dummies(frame[onehot], columns=onehot, drop_first=False)
+        stages["age_mapping"] = lambda: frame['Age'].apply(transforms.clean_vehicle_age).apply(transforms.categorize_age)
+    elif domain == "ecommerce":
+        onehot = [c for c in transforms.ECOMMERCE_ONEHOT_COLS if c in frame.columns]
+        stages["get_dummies"] = lambda: pd.get_dummies(frame[onehot], columns=onehot, drop_first=False)
+
+        def cyclical():
+            dates = pd.to_datetime(frame['Transaction Date'])
+            out = pd.DataFrame({unit: getattr(dates.dt, unit.lower()) for unit, _ in transforms.ECOMMERCE_CYCLICAL_UNITS})
+            for unit, max_val in transforms.ECOMMERCE_CYCLICAL_UNITS:
+                out = transforms.encode_cyclical(out, unit, max_val)
+            return out
+        stages["cyclical"] = cyclical
+    elif domain == "bank":
+        stages["category_codes"] = lambda: [
+            column.astype('category').cat.codes
+            for _, column in frame.fillna(0).select_dtypes(include=['object', 'string']).items()
+        ]
+    elif domain == "ethereum":
+        def cyclical():
+            out = frame[['Hour', 'Day']].copy()
+            out = transforms.encode_cyclical(out, 'Hour', 24)
+            return transforms.encode_cyclical(out, 'Day', 31)
+        stages["cyclical"] = cyclical
+
+    if layout is not None:
+        transformed = transform(frame, selected_features=None)
+        matrix = records_to_matrix(records, domain, layout)
+        stages["align_frame"] = lambda: layout.fill_from_frame(transformed)
+        stages["align_fast"] = lambda: records_to_matrix(records, domain, layout)
+        if model is not None:
+            probabilities = model.predict_proba(matrix)[:, 1]
+            stages["predict_proba"] = lambda: model.predict_proba(matrix)
+            stages["score_mapping"] = lambda: calculate_fraud_scores(probabilities)
+    else:
+        probabilities = np.random.default_rng(0).random(len(records))
+        stages["score_mapping"] = lambda: calculate_fraud_scores(probabilities)
+    return stages
+
+
+def measure(fn, min_time=0.2, min_rounds=3, max_rounds=10_000):
+    """Run fn repeatedly (after one warm-up call) and summarize the round times."""
+    fn()
+    times = []
+    total = 0.0
+    while (len(times) < min_rounds or total < min_time) and len(times) < max_rounds:
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        times.append(elapsed)
+        total += elapsed
+    return {
+        "rounds": len(times),
+        "min_ms": min(times) * 1000,
+        "median_ms": statistics.median(times) * 1000,
+        "mean_ms": statistics.fmean(times) * 1000,
+        "stddev_ms": (statistics.stdev(times) if len(times) > 1 else 0.0) * 1000,
+    }
+
+
+def run(domains=DOMAINS, sizes=SIZES, min_time=0.2, min_rounds=3):
+    results = []
+    for domain in domains:
+        model, layout = load_model(domain)
+        for size in sizes:
+            records = make_records(domain, size)
+            stages = build_stages(domain, records, model, layout)
+            timings = {name: measure(fn, min_time=min_time, min_rounds=min_rounds) for name, fn in stages.items()}
+
+            path_total = sum(timings[s]["median_ms"] for s in PANDAS_PATH if s in timings)
+            print(f"\n{domain} x {size} rows")
+            for name, timing in timings.items():
+                share = f"{timing['median_ms'] / path_total * 100:5.1f}%" if name in PANDAS_PATH and path_total else "      "
+                print(f"  {name:<15} median {timing['median_ms']:10.3f} ms  "
+                      f"min {timing['min_ms']:10.3f} ms  ±{timing['stddev_ms']:8.3f}  {share}  "
+                      f"({timing['rounds']} rounds)")
+                results.append({
+                    "domain": domain,
+                    "rows": size,
+                    "stage": name,
+                    "us_per_row": round(timing["median_ms"] * 1000 / size, 3),
+                    **{k: round(v, 4) if isinstance(v, float) else v for k, v in timing.items()}
+                })
+            slowest = max((s for s in PANDAS_PATH if s in timings), key=lambda s: timings[s]["median_ms"])
+            print(f"  -> dominated by {slowest}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--domains', nargs='+', choices=DOMAINS, default=DOMAINS)
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds spent per stage')
+    parser.add_argument('--min-rounds', type=int, default=3)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    results = run(args.domains, args.sizes, min_time=args.min_time, min_rounds=args.min_rounds)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
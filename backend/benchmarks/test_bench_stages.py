@@ -0,0 +1,42 @@
+"""
+pytest-benchmark entry point for the stage micro-benchmarks in bench_stages.py.
+
+    pytest backend/benchmarks/test_bench_stages.py
+    pytest backend/benchmarks/test_bench_stages.py -k "vehicle and 10000" --benchmark-json=stages.json
+
+Skipped when pytest-benchmark is not installed.
+"""
+
+import os
+import sys
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_stages import DOMAINS, SIZES, make_records, load_model, build_stages
+
+_MODELS = {}
+
+
+def stages_for(domain, size):
+    if domain not in _MODELS:
+        _MODELS[domain] = load_model(domain)
+    model, layout = _MODELS[domain]
+    return build_stages(domain, make_records(domain, size), model, layout)
+
+
+CASES = [
+    (domain, size, stage)
+    for domain in DOMAINS
+    for size in SIZES
+    # The stage list only depends on the domain (and whether its model exists)
+    for stage in stages_for(domain, 1)
+]
+
+
+@pytest.mark.parametrize("domain,size,stage", CASES, ids=[f"{d}-{n}-{s}" for d, n, s in CASES])
+def test_stage(benchmark, domain, size, stage):
+    benchmark.group = f"{domain}-{size}"
+    benchmark(stages_for(domain, size)[stage])
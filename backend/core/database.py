@@ -1,9 +1,123 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
-from core.config import DATABASE_URL
-
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
+from core.config import (
+    DATABASE_URL, ASYNC_DATABASE_URL,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE
 )
-SessionLocal = sessionmaker(bind=engine)
+
+# Async driver used for each backend when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the default driver of a database URL for its async counterpart."""
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        raise ValueError(f"No async driver known for {parsed.drivername}; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> dict:
+    """Pool settings for server databases; SQLite only needs cross-thread use."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def configure_sqlite(engine):
+    """
+    Set write-friendly pragmas on every new SQLite connection.
+    
+    WAL lets readers run alongside the writer and, with synchronous=NORMAL,
+    commits no longer fsync each time (only at checkpoints); a crash can
+    lose the last commits but never corrupts the database.
+    """
+    if engine.dialect.name != "sqlite":
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        # Wait for a concurrent writer instead of failing with "database is locked"
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+    return engine
+
+
+def add_missing_columns(engine, table) -> list:
+    """
+    Add columns of a model that its existing table lacks (create_all only
+    creates missing tables). Returns the names of the added columns.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(table.name):
+        return []
+    existing = {column["name"] for column in inspector.get_columns(table.name)}
+    missing = [column for column in table.columns if column.name not in existing]
+    with engine.begin() as connection:
+        for column in missing:
+            column_type = column.type.compile(dialect=engine.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+    return [column.name for column in missing]
+
+
+# Sync engine: chain worker, startup tasks, scripts
+engine = configure_sqlite(create_engine(DATABASE_URL, **engine_options(DATABASE_URL)))
+# Objects stay readable after session_scope() commits and closes
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
 Base = declarative_base()
+
+# Async engine: API handlers, so DB I/O doesn't hold a threadpool worker
+async_database_url = ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+async_engine = create_async_engine(async_database_url, **engine_options(async_database_url))
+configure_sqlite(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+
+@contextmanager
+def session_scope(session_factory=SessionLocal):
+    """
+    Session for one unit of work: commits on success, rolls back on error
+    and is always closed.
+    """
+    db = session_factory()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def get_db():
+    """
+    FastAPI dependency yielding an AsyncSession for one request.
+    Handlers commit explicitly; anything left uncommitted is rolled back.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
@@ -1,8 +1,14 @@
-from web3 import Web3
+from web3 import Web3, AsyncWeb3, AsyncHTTPProvider
+from web3.providers.rpc.utils import ExceptionRetryConfiguration
+import aiohttp
+import asyncio
 import json
-from core.config import RPC_URL, CONTRACT_ADDRESS, ABI_PATH
+from core.config import (
+    RPC_URL, CONTRACT_ADDRESS, ABI_PATH,
+    RPC_TIMEOUT, RPC_MAX_RETRIES, RPC_BACKOFF_FACTOR, RPC_POOL_SIZE
+)
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+w3 = Web3(Web3.HTTPProvider(RPC_URL, request_kwargs={"timeout": RPC_TIMEOUT}))
 
 with open(ABI_PATH) as f:
     abi = json.load(f)
@@ -18,3 +24,74 @@ if CONTRACT_ADDRESS:
         print(f"Warning: Could not initialize blockchain contract: {e}")
         contract = None
 
+
+# ============= Async client =============
+# Created on first use inside the running event loop (aiohttp sessions are
+# bound to their loop) and shared by every handler afterwards.
+
+async_w3 = None
+async_contract = None
+_async_session = None
+_async_lock = asyncio.Lock()
+
+
+async def get_async_w3() -> AsyncWeb3:
+    """
+    Shared AsyncWeb3 client.
+
+    All requests go through one aiohttp session with a keep-alive
+    connection pool of RPC_POOL_SIZE, a RPC_TIMEOUT second timeout, and
+    up to RPC_MAX_RETRIES retries with exponential backoff on connection
+    errors and timeouts (web3 only retries read-only methods, never
+    eth_sendRawTransaction).
+    """
+    global async_w3, async_contract, _async_session
+    if async_w3 is not None:
+        return async_w3
+    async with _async_lock:
+        if async_w3 is None:
+            timeout = aiohttp.ClientTimeout(total=RPC_TIMEOUT)
+            provider = AsyncHTTPProvider(
+                RPC_URL,
+                request_kwargs={"timeout": timeout},
+                exception_retry_configuration=ExceptionRetryConfiguration(
+                    errors=(aiohttp.ClientError, asyncio.TimeoutError),
+                    retries=RPC_MAX_RETRIES,
+                    backoff_factor=RPC_BACKOFF_FACTOR
+                )
+            )
+            _async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=RPC_POOL_SIZE, keepalive_timeout=30),
+                timeout=timeout,
+                raise_for_status=True
+            )
+            await provider.cache_async_session(_async_session)
+            client = AsyncWeb3(provider)
+
+            if CONTRACT_ADDRESS:
+                try:
+                    async_contract = client.eth.contract(
+                        address=Web3.to_checksum_address(CONTRACT_ADDRESS),
+                        abi=abi
+                    )
+                except Exception as e:
+                    print(f"Warning: Could not initialize async blockchain contract: {e}")
+                    async_contract = None
+            async_w3 = client
+    return async_w3
+
+
+async def get_async_contract():
+    """Ledger contract bound to the shared async client (None if not configured)."""
+    await get_async_w3()
+    return async_contract
+
+
+async def close_async_w3():
+    """Close the pooled session; call on application shutdown."""
+    global async_w3, async_contract, _async_session
+    if _async_session is not None and not _async_session.closed:
+        await _async_session.close()
+    async_w3 = None
+    async_contract = None
+    _async_session = None
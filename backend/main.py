@@ -2,18 +2,105 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from contextlib import asynccontextmanager
+import asyncio
 import os
 import sys
+from typing import Optional
 
 # Add the backend module to the path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from core.database import engine, Base
-from routers import dash, test
+from core.config import (
+    PRELOAD_MODELS, MODEL_LOAD_WORKERS, MODEL_WARMUP_ROWS, PREDICTION_CACHE_SIZE,
+    MODEL_WATCH_ENABLED, MODEL_WATCH_INTERVAL, MODEL_KEEP_VERSIONS,
+    SHADOW_MODELS, SHADOW_DIR, SHADOW_MAX_PENDING,
+    CHAIN_WORKER_ENABLED, CHAIN_POLL_INTERVAL, CHAIN_BATCH_SIZE, CHAIN_MAX_ATTEMPTS,
+    CHAIN_MAX_IN_FLIGHT, CHAIN_WRITE_MODE, CHAIN_ANCHOR_WINDOW, CHAIN_ANCHOR_MAX_SIZE,
+    CHAIN_RETRY_BASE_SECONDS, CHAIN_RETRY_MAX_SECONDS
+)
+from core.database import engine, async_engine, Base, SessionLocal, add_missing_columns
+from routers import dash, test, score, verify
+from services.ai_service import (
+    initialize_service, get_model_stats, get_cache_stats, enable_shadow_scoring, get_shadow_summary
+)
+from services.shadow_service import parse_challengers
+from services.chain_worker import start_chain_worker, stop_chain_worker
+from services.model_watcher import start_model_watcher, stop_model_watcher
+from services.stats_service import sync_score_rollup
+from services.event_broadcaster import broadcaster
+from models.fraud_log import FraudLog
+from models.chain_outbox import ChainOutbox
+from models.anchor_batch import AnchorBatch
+from core.web3_client import close_async_w3
 
 Base.metadata.create_all(bind=engine)
+# create_all skips indexes added to tables that already exist
+for index in FraudLog.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+# ...and columns (the outbox and anchor batch retry schedule)
+add_missing_columns(engine, ChainOutbox.__table__)
+add_missing_columns(engine, AnchorBatch.__table__)
+
+
+def parse_preload(value: str):
+    """Turn the PRELOAD_MODELS setting into a list of transaction types."""
+    value = (value or "").strip().lower()
+    if value in ("", "none"):
+        return []
+    if value == "all":
+        return ["vehicle", "bank", "ecommerce", "ethereum"]
+    return [t.strip() for t in value.split(",") if t.strip()]
+
 
-app = FastAPI(title="FraudProof Ledger Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Committed FraudLog changes are pushed to /stats/stream from this loop
+    broadcaster.attach_loop(asyncio.get_running_loop())
+    # Bring the dashboard rollup in line with fraud_logs (first start, or rows
+    # written by another process)
+    db = SessionLocal()
+    try:
+        await asyncio.to_thread(sync_score_rollup, db)
+    finally:
+        db.close()
+    # Load the configured models in a thread pool; the rest load lazily
+    service = await asyncio.to_thread(
+        initialize_service,
+        preload=parse_preload(PRELOAD_MODELS),
+        warmup_rows=MODEL_WARMUP_ROWS,
+        max_workers=MODEL_LOAD_WORKERS,
+        cache_size=PREDICTION_CACHE_SIZE,
+        keep_versions=MODEL_KEEP_VERSIONS
+    )
+    # Score challenger versions on copies of live requests, off the request path
+    enable_shadow_scoring(parse_challengers(SHADOW_MODELS), SHADOW_DIR, max_pending=SHADOW_MAX_PENDING)
+    # Swap in retrained weights dropped into model_wts without a restart
+    if MODEL_WATCH_ENABLED:
+        start_model_watcher(service.models, poll_interval=MODEL_WATCH_INTERVAL)
+    # Drain the chain outbox in the background; requests never wait on the chain
+    if CHAIN_WORKER_ENABLED:
+        start_chain_worker(
+            poll_interval=CHAIN_POLL_INTERVAL,
+            batch_size=CHAIN_BATCH_SIZE,
+            max_attempts=CHAIN_MAX_ATTEMPTS,
+            retry_base=CHAIN_RETRY_BASE_SECONDS,
+            retry_max=CHAIN_RETRY_MAX_SECONDS,
+            max_in_flight=CHAIN_MAX_IN_FLIGHT,
+            mode=CHAIN_WRITE_MODE,
+            anchor_window=CHAIN_ANCHOR_WINDOW,
+            anchor_max_size=CHAIN_ANCHOR_MAX_SIZE
+        )
+    yield
+    if service.shadow is not None:
+        service.shadow.shutdown(wait=False)
+    stop_model_watcher()
+    stop_chain_worker()
+    await close_async_w3()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="FraudProof Ledger Backend", lifespan=lifespan)
 
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
@@ -31,6 +118,8 @@ frontend_path = os.path.abspath(frontend_path)
 # Include API routers FIRST (before static files to avoid conflicts)
 app.include_router(dash.router)
 app.include_router(test.router)
+app.include_router(score.router)
+app.include_router(verify.router)
 
 @app.get("/")
 async def root():
@@ -61,6 +150,21 @@ async def styles_css():
 async def health():
     return {"status": "ok"}
 
+@app.get("/health/models")
+async def model_health():
+    """Per-model load time, memory and warm-up stats."""
+    return get_model_stats()
+
+@app.get("/health/prediction-cache")
+async def prediction_cache_health():
+    """Prediction cache hit / miss / eviction counters."""
+    return get_cache_stats()
+
+@app.get("/health/shadow")
+async def shadow_summary(transaction_type: Optional[str] = None):
+    """Challenger vs. production score deltas and shadow timing."""
+    return await asyncio.to_thread(get_shadow_summary, transaction_type)
+
 # Mount static files LAST to avoid conflicts with API routes
 if os.path.exists(frontend_path):
     app.mount("/static", StaticFiles(directory=frontend_path), name="static")
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from core.database import Base
+from models.chain_outbox import STATUS_PENDING
+
+
+class AnchorBatch(Base):
+    """
+    A batch of fraud decisions committed on-chain as one Merkle root.
+
+    Uses the same pending/sent/confirmed/failed lifecycle as ChainOutbox;
+    the per-decision inclusion proofs live in MerkleProof.
+    """
+    __tablename__ = "anchor_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Anchored payload
+    merkle_root = Column(String, unique=True, index=True)  # 0x-prefixed hex
+    batch_size = Column(Integer)
+
+    # Submission state
+    status = Column(String, default=STATUS_PENDING, index=True)
+    chain_tx_hash = Column(String, nullable=True, index=True)
+    nonce = Column(Integer, nullable=True)
+    attempts = Column(Integer, default=0)
+    last_error = Column(String, nullable=True)
+    # Not sent again before this time (backoff after a failed send)
+    next_attempt_at = Column(DateTime, nullable=True)
+
+    # Blockchain info (filled once the anchor is mined)
+    blockchain_timestamp = Column(Integer, nullable=True)
+    gas_used = Column(Integer, nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AnchorBatch(id={self.id}, size={self.batch_size}, status={self.status})>"
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+from core.database import Base
+
+
+# Outbox row lifecycle
+STATUS_PENDING = "pending"      # waiting to be signed and sent
+STATUS_SENT = "sent"            # broadcast, waiting for a receipt
+STATUS_CONFIRMED = "confirmed"  # mined successfully, FraudLog updated
+STATUS_FAILED = "failed"        # reverted or out of retry attempts (see requeue_failed)
+STATUS_BATCHED = "batched"      # batch mode: in a Merkle batch waiting to be anchored
+
+
+class ChainOutbox(Base):
+    """
+    Pending blockchain write for a FraudLog.
+    
+    Rows are inserted in the same DB transaction as their FraudLog and
+    drained by the background chain worker, so the API never waits on
+    the chain.
+    """
+    __tablename__ = "chain_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fraud_log_id = Column(Integer, ForeignKey("fraud_logs.id"), index=True)
+    
+    # Payload written on-chain
+    reference_id = Column(String, index=True)
+    fraud_score = Column(Integer)
+    model_version = Column(String)
+    
+    # Submission state
+    status = Column(String, default=STATUS_PENDING, index=True)
+    chain_tx_hash = Column(String, nullable=True, index=True)
+    nonce = Column(Integer, nullable=True)
+    attempts = Column(Integer, default=0)
+    last_error = Column(String, nullable=True)
+    # Not sent again before this time (backoff after a failed send)
+    next_attempt_at = Column(DateTime, nullable=True)
+    # Batch mode: the Merkle batch this decision was anchored in
+    anchor_batch_id = Column(Integer, ForeignKey("anchor_batches.id"), nullable=True, index=True)
+    
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ChainOutbox(id={self.id}, fraud_log_id={self.fraud_log_id}, status={self.status})>"
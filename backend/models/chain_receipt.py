@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from core.database import Base
+
+
+class ChainReceipt(Base):
+    """
+    Cached on-chain fraud record, keyed by blockchain transaction hash.
+    
+    Only receipts past the finality depth are stored: they can no longer
+    change, so they are never fetched from the RPC provider again.
+    """
+    __tablename__ = "chain_receipts"
+
+    tx_hash = Column(String, primary_key=True)
+    
+    # Receipt + block
+    block_number = Column(Integer)
+    timestamp = Column(Integer)
+    gas_used = Column(Integer)
+    
+    # FraudLogged event payload
+    fraud_score = Column(Integer)
+    model_version = Column(String)
+    
+    # Metadata
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+    
+    def to_dict(self) -> dict:
+        return {
+            "fraud_score": self.fraud_score,
+            "model_version": self.model_version,
+            "timestamp": self.timestamp,
+            "gas_used": self.gas_used,
+            "block_number": self.block_number,
+            "tx_hash": self.tx_hash
+        }
+    
+    def __repr__(self):
+        return f"<ChainReceipt(tx_hash={self.tx_hash}, block={self.block_number})>"
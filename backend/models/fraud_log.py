@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Index
 from datetime import datetime
 from core.database import Base
 
@@ -11,6 +11,11 @@ class FraudLog(Base):
     referenced by blockchain transaction hash.
     """
     __tablename__ = "fraud_logs"
+    __table_args__ = (
+        # Keyset pagination: newest first, optionally within one transaction type
+        Index("ix_fraud_logs_created_at_id", "created_at", "id"),
+        Index("ix_fraud_logs_type_created_at_id", "transaction_type", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
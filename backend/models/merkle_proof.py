@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from datetime import datetime
+from core.database import Base
+
+
+class MerkleProof(Base):
+    """
+    Inclusion proof of one FraudLog in an anchored Merkle batch.
+
+    Enough to re-check the record against the batch root offline,
+    without querying the chain.
+    """
+    __tablename__ = "merkle_proofs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fraud_log_id = Column(Integer, ForeignKey("fraud_logs.id"), unique=True, index=True)
+    batch_id = Column(Integer, ForeignKey("anchor_batches.id"), index=True)
+
+    leaf_index = Column(Integer)
+    leaf_hash = Column(String)  # 0x-prefixed hex
+    proof = Column(JSON)        # sibling hashes, leaf level first
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MerkleProof(fraud_log_id={self.fraud_log_id}, batch_id={self.batch_id})>"
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String
+from core.database import Base
+
+
+class FraudScoreRollup(Base):
+    """
+    Running count of FraudLogs per (transaction type, integer score).
+
+    At most 4 x 101 rows however large fraud_logs grows, so dashboard
+    aggregates (histograms, fraud rates, averages) never scan the log.
+    Maintained on insert by services.stats_service.
+    """
+    __tablename__ = "fraud_score_rollup"
+
+    transaction_type = Column(String, primary_key=True)
+    score = Column(Integer, primary_key=True)  # 0-100
+    count = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<FraudScoreRollup(type={self.transaction_type}, score={self.score}, count={self.count})>"
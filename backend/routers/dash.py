@@ -1,37 +1,133 @@
-from fastapi import APIRouter
-from core.database import SessionLocal
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import AsyncSessionLocal, get_db
+from models.chain_outbox import ChainOutbox, STATUS_CONFIRMED
 from models.fraud_log import FraudLog
 # Ensure this import matches your file structure
-from services.chain_service import get_onchain_fraud_data
+from services.receipt_cache import get_receipt_cache
+from services.stats_service import list_records, get_summary, MAX_PAGE_SIZE
+from services.event_broadcaster import broadcaster, format_sse, serialize_record
 
 # Prefix MUST be 
 router = APIRouter(prefix="/stats", tags=["Dashboard"])
 
+# Records per page that get on-chain data in the response
+CHAIN_LOOKUP_LIMIT = 5
+# Records sent in the initial snapshot of /stats/stream
+STREAM_SNAPSHOT_RECORDS = 10
+# Comment frame sent when idle so proxies keep the stream open
+STREAM_HEARTBEAT_SECONDS = 15
+
+
+# The loaders below are plain ORM code run through AsyncSession.run_sync:
+# the queries go over the async driver without a threadpool hop
+
+def load_page(db, limit, cursor, transaction_type, min_score, max_score):
+    """One page of records (newest first), the next cursor and the confirmed chain tx hashes."""
+    records, next_cursor = list_records(
+        db, limit=limit, cursor=cursor, transaction_type=transaction_type,
+        min_score=min_score, max_score=max_score
+    )
+    recent_ids = [r.id for r in records[:CHAIN_LOOKUP_LIMIT]]
+    chain_hashes = dict(
+        db.query(ChainOutbox.fraud_log_id, ChainOutbox.chain_tx_hash)
+        .filter(ChainOutbox.fraud_log_id.in_(recent_ids), ChainOutbox.status == STATUS_CONFIRMED)
+        .all()
+    )
+    return records, next_cursor, chain_hashes
+
+
+def load_snapshot(db, attempts=3):
+    """
+    Summary and newest records, plus the highest FraudLog id they cover.
+    The id is read before and after; if a row was committed in between the
+    snapshot is taken again, so last_id matches what the summary counted.
+    """
+    last_id = db.query(func.coalesce(func.max(FraudLog.id), 0)).scalar()
+    for _ in range(attempts):
+        summary = get_summary(db)
+        records, _ = list_records(db, limit=STREAM_SNAPSHOT_RECORDS)
+        after = db.query(func.coalesce(func.max(FraudLog.id), 0)).scalar()
+        if after == last_id:
+            break
+        last_id = after
+    return {
+        "summary": summary,
+        "records": [serialize_record(r) for r in records],
+        "last_id": last_id
+    }
+
+
+def already_in_snapshot(message, last_id) -> bool:
+    """A "created" event for a row the snapshot already counted."""
+    return message.get("event") == "created" and message["data"]["record"]["id"] <= last_id
+
+
+def chain_hash_for(record, chain_hashes):
+    if record.tx_hash and record.tx_hash.startswith("0x"):
+        return record.tx_hash
+    return chain_hashes.get(record.id)
+
+
+def stored_chain_data(record, chain_hash):
+    """On-chain data already written back to the FraudLog row, without any RPC."""
+    return {
+        "fraud_score": int(record.fraud_score),
+        "model_version": record.model_version,
+        "timestamp": record.blockchain_timestamp,
+        "gas_used": record.gas_used,
+        "tx_hash": chain_hash
+    }
+
+
 @router.get("/")
-def get_dashboard_stats():
+async def get_dashboard_stats(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    max_score: Optional[float] = Query(None, ge=0, le=100),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Get fraud stats and recent logs.
+    Get recent logs, newest first, one page at a time.
+    Pass next_cursor back as cursor for the following page.
+    Totals and histograms come from /stats/summary.
     """
     try:
-        db = SessionLocal()
-        # Fetch all records, sorted by newest first
-        all_records = db.query(FraudLog).order_by(FraudLog.created_at.desc()).all()
-        db.close()
+        all_records, next_cursor, chain_hashes = await db.run_sync(
+            load_page, limit, cursor, transaction_type, min_score, max_score
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # LIMIT chain data to the top 5. Rows whose timestamp/gas were already
+        # written back are served from the DB; the rest go through the
+        # receipt cache, which only calls the RPC provider on a miss
+        recent = {}
+        lookups = []
+        for record in all_records[:CHAIN_LOOKUP_LIMIT]:
+            chain_hash = chain_hash_for(record, chain_hashes)
+            if not chain_hash:
+                continue
+            if record.blockchain_timestamp is not None and record.gas_used is not None:
+                recent[record.id] = stored_chain_data(record, chain_hash)
+            else:
+                lookups.append(chain_hash)
+        chain_by_hash = await get_receipt_cache().get_many(lookups) if lookups else {}
 
         response_data = []
         
         # Loop through records
-        # LIMIT chain lookups to the top 5 to prevent timeouts
         for index, record in enumerate(all_records):
             chain_data = None
-            
-            # Only check blockchain for the most recent 5 records
-            # and only if they have a valid 0x hash
-            if index < 5 and record.tx_hash and record.tx_hash.startswith("0x"):
-                try:
-                    chain_data = get_onchain_fraud_data(record.tx_hash)
-                except Exception as e:
-                    print(f"Error fetching chain data for {record.tx_hash}: {e}")
+            if index < CHAIN_LOOKUP_LIMIT:
+                chain_data = recent.get(record.id) or chain_by_hash.get(chain_hash_for(record, chain_hashes))
 
             item = {
                 "id": record.id,
@@ -47,7 +143,8 @@ def get_dashboard_stats():
         
         return {
             "total_records": len(response_data),
-            "records": response_data
+            "records": response_data,
+            "next_cursor": next_cursor
         }
         
     except Exception as e:
@@ -55,5 +152,57 @@ def get_dashboard_stats():
         return {
             "total_records": 0,
             "records": [],
+            "next_cursor": None,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+
+@router.get("/summary")
+async def get_dashboard_summary(transaction_type: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """
+    Record counts, 10-bin score histogram and per-type fraud rate.
+    Read from the score rollup, so the cost does not grow with the log.
+    """
+    return await db.run_sync(get_summary, transaction_type)
+
+
+@router.get("/stream")
+async def stream_dashboard_updates(request: Request):
+    """
+    Server-Sent Events stream for the dashboard.
+
+    Starts with a "snapshot" event (summary + newest records), then pushes
+    "created" events with the new row and its summary delta and "updated"
+    events as FraudLogs are committed. "resync" asks the client to reload.
+
+    The queue subscribes before the snapshot is read, so rows committed in
+    between are both in the snapshot and queued; their "created" events are
+    dropped here.
+    """
+    queue = broadcaster.subscribe()
+
+    async def events():
+        try:
+            # Short-lived session: the stream itself holds no connection
+            async with AsyncSessionLocal() as db:
+                snapshot = await db.run_sync(load_snapshot)
+            yield format_sse({"id": 0, "event": "snapshot", "data": snapshot})
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if already_in_snapshot(message, snapshot["last_id"]):
+                    continue
+                yield format_sse(message)
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
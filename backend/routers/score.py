@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException
+from schema.fraud import BatchScoreRequest, BatchScoreResponse
+from services.ai_service import detect_fraud_batch
+
+router = APIRouter(prefix="/score", tags=["Scoring"])
+
+VALID_TYPES = ["vehicle", "bank", "ecommerce", "ethereum"]
+
+
+@router.post("/batch", response_model=BatchScoreResponse)
+def score_batch(request: BatchScoreRequest):
+    """
+    Score a batch of transactions with a single model call.
+    Scores are returned in the same order as the input records.
+    """
+    if request.transaction_type not in VALID_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid transaction_type")
+    
+    result = detect_fraud_batch(request.records, request.transaction_type)
+    
+    if not result.get("success", False):
+        raise HTTPException(status_code=500, detail=result.get("error", "Scoring failed"))
+    
+    return BatchScoreResponse(
+        success=True,
+        transaction_type=request.transaction_type,
+        total_records=len(result["fraud_scores"]),
+        fraud_scores=result["fraud_scores"],
+        model_version=result["model_version"]
+    )
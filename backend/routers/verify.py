@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import get_db
+from services.anchor_service import verify_fraud_log
+
+router = APIRouter(prefix="/verify", tags=["Verification"])
+
+
+class VerifyResponse(BaseModel):
+    database_id: int
+    verified: bool                 # proof recomputed from the DB row matches the root
+    anchored: bool                 # root confirmed on-chain
+    record_hash: str               # argument to the contract's verifyInclusion
+    leaf_hash: str
+    leaf_index: int
+    proof: List[str]
+    merkle_root: str
+    batch_size: int
+    anchor_tx: Optional[str] = None
+    anchored_at: Optional[int] = None
+
+
+@router.get("/{database_id}", response_model=VerifyResponse)
+async def verify_record(database_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Check a logged detection against its anchored Merkle root.
+    Runs offline from the stored inclusion proof; no chain call is made.
+    """
+    result = await db.run_sync(verify_fraud_log, database_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Record is not part of an anchored batch")
+    return VerifyResponse(**result)
@@ -11,6 +11,12 @@ class HTMLFormInput(BaseModel):
     form_data: Dict  # Raw form data as key-value pairs
 
 
+class BatchScoreRequest(BaseModel):
+    """Input schema for batch scoring."""
+    transaction_type: str  # "vehicle", "bank", "ecommerce", or "ethereum"
+    records: List[Dict]    # Raw transactions as key-value pairs
+
+
 # ============= Output Schemas =============
 
 class ModelScoreDetail(BaseModel):
@@ -28,6 +34,15 @@ class FraudDetectionResponse(BaseModel):
     database_id: Optional[int] = None
 
 
+class BatchScoreResponse(BaseModel):
+    """Response from batch scoring endpoint."""
+    success: bool
+    transaction_type: str
+    total_records: int
+    fraud_scores: List[int]
+    model_version: Optional[str] = None
+
+
 class TxIndex(BaseModel):
     """Transaction record index."""
     tx_hash: str
@@ -1,20 +1,120 @@
-import joblib
+import hashlib
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
-from typing import Dict, Tuple
-from math import ceil, exp
-from utils.load_models import (
-    load_model_vehicle,
-    load_model_bank,
-    load_model_ecommerce,
-    load_model_eth
-)
+from typing import Dict, List
+from utils.load_models import ModelRegistry, predict_dense
+from services.shadow_service import ShadowScorer, ShadowStore
 from utils.transforms import (
     transform_vehicle_fraud_data,
     transform_bank_fraud_data,
     transform_ecommerce_fraud_data,
     transform_ethereum_fraud_data
 )
+from utils.fast_transforms import records_to_matrix
+
+
+def predict_fraud_probability(model, features) -> np.ndarray:
+    """Class-1 probability per row of a FeatureLayout matrix or transformed DataFrame."""
+    if isinstance(features, np.ndarray):
+        return predict_dense(model, features)[:, 1]
+    # Named columns: a feature mismatch here should still warn
+    return model.predict_proba(features)[:, 1]
+
+
+def calculate_fraud_scores(probabilities) -> np.ndarray:
+    """
+    Map fraud probabilities (0-1) to integer fraud scores (0-100).
+
+    Piecewise-linear: [0, 0.75) -> [0, 50), [0.75, 0.85) -> [50, 80),
+    [0.85, 1] -> [80, 100]. Works on a whole batch at once.
+    """
+    p = np.asarray(probabilities, dtype=np.float64)
+    scores = np.piecewise(
+        p,
+        [p < 0.75, (p >= 0.75) & (p < 0.85), p >= 0.85],
+        [
+            lambda x: (x / 0.75) * 50,
+            lambda x: 50 + ((x - 0.75) / 0.10) * 30,
+            lambda x: 80 + ((x - 0.85) / 0.15) * 20,
+        ],
+    )
+    return np.ceil(scores).astype(int)
+
+
+def feature_digests(matrix: np.ndarray) -> List[bytes]:
+    """
+    Canonical hash of every row of an aligned feature matrix.
+    Rows are hashed as float32 with -0.0 folded into 0.0 and a single NaN
+    bit pattern, so equal feature vectors always hash the same.
+    """
+    rows = np.ascontiguousarray(matrix, dtype=np.float32) + np.float32(0.0)
+    rows[np.isnan(rows)] = np.nan
+    return [hashlib.blake2b(row.tobytes(), digest_size=16).digest() for row in rows]
+
+
+class PredictionCache:
+    """
+    Bounded LRU of fraud probabilities.
+
+    Keys are (transaction_type, registry load token, feature digest), so
+    a reloaded model never serves its predecessor's results, even when
+    both carry the same version name; invalidate() additionally frees the
+    old entries when a model is reloaded.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get_many(self, keys) -> List:
+        """Cached probability per key, None for misses."""
+        values = []
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is None:
+                    self._counters["misses"] += 1
+                else:
+                    self._data.move_to_end(key)
+                    self._counters["hits"] += 1
+                values.append(value)
+        return values
+
+    def put_many(self, items):
+        with self._lock:
+            for key, value in items:
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, transaction_type: str = None):
+        """Drop every entry, or only those of one transaction type."""
+        with self._lock:
+            if transaction_type is None:
+                dropped = len(self._data)
+                self._data.clear()
+            else:
+                stale = [k for k in self._data if k[0] == transaction_type]
+                dropped = len(stale)
+                for key in stale:
+                    del self._data[key]
+            self._counters["invalidations"] += dropped
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                **self._counters,
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0
+            }
 
 
 class FraudDetectionService:
@@ -22,14 +122,17 @@ class FraudDetectionService:
     Single-model fraud detection service.
     """
     
-    def __init__(self):
-        """Load all 4 models and their feature lists."""
-        self.models = {
-            "vehicle": load_model_vehicle(),
-            "bank": load_model_bank(),
-            "ecommerce": load_model_ecommerce(),
-            "ethereum": load_model_eth()
-        }
+    def __init__(self, registry: ModelRegistry = None, cache_size: int = 0):
+        """
+        Attach the model registry; models and layouts load on first use.
+        cache_size > 0 enables a PredictionCache of that many rows.
+        """
+        self.models = registry or ModelRegistry()
+        self.cache = PredictionCache(cache_size) if cache_size > 0 else None
+        if self.cache is not None:
+            self.models.add_reload_listener(self.cache.invalidate)
+        # Challenger scoring off the request path (see enable_shadow)
+        self.shadow = None
         self.transforms = {
             "vehicle": transform_vehicle_fraud_data,
             "bank": transform_bank_fraud_data,
@@ -46,46 +149,27 @@ class FraudDetectionService:
             raise ValueError(f"Unknown transaction type: {transaction_type}")
         
         try:
-            # 1. Unpack model and expected feature list
-            model, expected_features = self.models[transaction_type]
+            # 1. Unpack model and its compiled feature layout (lazy-loaded)
+            (model, layout), version, load_token = self.models.get_serving(transaction_type)
             transform_fn = self.transforms[transaction_type]
             
-            # 2. Convert to DataFrame
-            df = pd.DataFrame([transaction_data])
-            
-            # 3. Transform data WITHOUT feature selection (get all transformed columns)
-            transformed_data = transform_fn(df, selected_features=None)
+            # 2. Transform and align to the model's expected features
+            transformed_data = self._prepare_batch(
+                [transaction_data], transaction_type, transform_fn, layout
+            )
             
-            # 4. Reorder/select columns to match model's expected features
-            if expected_features is not None:
-                # Add missing features as 0
-                for feature in expected_features:
-                    if feature not in transformed_data.columns:
-                        transformed_data[feature] = 0
-                
-                # Select only expected features in the EXACT order
-                transformed_data = transformed_data[expected_features]
-            
-            # 5. Get probability prediction (continuous score between 0 and 1)
+            # 3. Get probability prediction (continuous score between 0 and 1)
             # predict_proba returns [[prob_class_0, prob_class_1]]
             # We want the probability of fraud (class 1), which is index [:, 1]
-            fraud_probability = model.predict_proba(transformed_data)[0, 1]
-            
-            # 6. Convert probability to score (0-100 continuous scale)
-            # This gives a more robust and granular fraud score
-            calculate_score = lambda p: (
-                (p / 0.75) * 50 if p < 0.75 else 
-                50 + ((p - 0.75) / 0.10) * 30 if p < 0.85 else 
-                80 + ((p - 0.85) / 0.15) * 20
-                )
-
-
-            fraud_score = ceil(calculate_score(fraud_probability))
+            fraud_probability = self._predict(model, load_token, transaction_type, transformed_data)
             
+            # 4. Convert probability to score (0-100 continuous scale)
+            fraud_score = int(calculate_fraud_scores(fraud_probability)[0])
             
             return {
                 "fraud_score": fraud_score,
                 "transaction_type": transaction_type,
+                "model_version": version,
                 "success": True
             }
         
@@ -99,29 +183,174 @@ class FraudDetectionService:
                 "success": False,
                 "error": str(e)
             }
+    
+    def detect_fraud_batch(self, records: List[Dict], transaction_type: str) -> Dict:
+        """
+        Detect fraud for a batch of transactions.
+        The whole batch is transformed into one matrix and scored with a
+        single predict_proba call.
+        """
+        if transaction_type not in self.models:
+            raise ValueError(f"Unknown transaction type: {transaction_type}")
+        
+        if not records:
+            return {
+                "fraud_scores": [],
+                "transaction_type": transaction_type,
+                "success": True
+            }
+        
+        try:
+            (model, layout), version, load_token = self.models.get_serving(transaction_type)
+            transform_fn = self.transforms[transaction_type]
+            
+            transformed_data = self._prepare_batch(
+                records, transaction_type, transform_fn, layout
+            )
+            fraud_probabilities = self._predict(model, load_token, transaction_type, transformed_data)
+            
+            return {
+                "fraud_scores": calculate_fraud_scores(fraud_probabilities).tolist(),
+                "transaction_type": transaction_type,
+                "model_version": version,
+                "success": True
+            }
+        
+        except Exception as e:
+            print(f"Error in detect_fraud_batch for {transaction_type}: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return {
+                "fraud_scores": [],
+                "transaction_type": transaction_type,
+                "success": False,
+                "error": str(e)
+            }
+    
+    def enable_shadow(self, challengers: Dict[str, str], directory: str, max_pending: int = 1000) -> ShadowScorer:
+        """
+        Score copies of requests with challenger model versions
+        ({transaction_type: version}) in the background.
+        """
+        if self.shadow is not None:
+            self.shadow.shutdown(wait=False)
+        self.shadow = ShadowScorer(self, ShadowStore(directory), challengers, max_pending=max_pending)
+        return self.shadow
+    
+    def score_with(self, entry, records: List[Dict], transaction_type: str) -> np.ndarray:
+        """Fraud scores from a specific (model, layout), bypassing the prediction cache."""
+        model, layout = entry
+        features = self._prepare_batch(records, transaction_type, self.transforms[transaction_type], layout)
+        return calculate_fraud_scores(predict_fraud_probability(model, features))
+    
+    def _predict(self, model, load_token, transaction_type, features) -> np.ndarray:
+        """Fraud probability per row; only rows missing from the cache reach the model."""
+        if self.cache is None or not isinstance(features, np.ndarray):
+            return predict_fraud_probability(model, features)
+        
+        keys = [(transaction_type, load_token, digest) for digest in feature_digests(features)]
+        cached = self.cache.get_many(keys)
+        misses = [i for i, value in enumerate(cached) if value is None]
+        probabilities = np.array([0.0 if value is None else value for value in cached])
+        if misses:
+            fresh = predict_fraud_probability(model, features[misses])
+            probabilities[misses] = fresh
+            self.cache.put_many(zip([keys[i] for i in misses], fresh.tolist()))
+        return probabilities
+    
+    @staticmethod
+    def _prepare_batch(records: List[Dict], transaction_type: str, transform_fn, layout):
+        """Transform raw rows and write them into the model's dense feature matrix."""
+        # Fast path: map record dicts straight into a zeroed float32 matrix in
+        # the model's feature order; missing features stay 0
+        if layout is not None:
+            return records_to_matrix(records, transaction_type, layout)
+        
+        # No compiled layout: fall back to the pandas transform
+        return transform_fn(pd.DataFrame(records), selected_features=None)
 
 
 # Global service instance
 _service = None
+_service_lock = threading.Lock()
 
 
-def initialize_service():
-    """Initialize fraud detection service."""
+def initialize_service(preload=None, warmup_rows: int = 0, max_workers: int = 4,
+                       cache_size: int = 0, keep_versions: int = 3):
+    """
+    Initialize fraud detection service.
+    
+    preload: transaction types to load in parallel right away; the
+    remaining types are loaded lazily on first request.
+    cache_size: rows kept in the prediction cache (0 disables it).
+    keep_versions: model versions per type kept in memory after a hot swap.
+    """
     global _service
-    _service = FraudDetectionService()
+    with _service_lock:
+        registry = ModelRegistry(warmup_rows=warmup_rows, keep_versions=keep_versions)
+        _service = FraudDetectionService(registry, cache_size=cache_size)
+    if preload:
+        _service.models.load_all(preload, max_workers=max_workers)
+    return _service
 
 
 def get_service() -> FraudDetectionService:
     """Get or initialize the fraud detection service."""
     global _service
     if _service is None:
-        initialize_service()
+        with _service_lock:
+            if _service is None:
+                _service = FraudDetectionService()
     return _service
 
 
+def get_model_stats() -> Dict:
+    """Per-model load time, memory and warm-up stats."""
+    return get_service().models.stats()
+
+
+def get_cache_stats() -> Dict:
+    """Prediction cache counters ({"enabled": False} when disabled)."""
+    cache = get_service().cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+def enable_shadow_scoring(challengers: Dict[str, str], directory: str, max_pending: int = 1000):
+    """Start challenger scoring on the global service (no-op without challengers)."""
+    if not challengers:
+        return None
+    return get_service().enable_shadow(challengers, directory, max_pending=max_pending)
+
+
+def get_shadow_summary(transaction_type: str = None) -> Dict:
+    """Shadow scorer counters plus per-comparison score deltas and timing."""
+    shadow = get_service().shadow
+    if shadow is None:
+        return {"enabled": False}
+    return {"enabled": True, **shadow.stats(), "comparisons": shadow.store.summary(transaction_type)}
+
+
 def detect_fraud(transaction_data: Dict, transaction_type: str) -> Dict:
     """
     Main entry point for fraud detection.
     """
     service = get_service()
-    return service.detect_fraud(transaction_data, transaction_type)
\ No newline at end of file
+    result = service.detect_fraud(transaction_data, transaction_type)
+    if service.shadow is not None and result.get("success"):
+        service.shadow.submit([transaction_data], transaction_type,
+                              [result["fraud_score"]], result["model_version"])
+    return result
+
+
+def detect_fraud_batch(records: List[Dict], transaction_type: str) -> Dict:
+    """
+    Batch entry point for fraud detection.
+    """
+    service = get_service()
+    result = service.detect_fraud_batch(records, transaction_type)
+    if service.shadow is not None and result.get("success") and records:
+        service.shadow.submit(records, transaction_type,
+                              result["fraud_scores"], result["model_version"])
+    return result
\ No newline at end of file
@@ -0,0 +1,73 @@
+from typing import List, Optional
+from models.fraud_log import FraudLog
+from models.chain_outbox import ChainOutbox, STATUS_BATCHED, STATUS_CONFIRMED
+from models.anchor_batch import AnchorBatch
+from models.merkle_proof import MerkleProof
+from utils.merkle import (
+    fraud_leaf, build_tree, leaf_from_record, merkle_root, merkle_proof, record_hash, verify_record
+)
+
+
+def to_hex(value: bytes) -> str:
+    return "0x" + bytes(value).hex()
+
+
+def from_hex(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+def build_anchor_batch(db, entries: List[ChainOutbox]) -> AnchorBatch:
+    """
+    Group pending outbox entries into one Merkle batch.
+    Adds the AnchorBatch and one MerkleProof per entry; the caller commits.
+    """
+    leaves = [fraud_leaf(e.reference_id, e.fraud_score, e.model_version) for e in entries]
+    levels = build_tree(leaves)
+
+    batch = AnchorBatch(merkle_root=to_hex(merkle_root(levels)), batch_size=len(entries))
+    db.add(batch)
+    db.flush()
+
+    for index, entry in enumerate(entries):
+        db.add(MerkleProof(
+            fraud_log_id=entry.fraud_log_id,
+            batch_id=batch.id,
+            leaf_index=index,
+            leaf_hash=to_hex(leaves[index]),
+            proof=[to_hex(h) for h in merkle_proof(levels, index)]
+        ))
+        entry.anchor_batch_id = batch.id
+        entry.status = STATUS_BATCHED
+    return batch
+
+
+def verify_fraud_log(db, fraud_log_id: int) -> Optional[dict]:
+    """
+    Check a FraudLog against its batch root using only the stored proof.
+
+    The leaf is recomputed from the FraudLog row itself, so an edited score,
+    version or reference no longer matches the anchored root.
+    Returns None if the record is not part of a Merkle batch.
+    """
+    fraud_log = db.get(FraudLog, fraud_log_id)
+    proof_row = db.query(MerkleProof).filter(MerkleProof.fraud_log_id == fraud_log_id).first()
+    if fraud_log is None or proof_row is None:
+        return None
+    batch = db.get(AnchorBatch, proof_row.batch_id)
+
+    record = record_hash(fraud_log.tx_hash, int(fraud_log.fraud_score), fraud_log.model_version)
+    proof = [from_hex(h) for h in proof_row.proof]
+    return {
+        "database_id": fraud_log_id,
+        "verified": verify_record(record, proof, from_hex(batch.merkle_root)),
+        # What the contract's verifyInclusion takes, along with proof and merkle_root
+        "record_hash": to_hex(record),
+        "leaf_hash": to_hex(leaf_from_record(record)),
+        "leaf_index": proof_row.leaf_index,
+        "proof": proof_row.proof,
+        "merkle_root": batch.merkle_root,
+        "batch_size": batch.batch_size,
+        "anchored": batch.status == STATUS_CONFIRMED,
+        "anchor_tx": batch.chain_tx_hash,
+        "anchored_at": batch.blockchain_timestamp
+    }
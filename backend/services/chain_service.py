@@ -1,7 +1,9 @@
 import json
+import threading
 from web3 import Web3
-from core.web3_client import w3, contract
-from core.config import PRIVATE_KEY 
+from web3.exceptions import TransactionNotFound
+from core.web3_client import w3, contract, get_async_w3, get_async_contract
+from core.config import PRIVATE_KEY
 
 def get_onchain_fraud_data(tx_hash: str):
     """Read fraud data from blockchain."""
@@ -16,12 +18,167 @@ def get_onchain_fraud_data(tx_hash: str):
             "model_version": event["modelVersion"],
             "timestamp": block.timestamp,
             "gas_used": receipt.gasUsed,
+            "block_number": receipt.blockNumber,
             "tx_hash": tx_hash
         }
     except Exception as e:
         print(f"Error fetching chain data: {e}")
         return None
 
+class NonceManager:
+    """
+    In-process nonce allocator for one sender address.
+    
+    The next nonce is fetched from the chain once and then handed out from
+    a local counter under a lock, so concurrent writers get distinct,
+    gap-free nonces without an RPC round-trip each and several signed
+    transactions can be in flight at once. After a failed send or a
+    replacement the counter is dropped and re-read from the chain.
+    """
+    
+    def __init__(self, client, address):
+        self.client = client
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce = None
+    
+    def allocate(self, client=None) -> int:
+        client = client or self.client
+        with self._lock:
+            if self._next_nonce is None:
+                # 'pending' counts transactions already in the mempool
+                self._next_nonce = client.eth.get_transaction_count(self.address, 'pending')
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+    
+    async def allocate_async(self, client) -> int:
+        """allocate() for an AsyncWeb3 client; the chain read is awaited outside the lock."""
+        while True:
+            with self._lock:
+                if self._next_nonce is not None:
+                    nonce = self._next_nonce
+                    self._next_nonce += 1
+                    return nonce
+            count = await client.eth.get_transaction_count(self.address, 'pending')
+            with self._lock:
+                if self._next_nonce is None:
+                    self._next_nonce = count
+    
+    def resync(self):
+        """Forget the local counter; the next allocate() re-reads the chain."""
+        with self._lock:
+            self._next_nonce = None
+
+
+_nonce_managers = {}
+_nonce_managers_lock = threading.Lock()
+
+
+def _client_key(client):
+    # Sync and async clients of the same RPC endpoint share one counter;
+    # in-process providers (tests) are keyed by the client itself
+    endpoint = getattr(client.provider, 'endpoint_uri', None)
+    return str(endpoint) if endpoint else id(client)
+
+
+def get_nonce_manager(client, address) -> NonceManager:
+    """Shared NonceManager per (RPC endpoint, sender address)."""
+    key = (_client_key(client), address)
+    with _nonce_managers_lock:
+        manager = _nonce_managers.get(key)
+        if manager is None or (isinstance(key[0], int) and manager.client is not client):
+            manager = NonceManager(client, address)
+            _nonce_managers[key] = manager
+        return manager
+
+
+def _send_ledger_call(build_call, client=None, ledger=None, private_key=None):
+    """
+    Sign and broadcast one ledger call without waiting for it to be mined.
+    build_call(ledger) returns the contract function call to send.
+    Returns (transaction hash hex, nonce). Raises on any failure.
+    
+    client/ledger/private_key default to the configured Web3 client,
+    contract and key; tests pass a local chain instead.
+    """
+    client = client or w3
+    ledger = ledger or contract
+    private_key = private_key or PRIVATE_KEY
+    if not ledger:
+        raise RuntimeError("Contract not initialized.")
+    if not private_key:
+        raise RuntimeError("PRIVATE_KEY not found in config.")
+
+    # 1. Derive Sender Address
+    account = client.eth.account.from_key(private_key)
+    sender_address = account.address
+
+    # 2. Build Transaction
+    # Nonce comes from the local allocator, not an RPC per write
+    nonce_manager = get_nonce_manager(client, sender_address)
+    nonce = nonce_manager.allocate(client)
+    try:
+        tx = build_call(ledger).build_transaction({
+            'from': sender_address,
+            'nonce': nonce,
+            'gas': 2000000,
+            'gasPrice': client.to_wei('20', 'gwei')
+        })
+
+        # 3. Sign Transaction
+        signed_tx = client.eth.account.sign_transaction(tx, private_key)
+
+        # 4. Send Transaction
+        tx_hash = client.eth.send_raw_transaction(signed_tx.raw_transaction).to_0x_hex()
+        return tx_hash, nonce
+    except Exception:
+        # The nonce may not have reached the chain (or was already used);
+        # re-read it before the next write instead of leaving a gap
+        nonce_manager.resync()
+        raise
+
+
+def send_fraud_record(fraud_score: int, model_version: str, reference_id: str,
+                      client=None, ledger=None, private_key=None):
+    """
+    Sign and broadcast a logFraud transaction without waiting for it to be mined.
+    Returns (transaction hash hex, nonce). Raises on any failure.
+    """
+    # Convert Reference ID (String) to Bytes32 (Hash)
+    # Solidity 'bytes32' requires a fixed-length 32-byte hash
+    tx_hash_bytes = Web3.keccak(text=reference_id)
+
+    # Argument order: Hash -> Score -> Version
+    return _send_ledger_call(
+        lambda ledger: ledger.functions.logFraud(
+            tx_hash_bytes,       # Arg 1: bytes32 _transactionHash
+            int(fraud_score),    # Arg 2: uint256 _fraudScore
+            str(model_version)   # Arg 3: string memory _modelVersion
+        ),
+        client=client, ledger=ledger, private_key=private_key
+    )
+
+
+def send_anchor_root(merkle_root: bytes, batch_size: int,
+                     client=None, ledger=None, private_key=None):
+    """
+    Sign and broadcast an anchorBatch transaction committing a Merkle root.
+    Returns (transaction hash hex, nonce). Raises on any failure.
+    """
+    return _send_ledger_call(
+        lambda ledger: ledger.functions.anchorBatch(merkle_root, int(batch_size)),
+        client=client, ledger=ledger, private_key=private_key
+    )
+
+def get_receipt_if_mined(tx_hash: str, client=None):
+    """Return the receipt of a sent transaction, or None while it is still pending."""
+    client = client or w3
+    try:
+        return client.eth.get_transaction_receipt(tx_hash)
+    except TransactionNotFound:
+        return None
+
 def log_fraud_on_chain(fraud_score: int, model_version: str, reference_id: str):
     """
     Write fraud record to blockchain.
@@ -29,49 +186,112 @@ def log_fraud_on_chain(fraud_score: int, model_version: str, reference_id: str):
     if not contract:
         print("Error: Contract not initialized.")
         return None
-    
+
     if not PRIVATE_KEY:
         print("Error: PRIVATE_KEY not found in config.")
         return None
 
     try:
-        # 1. Derive Sender Address
-        account = w3.eth.account.from_key(PRIVATE_KEY)
-        sender_address = account.address
-        
-        # 2. Convert Reference ID (String) to Bytes32 (Hash)
-        # Solidity 'bytes32' requires a fixed-length 32-byte hash
-        tx_hash_bytes = w3.keccak(text=reference_id)
-        
         print(f"Mining transaction for Ref ID: {reference_id}...")
-        
-        # 3. Build Transaction (CORRECTED ORDER: Hash -> Score -> Version)
-        tx = contract.functions.logFraud(
-            tx_hash_bytes,       # Arg 1: bytes32 _transactionHash
-            int(fraud_score),    # Arg 2: uint256 _fraudScore
-            str(model_version)   # Arg 3: string memory _modelVersion
+        tx_hash, _ = send_fraud_record(fraud_score, model_version, reference_id)
+
+        # 6. Wait for Receipt
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        print(f"Transaction mined: {receipt.transactionHash.hex()}")
+
+        return receipt.transactionHash.hex()
+
+    except Exception as e:
+        print(f"Blockchain Write Error: {e}")
+        # Debugging aid
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+# ============= Async counterparts =============
+# Same behaviour as the functions above, on the shared AsyncWeb3 client, so
+# FastAPI handlers can await chain calls instead of blocking a worker thread.
+
+async def async_get_onchain_fraud_data(tx_hash: str, client=None, ledger=None):
+    """Read fraud data from blockchain (async)."""
+    try:
+        client = client or await get_async_w3()
+        ledger = ledger or await get_async_contract()
+        receipt = await client.eth.get_transaction_receipt(tx_hash)
+        block = await client.eth.get_block(receipt.blockNumber)
+        events = ledger.events.FraudLogged().process_receipt(receipt)
+        if not events: return None
+        event = events[0]["args"]
+        return {
+            "fraud_score": event["fraudScore"],
+            "model_version": event["modelVersion"],
+            "timestamp": block.timestamp,
+            "gas_used": receipt.gasUsed,
+            "block_number": receipt.blockNumber,
+            "tx_hash": tx_hash
+        }
+    except Exception as e:
+        print(f"Error fetching chain data: {e}")
+        return None
+
+
+async def async_send_fraud_record(fraud_score: int, model_version: str, reference_id: str,
+                                  client=None, ledger=None, private_key=None):
+    """
+    Sign and broadcast a logFraud transaction without waiting for it to be mined (async).
+    Returns (transaction hash hex, nonce). Raises on any failure.
+    """
+    client = client or await get_async_w3()
+    ledger = ledger or await get_async_contract()
+    private_key = private_key or PRIVATE_KEY
+    if not ledger:
+        raise RuntimeError("Contract not initialized.")
+    if not private_key:
+        raise RuntimeError("PRIVATE_KEY not found in config.")
+
+    sender_address = client.eth.account.from_key(private_key).address
+    nonce_manager = get_nonce_manager(client, sender_address)
+    nonce = await nonce_manager.allocate_async(client)
+    try:
+        tx = await ledger.functions.logFraud(
+            Web3.keccak(text=reference_id),
+            int(fraud_score),
+            str(model_version)
         ).build_transaction({
             'from': sender_address,
-            'nonce': w3.eth.get_transaction_count(sender_address),
+            'nonce': nonce,
             'gas': 2000000,
-            'gasPrice': w3.to_wei('20', 'gwei')
+            'gasPrice': Web3.to_wei('20', 'gwei')
         })
+        signed_tx = client.eth.account.sign_transaction(tx, private_key)
+        tx_hash = await client.eth.send_raw_transaction(signed_tx.raw_transaction)
+        return tx_hash.to_0x_hex(), nonce
+    except Exception:
+        nonce_manager.resync()
+        raise
 
-        # 4. Sign Transaction
-        signed_tx = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
 
-        # 5. Send Transaction
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        
-        # 6. Wait for Receipt
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+async def async_log_fraud_on_chain(fraud_score: int, model_version: str, reference_id: str,
+                                   client=None, ledger=None, private_key=None):
+    """
+    Write fraud record to blockchain and await the receipt (async).
+    """
+    try:
+        print(f"Mining transaction for Ref ID: {reference_id}...")
+        client = client or await get_async_w3()
+        tx_hash, _ = await async_send_fraud_record(
+            fraud_score, model_version, reference_id,
+            client=client, ledger=ledger, private_key=private_key
+        )
+
+        receipt = await client.eth.wait_for_transaction_receipt(tx_hash)
         print(f"Transaction mined: {receipt.transactionHash.hex()}")
-        
+
         return receipt.transactionHash.hex()
 
     except Exception as e:
         print(f"Blockchain Write Error: {e}")
-        # Debugging aid
         import traceback
         traceback.print_exc()
-        return None
\ No newline at end of file
+        return None
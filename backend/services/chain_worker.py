@@ -0,0 +1,491 @@
+import argparse
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+import requests
+from sqlalchemy import or_
+from web3.exceptions import ProviderConnectionError
+from core.config import PRIVATE_KEY
+from core.database import SessionLocal
+from core.web3_client import w3
+from models.fraud_log import FraudLog
+from models.chain_outbox import (
+    ChainOutbox,
+    STATUS_PENDING,
+    STATUS_SENT,
+    STATUS_CONFIRMED,
+    STATUS_FAILED,
+    STATUS_BATCHED
+)
+from models.anchor_batch import AnchorBatch
+from services.anchor_service import build_anchor_batch, from_hex
+from services.chain_service import (
+    send_fraud_record,
+    send_anchor_root,
+    get_receipt_if_mined,
+    get_nonce_manager
+)
+
+# Chain write modes
+MODE_TRANSACTION = "transaction"  # one logFraud transaction per decision
+MODE_BATCH = "batch"              # one anchorBatch (Merkle root) per window of decisions
+
+# The RPC provider could not be reached: says nothing about the row being sent
+CONNECTION_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    ProviderConnectionError
+)
+
+
+def is_connection_error(error: Exception) -> bool:
+    return isinstance(error, CONNECTION_ERRORS)
+
+
+def due(model):
+    """Filter for rows whose retry backoff has passed."""
+    return or_(model.next_attempt_at.is_(None), model.next_attempt_at <= datetime.utcnow())
+
+
+def requeue_failed(db) -> int:
+    """
+    Move failed outbox rows and anchor batches back to pending with a fresh
+    attempt count, e.g. after an outage outlasted the retries. The entries
+    of a requeued batch go back to batched. Returns how many outbox rows
+    were requeued.
+    """
+    retry = {"status": STATUS_PENDING, "attempts": 0, "next_attempt_at": None,
+             "chain_tx_hash": None, "nonce": None}
+    requeued = (
+        db.query(ChainOutbox)
+        .filter(ChainOutbox.status == STATUS_FAILED, ChainOutbox.anchor_batch_id.is_(None))
+        .update(retry, synchronize_session=False)
+    )
+    failed_batches = db.query(AnchorBatch.id).filter(AnchorBatch.status == STATUS_FAILED)
+    batch_ids = [batch_id for (batch_id,) in failed_batches]
+    if batch_ids:
+        requeued += (
+            db.query(ChainOutbox)
+            .filter(ChainOutbox.anchor_batch_id.in_(batch_ids))
+            .update({"status": STATUS_BATCHED, "chain_tx_hash": None}, synchronize_session=False)
+        )
+        db.query(AnchorBatch).filter(AnchorBatch.id.in_(batch_ids)).update(retry, synchronize_session=False)
+    db.commit()
+    return requeued
+
+
+def enqueue_fraud_record(db, fraud_log: FraudLog) -> ChainOutbox:
+    """
+    Queue an on-chain write for a FraudLog.
+    Call before db.commit() so the log and its outbox row commit together.
+    """
+    if fraud_log.id is None:
+        db.flush()
+    entry = ChainOutbox(
+        fraud_log_id=fraud_log.id,
+        reference_id=fraud_log.tx_hash,
+        fraud_score=int(fraud_log.fraud_score),
+        model_version=fraud_log.model_version,
+        status=STATUS_PENDING
+    )
+    db.add(entry)
+    return entry
+
+
+class ChainSubmissionWorker:
+    """
+    Background worker draining the chain outbox.
+
+    Each cycle signs and broadcasts pending rows without waiting for them
+    to be mined, with nonces from the shared NonceManager, so up to
+    max_in_flight transactions are pipelined. It then polls receipts of
+    sent rows and writes the block timestamp and gas used back to their
+    FraudLog.
+
+    In batch mode pending rows are instead collected until anchor_max_size
+    rows or anchor_window seconds have accumulated, hashed into a Merkle
+    tree and committed as a single anchorBatch transaction.
+
+    A send that fails is retried after retry_base seconds, doubling per
+    attempt up to retry_max, and marked failed after max_attempts (see
+    requeue_failed). If the RPC provider can't be reached at all, the
+    cycle stops at that row without using up an attempt and sending
+    pauses with the same backoff until a send goes through.
+    """
+
+    def __init__(self, session_factory=SessionLocal, client=None, ledger=None, private_key=None,
+                 poll_interval: float = 2.0, batch_size: int = 20, max_attempts: int = 5,
+                 max_in_flight: int = 16, mode: str = MODE_TRANSACTION,
+                 anchor_window: float = 30.0, anchor_max_size: int = 256,
+                 retry_base: float = 5.0, retry_max: float = 300.0):
+        if mode not in (MODE_TRANSACTION, MODE_BATCH):
+            raise ValueError(f"Unknown chain write mode: {mode}")
+        self.session_factory = session_factory
+        self.client = client
+        self.ledger = ledger
+        self.private_key = private_key
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.max_in_flight = max_in_flight
+        self.mode = mode
+        self.anchor_window = anchor_window
+        self.anchor_max_size = anchor_max_size
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        # Connection failures in a row, and time.monotonic() until sending resumes
+        self._outages = 0
+        self._paused_until = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ============= Lifecycle =============
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chain-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Chain worker error: {e}")
+                traceback.print_exc()
+            self._stop.wait(self.poll_interval)
+
+    # ============= Processing =============
+
+    def run_once(self) -> dict:
+        """Run one submit + confirm cycle. Returns counts for logging/tests."""
+        if self.mode == MODE_BATCH:
+            return {
+                "submitted": self.anchor_pending(),
+                "confirmed": self.confirm_anchors()
+            }
+        return {
+            "submitted": self.submit_pending(),
+            "confirmed": self.confirm_sent()
+        }
+
+    def retry_delay(self, attempts: int) -> float:
+        """Seconds to wait before the next try after `attempts` failures."""
+        return min(self.retry_base * 2 ** max(attempts - 1, 0), self.retry_max)
+
+    def is_paused(self) -> bool:
+        """True while sending is backed off after the RPC provider was unreachable."""
+        return time.monotonic() < self._paused_until
+
+    def _send_failed(self, row, error: Exception) -> bool:
+        """
+        Record a failed send of an outbox row or anchor batch.
+        Returns True if the provider was unreachable and the cycle should stop.
+        """
+        row.last_error = str(error)[:500]
+        if is_connection_error(error):
+            self._outages += 1
+            self._paused_until = time.monotonic() + self.retry_delay(self._outages)
+            return True
+        row.attempts = (row.attempts or 0) + 1
+        if row.attempts >= self.max_attempts:
+            row.status = STATUS_FAILED
+        else:
+            row.next_attempt_at = datetime.utcnow() + timedelta(seconds=self.retry_delay(row.attempts))
+        return False
+
+    def _send_succeeded(self, row):
+        row.next_attempt_at = None
+        self._outages = 0
+
+    def submit_pending(self) -> int:
+        """Sign and send pending rows; returns how many were broadcast."""
+        if self.is_paused():
+            return 0
+        db = self.session_factory()
+        submitted = 0
+        try:
+            # Cap unconfirmed transactions so a stalled chain can't build an
+            # unbounded backlog of nonces
+            in_flight = db.query(ChainOutbox).filter(ChainOutbox.status == STATUS_SENT).count()
+            capacity = min(self.batch_size, self.max_in_flight - in_flight)
+            if capacity <= 0:
+                return 0
+
+            pending = (
+                db.query(ChainOutbox)
+                .filter(ChainOutbox.status == STATUS_PENDING, due(ChainOutbox))
+                .order_by(ChainOutbox.id)
+                .limit(capacity)
+                .all()
+            )
+            # Sent in nonce order without waiting for receipts: the
+            # transactions are pipelined instead of mined one-after-another
+            for entry in pending:
+                try:
+                    entry.chain_tx_hash, entry.nonce = send_fraud_record(
+                        entry.fraud_score,
+                        entry.model_version,
+                        entry.reference_id,
+                        client=self.client,
+                        ledger=self.ledger,
+                        private_key=self.private_key
+                    )
+                    entry.status = STATUS_SENT
+                    self._send_succeeded(entry)
+                    submitted += 1
+                except Exception as e:
+                    unreachable = self._send_failed(entry, e)
+                    print(f"✗ Blockchain submit failed for outbox {entry.id}: {e}")
+                    if unreachable:
+                        db.commit()
+                        break
+                # Commit per row so a broadcast hash is never lost to a later failure
+                db.commit()
+        finally:
+            db.close()
+        return submitted
+
+    def confirm_sent(self) -> int:
+        """Check receipts of sent rows; returns how many were confirmed."""
+        db = self.session_factory()
+        confirmed = 0
+        try:
+            sent = (
+                db.query(ChainOutbox)
+                .filter(ChainOutbox.status == STATUS_SENT)
+                .order_by(ChainOutbox.id)
+                .limit(self.batch_size)
+                .all()
+            )
+            if not sent:
+                return 0
+
+            client = self.client or w3
+            # Read before the receipts: a nonce mined by then whose receipt is
+            # still missing can only belong to a replacement transaction
+            mined_nonce = self._mined_nonce(client)
+            for entry in sent:
+                receipt = get_receipt_if_mined(entry.chain_tx_hash, client=self.client)
+                if receipt is None:
+                    # Replaced or dropped: resend it with a fresh nonce
+                    if entry.nonce is not None and mined_nonce is not None and entry.nonce < mined_nonce:
+                        print(f"Outbox {entry.id}: nonce {entry.nonce} replaced, requeueing")
+                        entry.status = STATUS_PENDING
+                        entry.chain_tx_hash = None
+                        entry.nonce = None
+                        db.commit()
+                        self._resync_nonces(client)
+                    continue
+                if receipt.status != 1:
+                    entry.status = STATUS_FAILED
+                    entry.last_error = "Transaction reverted"
+                    db.commit()
+                    continue
+
+                block = client.eth.get_block(receipt.blockNumber)
+                fraud_log = db.get(FraudLog, entry.fraud_log_id)
+                if fraud_log is not None:
+                    fraud_log.blockchain_timestamp = block.timestamp
+                    fraud_log.gas_used = receipt.gasUsed
+                entry.status = STATUS_CONFIRMED
+                db.commit()
+                confirmed += 1
+                print(f"✓ Blockchain TX confirmed: {entry.chain_tx_hash}")
+        finally:
+            db.close()
+        return confirmed
+
+    # ============= Batch mode =============
+
+    def seal_batch(self, db, force: bool = False):
+        """
+        Seal pending rows into a Merkle batch once the size or time window
+        is reached (or unconditionally with force). Returns the batch or None.
+        """
+        pending = (
+            db.query(ChainOutbox)
+            .filter(ChainOutbox.status == STATUS_PENDING)
+            .order_by(ChainOutbox.id)
+            .limit(self.anchor_max_size)
+            .all()
+        )
+        if not pending:
+            return None
+        window_start = datetime.utcnow() - timedelta(seconds=self.anchor_window)
+        if not force and len(pending) < self.anchor_max_size and pending[0].created_at > window_start:
+            return None
+
+        batch = build_anchor_batch(db, pending)
+        db.commit()
+        print(f"Sealed Merkle batch {batch.id} with {batch.batch_size} records")
+        return batch
+
+    def anchor_pending(self, force: bool = False) -> int:
+        """Seal a batch if due, then send pending roots; returns how many were broadcast."""
+        db = self.session_factory()
+        submitted = 0
+        try:
+            self.seal_batch(db, force=force)
+            if self.is_paused():
+                return 0
+
+            in_flight = db.query(AnchorBatch).filter(AnchorBatch.status == STATUS_SENT).count()
+            capacity = self.max_in_flight - in_flight
+            if capacity <= 0:
+                return 0
+
+            pending = (
+                db.query(AnchorBatch)
+                .filter(AnchorBatch.status == STATUS_PENDING, due(AnchorBatch))
+                .order_by(AnchorBatch.id)
+                .limit(capacity)
+                .all()
+            )
+            for batch in pending:
+                entries = db.query(ChainOutbox).filter(ChainOutbox.anchor_batch_id == batch.id)
+                try:
+                    batch.chain_tx_hash, batch.nonce = send_anchor_root(
+                        from_hex(batch.merkle_root),
+                        batch.batch_size,
+                        client=self.client,
+                        ledger=self.ledger,
+                        private_key=self.private_key
+                    )
+                    batch.status = STATUS_SENT
+                    self._send_succeeded(batch)
+                    entries.update({"status": STATUS_SENT, "chain_tx_hash": batch.chain_tx_hash})
+                    submitted += 1
+                except Exception as e:
+                    unreachable = self._send_failed(batch, e)
+                    if batch.status == STATUS_FAILED:
+                        entries.update({"status": STATUS_FAILED, "last_error": batch.last_error})
+                    print(f"✗ Merkle root submit failed for batch {batch.id}: {e}")
+                    if unreachable:
+                        db.commit()
+                        break
+                db.commit()
+        finally:
+            db.close()
+        return submitted
+
+    def confirm_anchors(self) -> int:
+        """Check receipts of sent roots; returns how many batches were confirmed."""
+        db = self.session_factory()
+        confirmed = 0
+        try:
+            sent = (
+                db.query(AnchorBatch)
+                .filter(AnchorBatch.status == STATUS_SENT)
+                .order_by(AnchorBatch.id)
+                .limit(self.batch_size)
+                .all()
+            )
+            if not sent:
+                return 0
+
+            client = self.client or w3
+            mined_nonce = self._mined_nonce(client)
+            for batch in sent:
+                entries = db.query(ChainOutbox).filter(ChainOutbox.anchor_batch_id == batch.id)
+                receipt = get_receipt_if_mined(batch.chain_tx_hash, client=self.client)
+                if receipt is None:
+                    if batch.nonce is not None and mined_nonce is not None and batch.nonce < mined_nonce:
+                        print(f"Anchor batch {batch.id}: nonce {batch.nonce} replaced, requeueing")
+                        batch.status = STATUS_PENDING
+                        batch.chain_tx_hash = None
+                        batch.nonce = None
+                        entries.update({"status": STATUS_BATCHED, "chain_tx_hash": None})
+                        db.commit()
+                        self._resync_nonces(client)
+                    continue
+                if receipt.status != 1:
+                    batch.status = STATUS_FAILED
+                    batch.last_error = "Transaction reverted"
+                    entries.update({"status": STATUS_FAILED, "last_error": batch.last_error})
+                    db.commit()
+                    continue
+
+                block = client.eth.get_block(receipt.blockNumber)
+                batch.blockchain_timestamp = block.timestamp
+                batch.gas_used = receipt.gasUsed
+                # Each record carries its share of the single anchor transaction
+                gas_share = receipt.gasUsed // max(batch.batch_size, 1)
+                fraud_log_ids = [e.fraud_log_id for e in entries]
+                for fraud_log in db.query(FraudLog).filter(FraudLog.id.in_(fraud_log_ids)):
+                    fraud_log.blockchain_timestamp = block.timestamp
+                    fraud_log.gas_used = gas_share
+                entries.update({"status": STATUS_CONFIRMED})
+                batch.status = STATUS_CONFIRMED
+                db.commit()
+                confirmed += 1
+                print(f"✓ Merkle root anchored: {batch.merkle_root} ({batch.batch_size} records)")
+        finally:
+            db.close()
+        return confirmed
+
+    def _sender_address(self, client):
+        private_key = self.private_key or PRIVATE_KEY
+        return client.eth.account.from_key(private_key).address if private_key else None
+
+    def _mined_nonce(self, client):
+        """Number of the sender's transactions already mined ('latest' block)."""
+        address = self._sender_address(client)
+        return client.eth.get_transaction_count(address, 'latest') if address else None
+
+    def _resync_nonces(self, client):
+        address = self._sender_address(client)
+        if address:
+            get_nonce_manager(client, address).resync()
+
+
+# Global worker instance
+_worker = None
+
+
+def start_chain_worker(**kwargs) -> ChainSubmissionWorker:
+    """Start the global chain worker (idempotent)."""
+    global _worker
+    if _worker is None:
+        _worker = ChainSubmissionWorker(**kwargs)
+    _worker.start()
+    return _worker
+
+
+def stop_chain_worker():
+    """Stop the global chain worker if it is running."""
+    if _worker is not None:
+        _worker.stop()
+
+
+def main(argv=None):
+    """
+    Outbox maintenance from the command line (from the repo root):
+        PYTHONPATH=backend python -m services.chain_worker --requeue-failed
+    """
+    parser = argparse.ArgumentParser(description="Chain outbox maintenance")
+    parser.add_argument('--requeue-failed', action='store_true',
+                        help='move failed outbox rows and anchor batches back to pending so the worker sends them again')
+    args = parser.parse_args(argv)
+    if not args.requeue_failed:
+        parser.print_help()
+        return
+    db = SessionLocal()
+    try:
+        print(f"✓ Requeued {requeue_failed(db)} failed outbox rows (entries of failed anchor batches included)")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
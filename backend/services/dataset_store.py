@@ -0,0 +1,168 @@
+import os
+import threading
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+
+TEST_DATA_FILES = {
+    "vehicle": "data/test_data/vehicle_test_data.csv",
+    "bank": "data/test_data/bank_test_data.csv",
+    "ecommerce": "data/test_data/ecommerce_test_data.csv",
+    "ethereum": "data/test_data/ethereum_test_data.csv"
+}
+
+LABEL_COLUMNS = {
+    "vehicle": "FraudFound_P",
+    "bank": "fraud_bool",
+    "ecommerce": "Is Fraudulent",
+    "ethereum": "Fraud"
+}
+
+
+def find_label_column(columns, transaction_type: str) -> str:
+    """Known label column for the type, else the first column named like 'fraud'."""
+    expected = LABEL_COLUMNS.get(transaction_type)
+    if expected in columns:
+        return expected
+    for col in columns:
+        if "fraud" in col.lower():
+            return col
+    return LABEL_COLUMNS["vehicle"]
+
+
+class LabeledDataset:
+    """
+    One test dataset held as an object matrix plus pre-split row indices.
+
+    Labels are normalized once at load (1/0, "1"/"0", booleans), so a
+    sample is an index draw followed by building k row dicts.
+    """
+
+    def __init__(self, frame: pd.DataFrame, label_column: str, source: str = None, mtime: int = None):
+        self.columns = list(frame.columns)
+        self.label_column = label_column
+        self.source = source
+        self.mtime = mtime
+        # Object dtype keeps native Python scalars in the row dicts
+        self.values = frame.to_numpy(dtype=object)
+
+        labels = pd.to_numeric(frame[label_column], errors="coerce").to_numpy()
+        self.fraud_index = np.flatnonzero(labels == 1)
+        self.legit_index = np.flatnonzero(labels == 0)
+
+    def __len__(self):
+        return len(self.values)
+
+    def sample(self, fraud_label: str, n_samples: int, rng: np.random.Generator) -> List[Dict]:
+        """Up to n_samples distinct rows with the given label ("fraud" or "non-fraud")."""
+        return self.rows(self.pick(fraud_label, n_samples, rng))
+
+    def pick(self, fraud_label: str, n_samples: int, rng: np.random.Generator) -> np.ndarray:
+        """Row indices of a sample; the only step that uses rng."""
+        index = self.fraud_index if fraud_label == "fraud" else self.legit_index
+        if n_samples >= len(index):
+            return index
+        return rng.choice(index, size=n_samples, replace=False)
+
+    def rows(self, picked) -> List[Dict]:
+        return [dict(zip(self.columns, row)) for row in self.values[picked].tolist()]
+
+
+def read_dataset(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    if HAS_ARROW:
+        return pd.read_csv(path, engine="pyarrow")
+    return pd.read_csv(path)
+
+
+class DatasetStore:
+    """
+    In-memory cache of the /test datasets.
+
+    Each file is parsed once and reloaded only when its mtime changes.
+    A .parquet file next to the CSV is preferred when pyarrow is installed.
+
+    Files are parsed outside the shared lock (one parse per type at a
+    time), so a reload never blocks samples of the other types; the
+    shared lock only guards the cache lookup / swap and the rng draws.
+    """
+
+    def __init__(self, paths: Dict[str, str] = TEST_DATA_FILES, seed=None, reader=read_dataset):
+        self.paths = dict(paths)
+        self.reader = reader
+        self.rng = np.random.default_rng(seed)
+        self.stats = {"loads": 0, "hits": 0}
+        self._datasets = {}
+        self._lock = threading.Lock()
+        self._load_locks = {t: threading.Lock() for t in self.paths}
+
+    def source_for(self, transaction_type: str) -> str:
+        path = self.paths.get(transaction_type)
+        if not path:
+            raise ValueError(f"Unknown transaction type: {transaction_type}")
+        if HAS_ARROW:
+            parquet_path = os.path.splitext(path)[0] + ".parquet"
+            if os.path.exists(parquet_path):
+                return parquet_path
+        return path
+
+    def get(self, transaction_type: str) -> LabeledDataset:
+        source, mtime = self._stat(transaction_type)
+        dataset = self._cached(transaction_type, source, mtime)
+        if dataset is not None:
+            return dataset
+
+        with self._load_locks[transaction_type]:
+            # Another thread may have loaded it while we waited
+            dataset = self._cached(transaction_type, source, mtime)
+            if dataset is not None:
+                return dataset
+            while True:
+                frame = self.reader(source)
+                # Parse again if the file was replaced while it was being read
+                source_after, mtime_after = self._stat(transaction_type)
+                if (source_after, mtime_after) == (source, mtime):
+                    break
+                source, mtime = source_after, mtime_after
+            dataset = LabeledDataset(frame, find_label_column(frame.columns, transaction_type), source, mtime)
+            with self._lock:
+                self._datasets[transaction_type] = dataset
+                self.stats["loads"] += 1
+        print(f"✓ Loaded {len(dataset)} {transaction_type} test rows from {source}")
+        return dataset
+
+    def _stat(self, transaction_type: str):
+        """(source path, mtime in ns) of a type's file."""
+        source = self.source_for(transaction_type)
+        try:
+            return source, os.stat(source).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Test data not found: {source}")
+
+    def _cached(self, transaction_type: str, source: str, mtime: int):
+        """The cached dataset if it was loaded from this exact file, else None."""
+        with self._lock:
+            dataset = self._datasets.get(transaction_type)
+            if dataset is not None and dataset.source == source and dataset.mtime == mtime:
+                self.stats["hits"] += 1
+                return dataset
+        return None
+
+    def sample(self, transaction_type: str, fraud_label: str, n_samples: int = 1) -> List[Dict]:
+        dataset = self.get(transaction_type)
+        # np.random.Generator is not thread-safe; draws are cheap enough to serialize
+        with self._lock:
+            picked = dataset.pick(fraud_label, n_samples, self.rng)
+        return dataset.rows(picked)
+
+
+# Global store instance
+dataset_store = DatasetStore()
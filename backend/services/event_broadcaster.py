@@ -0,0 +1,130 @@
+import asyncio
+import itertools
+import json
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models.fraud_log import FraudLog
+from core.config import FRAUD_THRESHOLD
+from services.stats_service import score_bucket, histogram_bin
+
+
+class EventBroadcaster:
+    """
+    Fan-out of dashboard events to connected stream subscribers.
+
+    publish() may be called from any thread (request threadpool, chain
+    worker); events are handed to the event loop and copied into one
+    bounded asyncio.Queue per subscriber. A subscriber that falls too far
+    behind has its queue replaced by a single "resync" event, telling the
+    client to reload a snapshot instead of the server buffering unboundedly.
+    Events only reach subscribers of the same process.
+    """
+
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._loop = None
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a subscriber; call from the event loop."""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event_type: str, data: dict):
+        """Queue an event for every subscriber (thread-safe, never blocks)."""
+        loop = self._loop
+        if loop is None or not self._subscribers or loop.is_closed():
+            return
+        with self._lock:
+            message = {"id": next(self._ids), "event": event_type, "data": data}
+        try:
+            loop.call_soon_threadsafe(self._fan_out, message)
+        except RuntimeError:
+            # Loop shut down between the check and the call
+            pass
+
+    def _fan_out(self, message: dict):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"id": message["id"], "event": "resync", "data": {}})
+
+
+def format_sse(message: dict) -> str:
+    """Encode a broadcaster message as one Server-Sent Events frame."""
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+def serialize_record(record: FraudLog) -> dict:
+    """Same shape as the items of GET /stats/."""
+    return {
+        "id": record.id,
+        "tx_hash": record.tx_hash,
+        "transaction_type": record.transaction_type,
+        "fraud_score": record.fraud_score,
+        "model_version": record.model_version,
+        "created_at": record.created_at.isoformat() if record.created_at else None,
+        "blockchain_timestamp": record.blockchain_timestamp,
+        "gas_used": record.gas_used
+    }
+
+
+def summary_delta(record: FraudLog) -> dict:
+    """What one new record adds to the /stats/summary aggregates."""
+    score = score_bucket(record.fraud_score)
+    return {
+        "transaction_type": record.transaction_type or "unknown",
+        "histogram_bin": histogram_bin(score),
+        "fraud": score > FRAUD_THRESHOLD
+    }
+
+
+# Global broadcaster instance
+broadcaster = EventBroadcaster()
+
+
+# ============= Session hooks =============
+# Events are captured at flush (while the rows are loaded) and only
+# published once the transaction commits.
+
+_PENDING_KEY = "dashboard_events"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_fraud_log_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new:
+        if isinstance(obj, FraudLog):
+            pending.append(("created", {"record": serialize_record(obj), "summary_delta": summary_delta(obj)}))
+    for obj in session.dirty:
+        if isinstance(obj, FraudLog) and session.is_modified(obj, include_collections=False):
+            pending.append(("updated", {"record": serialize_record(obj)}))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_changes(session):
+    for event_type, data in session.info.pop(_PENDING_KEY, []):
+        broadcaster.publish(event_type, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_changes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,22 @@
+from typing import List
+from models.fraud_log import FraudLog
+from models.chain_outbox import ChainOutbox
+from services.chain_worker import enqueue_fraud_record
+
+
+def save_fraud_logs(db, fraud_logs: List[FraudLog], queue_on_chain: bool = True) -> List[ChainOutbox]:
+    """
+    Insert a batch of FraudLogs and their chain outbox rows in one transaction.
+
+    Everything goes out in a single flush (multi-row INSERTs) and is
+    committed once by the caller, so a batch costs one commit instead of
+    one per decision. Returns the outbox entries, in the same order.
+    """
+    if not fraud_logs:
+        return []
+    db.add_all(fraud_logs)
+    # One flush assigns every id, so enqueueing doesn't flush per row
+    db.flush()
+    if not queue_on_chain:
+        return []
+    return [enqueue_fraud_record(db, fraud_log) for fraud_log in fraud_logs]
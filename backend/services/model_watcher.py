@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+import traceback
+from utils.load_models import MODEL_DIR, discover_artifacts
+
+
+class ModelWatcher:
+    """
+    Background worker hot-swapping retrained weights into a ModelRegistry.
+
+    Each cycle lists the model directory; when the newest weights file of a
+    loaded transaction type is not the one serving, it is loaded (and warmed
+    up) on this thread and swapped in atomically, so requests keep scoring
+    with the current version until the new one is ready. Types that are not
+    loaded yet are skipped: their first load picks the newest file anyway.
+
+    Files modified less than min_age seconds ago are left for the next cycle
+    so a half-copied pickle is never loaded (writing to a temporary name and
+    renaming it into place avoids the wait entirely).
+    """
+
+    def __init__(self, registry, model_dir=None, poll_interval: float = 10.0, min_age: float = 2.0):
+        self.registry = registry
+        self.model_dir = model_dir or registry.model_dir or MODEL_DIR
+        self.poll_interval = poll_interval
+        self.min_age = min_age
+        # Artifacts that failed to load are not retried until the file changes
+        self._failed = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ============= Lifecycle =============
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"Model watcher error: {e}")
+                traceback.print_exc()
+            self._stop.wait(self.poll_interval)
+
+    # ============= Processing =============
+
+    def poll_once(self) -> list:
+        """Install every newer artifact found. Returns the (type, version) pairs swapped in."""
+        installed = []
+        cutoff = time.time_ns() - int(self.min_age * 1e9)
+        for transaction_type, artifacts in discover_artifacts(self.model_dir).items():
+            if transaction_type not in self.registry or not self.registry.is_loaded(transaction_type):
+                continue
+            newest = artifacts[-1]
+            if newest.key == self.registry.artifact_key(transaction_type) or newest.mtime_ns > cutoff:
+                continue
+            failed_key = (transaction_type, newest.key)
+            if failed_key in self._failed:
+                continue
+            try:
+                if self.registry.install(newest):
+                    installed.append((transaction_type, newest.version))
+                    print(f"✓ Swapped in {transaction_type} model {newest.version} "
+                          f"({os.path.basename(newest.path)})")
+            except Exception as e:
+                self._failed.add(failed_key)
+                print(f"WARNING: Could not load {os.path.basename(newest.path)}: {e}")
+        return installed
+
+
+# Global watcher instance
+_watcher = None
+
+
+def start_model_watcher(registry, **kwargs) -> ModelWatcher:
+    """Start the global model watcher for a registry (idempotent)."""
+    global _watcher
+    if _watcher is None or _watcher.registry is not registry:
+        if _watcher is not None:
+            _watcher.stop()
+        _watcher = ModelWatcher(registry, **kwargs)
+    _watcher.start()
+    return _watcher
+
+
+def stop_model_watcher():
+    """Stop the global model watcher if it is running."""
+    if _watcher is not None:
+        _watcher.stop()
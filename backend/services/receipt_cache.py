@@ -0,0 +1,184 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from core.config import CHAIN_FINALITY_BLOCKS, RECEIPT_CACHE_TTL, RECEIPT_CACHE_SIZE
+from core.database import SessionLocal
+from core.web3_client import get_async_w3
+from models.chain_outbox import ChainOutbox
+from models.chain_receipt import ChainReceipt
+from models.fraud_log import FraudLog
+from services.chain_service import async_get_onchain_fraud_data
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 15.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= self.clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=_MISSING):
+        """Store a value; ttl=None keeps it until evicted."""
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires_at = None if ttl is None else self.clock() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+async def _latest_block_number() -> int:
+    client = await get_async_w3()
+    return await client.eth.block_number
+
+
+class ReceiptCache:
+    """
+    Read-through cache for on-chain fraud records.
+
+    Lookups go memory -> chain_receipts table -> RPC. Receipts at least
+    finality_blocks deep are immutable: they are written to chain_receipts
+    (and their FraudLog's blockchain_timestamp / gas_used) and kept in
+    memory until evicted. Younger receipts and misses are only cached in
+    memory for ttl seconds, so a pending transaction is re-checked soon
+    without hitting the provider on every dashboard poll.
+    """
+
+    def __init__(self, session_factory=SessionLocal, fetch=async_get_onchain_fraud_data,
+                 latest_block=_latest_block_number, max_size: int = RECEIPT_CACHE_SIZE,
+                 ttl: float = RECEIPT_CACHE_TTL, finality_blocks: int = CHAIN_FINALITY_BLOCKS,
+                 clock=time.monotonic):
+        self.session_factory = session_factory
+        self.fetch = fetch
+        self.latest_block = latest_block
+        self.finality_blocks = finality_blocks
+        self.memory = TTLCache(max_size=max_size, ttl=ttl, clock=clock)
+        self.stats = {"memory_hits": 0, "db_hits": 0, "rpc_fetches": 0}
+
+    async def get(self, tx_hash: str) -> Optional[dict]:
+        return (await self.get_many([tx_hash])).get(tx_hash)
+
+    async def get_many(self, tx_hashes: List[str]) -> Dict[str, Optional[dict]]:
+        """On-chain data per transaction hash (None if not mined / not found)."""
+        results = {}
+        missing = []
+        for tx_hash in dict.fromkeys(tx_hashes):
+            cached = self.memory.get(tx_hash, _MISSING)
+            if cached is _MISSING:
+                missing.append(tx_hash)
+            else:
+                results[tx_hash] = cached
+                self.stats["memory_hits"] += 1
+        if not missing:
+            return results
+
+        persisted = await asyncio.to_thread(self._load_persisted, missing)
+        for tx_hash, data in persisted.items():
+            self.memory.set(tx_hash, data, ttl=None)
+            results[tx_hash] = data
+            self.stats["db_hits"] += 1
+        missing = [h for h in missing if h not in persisted]
+        if not missing:
+            return results
+
+        fetched = await asyncio.gather(*(self.fetch(h) for h in missing))
+        self.stats["rpc_fetches"] += len(missing)
+        latest = None
+        if any(data is not None for data in fetched):
+            try:
+                latest = await self.latest_block()
+            except Exception as e:
+                print(f"Error fetching latest block: {e}")
+
+        final = {}
+        for tx_hash, data in zip(missing, fetched):
+            results[tx_hash] = data
+            is_final = (
+                data is not None and latest is not None
+                and latest - data["block_number"] >= self.finality_blocks
+            )
+            if is_final:
+                final[tx_hash] = data
+                self.memory.set(tx_hash, data, ttl=None)
+            else:
+                self.memory.set(tx_hash, data)
+        if final:
+            await asyncio.to_thread(self._persist, final)
+        return results
+
+    def _load_persisted(self, tx_hashes: List[str]) -> Dict[str, dict]:
+        db = self.session_factory()
+        try:
+            rows = db.query(ChainReceipt).filter(ChainReceipt.tx_hash.in_(tx_hashes)).all()
+            return {row.tx_hash: row.to_dict() for row in rows}
+        finally:
+            db.close()
+
+    def _persist(self, final: Dict[str, dict]):
+        """Store final receipts and back-fill the FraudLog columns they belong to."""
+        db = self.session_factory()
+        try:
+            for tx_hash, data in final.items():
+                db.merge(ChainReceipt(
+                    tx_hash=tx_hash,
+                    block_number=data["block_number"],
+                    timestamp=data["timestamp"],
+                    gas_used=data["gas_used"],
+                    fraud_score=data["fraud_score"],
+                    model_version=data["model_version"]
+                ))
+                outbox_ids = db.query(ChainOutbox.fraud_log_id).filter(ChainOutbox.chain_tx_hash == tx_hash)
+                fraud_logs = db.query(FraudLog).filter(
+                    (FraudLog.tx_hash == tx_hash) | FraudLog.id.in_(outbox_ids)
+                )
+                for fraud_log in fraud_logs:
+                    fraud_log.blockchain_timestamp = data["timestamp"]
+                    fraud_log.gas_used = data["gas_used"]
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error persisting chain receipts: {e}")
+        finally:
+            db.close()
+
+
+# Global cache instance
+_receipt_cache = None
+
+
+def get_receipt_cache() -> ReceiptCache:
+    global _receipt_cache
+    if _receipt_cache is None:
+        _receipt_cache = ReceiptCache()
+    return _receipt_cache
@@ -0,0 +1,226 @@
+import os
+import re
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import numpy as np
+from core.config import FRAUD_THRESHOLD
+from utils.load_models import discover_artifacts
+
+# One shadow comparison per scored row: 14 bytes, appended as raw records
+SHADOW_RECORD = np.dtype([
+    ("timestamp", "<f8"),     # unix time the production score was returned
+    ("production", "u1"),     # production fraud score (0-100)
+    ("challenger", "u1"),     # challenger fraud score (0-100)
+    ("shadow_ms", "<f4"),     # challenger transform + inference time, per row
+])
+
+SHADOW_SUFFIX = ".shadow"
+
+
+def parse_challengers(value: str) -> Dict[str, str]:
+    """Turn the SHADOW_MODELS setting ("ethereum=v2,bank=v1.0") into {type: version}."""
+    challengers = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            transaction_type, version = item.split("=", 1)
+            if transaction_type.strip() and version.strip():
+                challengers[transaction_type.strip().lower()] = version.strip()
+    return challengers
+
+
+def _safe(name: str) -> str:
+    return re.sub(r"[^\w.-]", "_", str(name))
+
+
+class ShadowStore:
+    """
+    Append-only files of SHADOW_RECORD rows, one file per
+    (transaction_type, production version, challenger version).
+    Files are only ever appended to, so they can be copied or rotated
+    while the service runs.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def path_for(self, transaction_type: str, production: str, challenger: str) -> str:
+        name = f"{_safe(transaction_type)}__{_safe(production)}__{_safe(challenger)}{SHADOW_SUFFIX}"
+        return os.path.join(self.directory, name)
+
+    def append(self, transaction_type: str, production: str, challenger: str,
+               timestamp: float, production_scores, challenger_scores, shadow_ms: float):
+        rows = np.empty(len(production_scores), dtype=SHADOW_RECORD)
+        rows["timestamp"] = timestamp
+        rows["production"] = production_scores
+        rows["challenger"] = challenger_scores
+        rows["shadow_ms"] = shadow_ms
+        path = self.path_for(transaction_type, production, challenger)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "ab") as f:
+                f.write(rows.tobytes())
+
+    def read(self, path: str) -> np.ndarray:
+        """Rows of one file (a torn trailing record from a crash is ignored)."""
+        size = os.path.getsize(path)
+        count = size // SHADOW_RECORD.itemsize
+        if count == 0:
+            return np.empty(0, dtype=SHADOW_RECORD)
+        return np.memmap(path, dtype=SHADOW_RECORD, mode="r", shape=(count,))
+
+    def summary(self, transaction_type: str = None) -> List[Dict]:
+        """Score deltas, flag agreement and shadow timing per stored comparison."""
+        if not os.path.isdir(self.directory):
+            return []
+        summaries = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(SHADOW_SUFFIX):
+                continue
+            parts = name[:-len(SHADOW_SUFFIX)].split("__")
+            if len(parts) != 3 or (transaction_type and parts[0] != transaction_type):
+                continue
+            rows = self.read(os.path.join(self.directory, name))
+            summaries.append(summarize(rows, *parts))
+        return summaries
+
+
+def summarize(rows: np.ndarray, transaction_type: str, production: str, challenger: str) -> Dict:
+    summary = {
+        "transaction_type": transaction_type,
+        "production_version": production,
+        "challenger_version": challenger,
+        "rows": int(len(rows))
+    }
+    if len(rows) == 0:
+        return summary
+    prod = rows["production"].astype(np.int16)
+    chal = rows["challenger"].astype(np.int16)
+    delta = chal - prod
+    prod_flag = prod > FRAUD_THRESHOLD
+    chal_flag = chal > FRAUD_THRESHOLD
+    p50, p95 = np.percentile(rows["shadow_ms"], [50, 95])
+    summary.update({
+        "mean_production_score": round(float(prod.mean()), 3),
+        "mean_challenger_score": round(float(chal.mean()), 3),
+        "mean_delta": round(float(delta.mean()), 3),
+        "mean_abs_delta": round(float(np.abs(delta).mean()), 3),
+        "max_abs_delta": int(np.abs(delta).max()),
+        "flag_agreement": round(float((prod_flag == chal_flag).mean()), 4),
+        "flagged_production": int(prod_flag.sum()),
+        "flagged_challenger": int(chal_flag.sum()),
+        "shadow_ms_p50": round(float(p50), 4),
+        "shadow_ms_p95": round(float(p95), 4),
+        "first_timestamp": float(rows["timestamp"].min()),
+        "last_timestamp": float(rows["timestamp"].max())
+    })
+    return summary
+
+
+class ShadowScorer:
+    """
+    Scores copies of production requests with a challenger model, off the
+    request path.
+
+    submit() only copies the records and hands them to a background
+    executor; the request never waits for the challenger. When more than
+    max_pending jobs are queued, new ones are dropped (and counted) rather
+    than letting the queue grow.
+
+    Challengers are model versions: one retained by the ModelRegistry
+    (e.g. the previous production version after a hot swap) or any
+    <type>_model_weights-<version>.pkl in the model directory, loaded on
+    the executor on first use. A weights file that fails to load is not
+    retried until it changes.
+    """
+
+    def __init__(self, service, store: ShadowStore, challengers: Dict[str, str] = None,
+                 max_pending: int = 1000, max_workers: int = 1):
+        self.service = service
+        self.store = store
+        self.challengers = dict(challengers or {})
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shadow")
+        self._loaded = {}
+        # (transaction_type, ModelArtifact.key) of challenger files that failed to load
+        self._failed = set()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._counters = {"submitted": 0, "scored_rows": 0, "dropped": 0, "errors": 0}
+
+    def set_challenger(self, transaction_type: str, version: str = None):
+        """Shadow a transaction type with a version (None stops shadowing it)."""
+        if version is None:
+            self.challengers.pop(transaction_type, None)
+        else:
+            self.challengers[transaction_type] = version
+
+    def submit(self, records: List[Dict], transaction_type: str, production_scores: List[int],
+               production_version: str) -> bool:
+        """Queue a challenger run for a scored request. Returns False if it was not queued."""
+        challenger = self.challengers.get(transaction_type)
+        if challenger is None or challenger == production_version:
+            return False
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters["dropped"] += 1
+                return False
+            self._pending += 1
+            self._counters["submitted"] += 1
+        records = [dict(record) for record in records]
+        self._executor.submit(self._run, records, transaction_type, list(production_scores),
+                              production_version, challenger, time.time())
+        return True
+
+    def _run(self, records, transaction_type, production_scores, production_version, challenger, timestamp):
+        try:
+            entry = self._challenger_entry(transaction_type, challenger)
+            start = time.perf_counter()
+            scores = self.service.score_with(entry, records, transaction_type)
+            per_row_ms = (time.perf_counter() - start) * 1000 / len(records)
+            self.store.append(transaction_type, production_version, challenger, timestamp,
+                              production_scores, scores, per_row_ms)
+            with self._lock:
+                self._counters["scored_rows"] += len(records)
+        except Exception as e:
+            with self._lock:
+                self._counters["errors"] += 1
+            print(f"Shadow scoring error for {transaction_type} {challenger}: {e}")
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _challenger_entry(self, transaction_type: str, version: str):
+        """(model, layout) of a challenger version, loading it on first use."""
+        entry = self.service.models.get_version(transaction_type, version)
+        if entry is not None:
+            return entry
+        key = (transaction_type, version)
+        entry = self._loaded.get(key)
+        if entry is None:
+            model_dir = self.service.models.model_dir
+            artifacts = discover_artifacts(model_dir).get(transaction_type, []) if model_dir else []
+            matches = [a for a in artifacts if a.version == version]
+            if not matches:
+                raise FileNotFoundError(f"No {transaction_type} model artifact with version {version}")
+            artifact = matches[-1]
+            failed_key = (transaction_type, artifact.key)
+            if failed_key in self._failed:
+                raise RuntimeError(f"{os.path.basename(artifact.path)} failed to load; waiting for the file to change")
+            try:
+                entry = self._loaded[key] = artifact.load()
+            except Exception:
+                self._failed.add(failed_key)
+                raise
+        return entry
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"challengers": dict(self.challengers), "pending": self._pending, **self._counters}
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,191 @@
+import base64
+import math
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import event, func, or_, and_
+from sqlalchemy.dialects import sqlite, postgresql
+from core.config import FRAUD_THRESHOLD
+from models.fraud_log import FraudLog
+from models.score_rollup import FraudScoreRollup
+
+HISTOGRAM_BINS = 10
+MAX_PAGE_SIZE = 500
+
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def score_bucket(score) -> int:
+    """Integer 0-100 score a FraudLog is counted under."""
+    # Half-up like SQL round(), so rebuilds agree with incremental updates
+    return max(0, min(100, math.floor((score or 0) + 0.5)))
+
+
+def histogram_bin(score: int) -> int:
+    """Dashboard bin 0-9: 0-9 -> 0, ..., 90-100 -> 9."""
+    return HISTOGRAM_BINS - 1 if score >= 100 else score // 10
+
+
+# ============= Rollup maintenance =============
+
+@event.listens_for(FraudLog, "after_insert")
+def _count_inserted_log(mapper, connection, target):
+    """Bump the rollup in the same transaction as the FraudLog insert."""
+    table = FraudScoreRollup.__table__
+    values = {
+        "transaction_type": target.transaction_type or "unknown",
+        "score": score_bucket(target.fraud_score),
+        "count": 1
+    }
+    insert = _UPSERT_INSERTS.get(connection.dialect.name)
+    if insert is not None:
+        stmt = insert(table).values(**values).on_conflict_do_update(
+            index_elements=["transaction_type", "score"],
+            set_={"count": table.c.count + 1}
+        )
+        connection.execute(stmt)
+        return
+    # Other dialects: update, then insert if the bucket is new
+    updated = connection.execute(
+        table.update()
+        .where(table.c.transaction_type == values["transaction_type"], table.c.score == values["score"])
+        .values(count=table.c.count + 1)
+    )
+    if updated.rowcount == 0:
+        connection.execute(table.insert().values(**values))
+
+
+def _logged_counts(db) -> dict:
+    """{(transaction_type, score bucket): count} from fraud_logs, with one GROUP BY."""
+    rows = (
+        db.query(FraudLog.transaction_type, FraudLog.fraud_score, func.count(FraudLog.id))
+        .group_by(FraudLog.transaction_type, FraudLog.fraud_score)
+        .all()
+    )
+    counts = {}
+    for transaction_type, score, count in rows:
+        key = (transaction_type or "unknown", score_bucket(score))
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def rebuild_score_rollup(db, counts: Optional[dict] = None) -> int:
+    """Recompute the rollup from fraud_logs; returns rows counted."""
+    if counts is None:
+        counts = _logged_counts(db)
+
+    db.query(FraudScoreRollup).delete()
+    db.add_all([
+        FraudScoreRollup(transaction_type=t, score=s, count=c)
+        for (t, s), c in counts.items()
+    ])
+    db.commit()
+    return sum(counts.values())
+
+
+def sync_score_rollup(db) -> bool:
+    """
+    Rebuild the rollup if it disagrees with fraud_logs (e.g. first start on an
+    existing database). Every (transaction_type, score) bucket is compared, so
+    a drifted distribution is repaired even when the total still matches.
+    Returns True if it was rebuilt.
+    """
+    counts = _logged_counts(db)
+    rolled_up = {
+        (row.transaction_type, row.score): row.count
+        for row in db.query(FraudScoreRollup)
+        if row.count
+    }
+    if rolled_up == counts:
+        return False
+    logged = rebuild_score_rollup(db, counts)
+    print(f"✓ Score rollup rebuilt for {logged} fraud logs")
+    return True
+
+
+# ============= Aggregates =============
+
+def get_summary(db, transaction_type: Optional[str] = None) -> dict:
+    """Counts, score histogram and per-type fraud rate, read from the rollup."""
+    query = db.query(FraudScoreRollup)
+    if transaction_type:
+        query = query.filter(FraudScoreRollup.transaction_type == transaction_type)
+
+    histogram = [0] * HISTOGRAM_BINS
+    per_type = {}
+    for row in query:
+        histogram[histogram_bin(row.score)] += row.count
+        stats = per_type.setdefault(row.transaction_type, {"total": 0, "fraud": 0, "score_sum": 0})
+        stats["total"] += row.count
+        stats["score_sum"] += row.score * row.count
+        if row.score > FRAUD_THRESHOLD:
+            stats["fraud"] += row.count
+
+    total = sum(s["total"] for s in per_type.values())
+    fraud = sum(s["fraud"] for s in per_type.values())
+    return {
+        "total_records": total,
+        "fraud_records": fraud,
+        "fraud_rate": fraud / total if total else 0.0,
+        "fraud_threshold": FRAUD_THRESHOLD,
+        "histogram": histogram,
+        "by_type": {
+            t: {
+                "total": s["total"],
+                "fraud": s["fraud"],
+                "fraud_rate": s["fraud"] / s["total"] if s["total"] else 0.0,
+                "avg_score": s["score_sum"] / s["total"] if s["total"] else 0.0
+            }
+            for t, s in sorted(per_type.items())
+        }
+    }
+
+
+# ============= Keyset pagination =============
+
+def encode_cursor(record: FraudLog) -> str:
+    raw = f"{record.created_at.isoformat()}|{record.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, record_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(record_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def list_records(db, limit: int = 50, cursor: Optional[str] = None,
+                 transaction_type: Optional[str] = None,
+                 min_score: Optional[float] = None, max_score: Optional[float] = None):
+    """
+    One page of FraudLogs, newest first.
+
+    Pages continue from the (created_at, id) of the previous page's last row,
+    so every page is an index range scan regardless of how deep it is.
+    Returns (records, next_cursor or None).
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = db.query(FraudLog)
+    if transaction_type:
+        query = query.filter(FraudLog.transaction_type == transaction_type)
+    if min_score is not None:
+        query = query.filter(FraudLog.fraud_score >= min_score)
+    if max_score is not None:
+        query = query.filter(FraudLog.fraud_score <= max_score)
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            FraudLog.created_at < created_at,
+            and_(FraudLog.created_at == created_at, FraudLog.id < record_id)
+        ))
+
+    records = (
+        query.order_by(FraudLog.created_at.desc(), FraudLog.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = encode_cursor(records[limit - 1]) if len(records) > limit else None
+    return records[:limit], next_cursor
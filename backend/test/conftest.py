@@ -0,0 +1,130 @@
+import os
+import sys
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+# Tests import backend modules the same way main.py does (core.*, services.*, ...)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Never touch the checked-in fraud.db: the app's engines point at a scratch
+# SQLite file (async side through aiosqlite), and the app starts without
+# preloading models, watching model_wts or running the chain worker
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="chainauditai-test-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TEST_DB_DIR, 'fraud.db')}")
+os.environ.setdefault("PRELOAD_MODELS", "none")
+os.environ.setdefault("CHAIN_WORKER_ENABLED", "false")
+os.environ.setdefault("MODEL_WATCH_ENABLED", "false")
+
+
+# Stand-in for blockchain/fraudproof_ledger.sol with the same ABI for the
+# functions the backend calls; compiled with Vyper since solc is not needed
+LEDGER_STANDIN = """
+event FraudLogged:
+    transactionHash: bytes32
+    fraudScore: uint256
+    modelVersion: String[64]
+    timestamp: uint256
+
+event BatchAnchored:
+    merkleRoot: bytes32
+    batchSize: uint256
+    timestamp: uint256
+
+recordsCount: public(uint256)
+anchoredRoots: public(HashMap[bytes32, uint256])
+owner: public(immutable(address))
+
+@deploy
+def __init__():
+    owner = msg.sender
+
+@external
+def logFraud(_transactionHash: bytes32, _fraudScore: uint256, _modelVersion: String[64]):
+    self.recordsCount += 1
+    log FraudLogged(transactionHash=_transactionHash, fraudScore=_fraudScore, modelVersion=_modelVersion, timestamp=block.timestamp)
+
+@external
+def anchorBatch(_merkleRoot: bytes32, _batchSize: uint256):
+    assert msg.sender == owner, "Only owner can anchor"
+    assert self.anchoredRoots[_merkleRoot] == 0, "Root already anchored"
+    self.anchoredRoots[_merkleRoot] = block.timestamp
+    log BatchAnchored(merkleRoot=_merkleRoot, batchSize=_batchSize, timestamp=block.timestamp)
+
+@view
+@external
+def verifyInclusion(_recordHash: bytes32, _proof: DynArray[bytes32, 32], _merkleRoot: bytes32) -> bool:
+    if self.anchoredRoots[_merkleRoot] == 0:
+        return False
+    computed: bytes32 = keccak256(_recordHash)
+    for sibling: bytes32 in _proof:
+        if convert(computed, uint256) <= convert(sibling, uint256):
+            computed = keccak256(concat(computed, sibling))
+        else:
+            computed = keccak256(concat(sibling, computed))
+    return computed == _merkleRoot
+"""
+
+
+@pytest.fixture(scope="session")
+def ledger_standin():
+    """ABI and bytecode of the ledger stand-in."""
+    vyper = pytest.importorskip("vyper")
+    return vyper.compile_code(LEDGER_STANDIN, output_formats=["abi", "bytecode"])
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """sessionmaker bound to a fresh SQLite database with every table created."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from core.database import Base
+    engine = create_engine(f"sqlite:///{tmp_path / 'fraud.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def training_data():
+    """
+    (X, y) for fitting small tree ensembles: 600 float32 rows over six
+    named features, with NaNs in two columns so default directions are learned.
+    """
+    features = ["amount", "age", "hour", "flag", "ratio", "count"]
+    n_rows = 600
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n_rows, len(features))).astype(np.float32)
+    X[:, 3] = rng.integers(0, 2, n_rows)
+    X[:, 5] = rng.integers(0, 5, n_rows)
+    y = ((X[:, 0] + 0.5 * X[:, 1] - X[:, 3] + rng.normal(scale=0.5, size=n_rows)) > 0).astype(int)
+    X[rng.random(n_rows) < 0.1, 1] = np.nan
+    X[rng.random(n_rows) < 0.1, 4] = np.nan
+    return pd.DataFrame(X, columns=features), y
+
+
+class ConstantModel:
+    """Pickled stand-in for retrained weights: always predicts `p`."""
+
+    feature_names_in_ = np.array(['total_received', 'total_tx_sent'])
+
+    def __init__(self, p):
+        self.p = p
+
+    def predict_proba(self, X):
+        return np.tile([1 - self.p, self.p], (len(X), 1))
+
+
+@pytest.fixture
+def write_model():
+    """write_model(model_dir, name, p, age=60): pickle a ConstantModel and return its path."""
+    def write(model_dir, name, p, age=60):
+        path = os.path.join(model_dir, name)
+        joblib.dump(ConstantModel(p), path)
+        # Backdate so the watcher's min_age check treats the file as complete
+        stamp = os.path.getmtime(path) - age
+        os.utime(path, (stamp, stamp))
+        return path
+    return write
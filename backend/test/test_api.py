@@ -0,0 +1,103 @@
+"""
+API handlers on the async engine (aiosqlite against the scratch DB from conftest.py).
+"""
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from core.database import session_scope, to_async_url, async_database_url
+from models.fraud_log import FraudLog
+import main
+import routers.test as test_router
+from services.dataset_store import DatasetStore
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def add_logs(n, prefix):
+    with session_scope() as db:
+        db.add_all([
+            FraudLog(tx_hash=f"{prefix}_{i}", transaction_type="ethereum",
+                     fraud_score=(i * 13) % 101, model_version="v1.0")
+            for i in range(n)
+        ])
+
+
+def test_async_engine_uses_aiosqlite():
+    assert async_database_url.startswith("sqlite+aiosqlite:///")
+
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///./fraud.db") == "sqlite+aiosqlite:///./fraud.db"
+    assert to_async_url("postgresql://u:p@db/fraud") == "postgresql+asyncpg://u:p@db/fraud"
+    assert to_async_url("postgresql+asyncpg://u:p@db/fraud") == "postgresql+asyncpg://u:p@db/fraud"
+    with pytest.raises(ValueError):
+        to_async_url("oracle://u:p@db/fraud")
+
+
+def test_stats_pages_and_summary(client):
+    before = client.get("/stats/summary").json()["total_records"]
+    add_logs(12, "tx_api_page")
+    assert client.get("/stats/summary").json()["total_records"] == before + 12
+
+    first = client.get("/stats/", params={"limit": 5, "transaction_type": "ethereum"}).json()
+    assert len(first["records"]) == 5 and first["next_cursor"]
+    second = client.get("/stats/", params={"limit": 5, "transaction_type": "ethereum",
+                                           "cursor": first["next_cursor"]}).json()
+    assert not {r["id"] for r in first["records"]} & {r["id"] for r in second["records"]}
+    assert client.get("/stats/", params={"cursor": "bogus"}).status_code == 400
+
+
+def test_run_test_persists_through_async_session(client, monkeypatch, tmp_path):
+    record = {'blockNumber': 17000000, 'confirmations': 120, 'Month': 3, 'Day': 14, 'Hour': 22,
+              'mean_value_received': 0.52, 'variance_value_received': 0.1, 'total_received': 12.5,
+              'time_diff_first_last_received': 86400.0, 'total_tx_sent': 40, 'total_tx_sent_malicious': 2,
+              'total_tx_sent_unique': 31, 'total_tx_sent_malicious_unique': 1,
+              'total_tx_received_malicious_unique': 0, 'received_coef_variation': 1.7, 'Fraud': 1}
+    path = tmp_path / "ethereum.csv"
+    pd.DataFrame([record] * 3).to_csv(path, index=False)
+    monkeypatch.setattr(test_router, "dataset_store", DatasetStore({"ethereum": str(path)}))
+
+    before = client.get("/stats/summary").json()["total_records"]
+    response = client.post("/test/run-test", json={"transaction_type": "ethereum",
+                                                   "fraud_label": "fraud", "num_samples": 3})
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert len(results) == 3
+    assert all(r["database_id"] and r["blockchain_status"] == "pending" for r in results)
+
+    status = client.get(f"/test/chain-status/{results[0]['database_id']}").json()
+    assert status["status"] == "pending"
+    assert client.get("/stats/summary").json()["total_records"] == before + 3
+    with session_scope() as db:
+        log = db.get(FraudLog, results[0]["database_id"])
+        assert log.fraud_score == results[0]["fraud_score"]
+        # Served by the un-suffixed model_wts/ethereum_model_weights.pkl
+        assert log.model_version == "v1.0"
+
+
+def test_missing_rows_return_404(client):
+    assert client.get("/test/chain-status/999999").status_code == 404
+    assert client.get("/verify/999999").status_code == 404
+
+
+def test_shadow_summary_disabled_by_default(client):
+    assert client.get("/health/shadow").json() == {"enabled": False}
+
+
+def test_score_batch_accepts_null_fields(client):
+    pytest.importorskip("xgboost")
+    records = [
+        {"Hour": 22, "Day": 14, "total_received": 12.5, "time_diff_first_last_received": 86400.0,
+         "total_tx_sent": 40, "total_tx_sent_unique": 31},
+        # JSON nulls, e.g. NaN cells cleaned for the request body
+        {"Hour": None, "Day": None, "total_received": None, "time_diff_first_last_received": None,
+         "total_tx_sent": None, "total_tx_sent_unique": None},
+    ]
+    response = client.post("/score/batch", json={"transaction_type": "ethereum", "records": records})
+    assert response.status_code == 200, response.text
+    assert response.json()["total_records"] == 2
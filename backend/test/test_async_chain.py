@@ -0,0 +1,87 @@
+"""
+Async chain client and service functions against AsyncEthereumTesterProvider.
+"""
+
+import asyncio
+import pytest
+
+eth_tester = pytest.importorskip("eth_tester")
+
+from web3 import AsyncWeb3
+from web3.providers.eth_tester import AsyncEthereumTesterProvider
+import core.web3_client as web3_client
+from services.chain_service import (
+    async_send_fraud_record,
+    async_log_fraud_on_chain,
+    async_get_onchain_fraud_data,
+    get_nonce_manager
+)
+
+
+async def deploy(ledger_standin):
+    provider = AsyncEthereumTesterProvider()
+    client = AsyncWeb3(provider)
+    private_key = provider.ethereum_tester.backend.account_keys[0].to_hex()
+    deployer = (await client.eth.accounts)[0]
+    factory = client.eth.contract(abi=ledger_standin["abi"], bytecode=ledger_standin["bytecode"])
+    tx_hash = await factory.constructor().transact({"from": deployer})
+    receipt = await client.eth.wait_for_transaction_receipt(tx_hash)
+    ledger = client.eth.contract(address=receipt.contractAddress, abi=ledger_standin["abi"])
+    return client, ledger, private_key
+
+
+def test_async_log_and_read_back(ledger_standin):
+    async def scenario():
+        client, ledger, private_key = await deploy(ledger_standin)
+        tx_hash = await async_log_fraud_on_chain(42, "v1.0", "tx_async_0",
+                                                 client=client, ledger=ledger, private_key=private_key)
+        assert tx_hash
+        data = await async_get_onchain_fraud_data(tx_hash, client=client, ledger=ledger)
+        assert data["fraud_score"] == 42
+        assert data["model_version"] == "v1.0"
+        assert data["gas_used"] > 0 and data["timestamp"] > 0
+        return await ledger.functions.recordsCount().call()
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_concurrent_async_sends_get_distinct_nonces(ledger_standin):
+    async def scenario():
+        client, ledger, private_key = await deploy(ledger_standin)
+        sends = [
+            async_send_fraud_record(i, "v1.0", f"tx_async_{i}",
+                                    client=client, ledger=ledger, private_key=private_key)
+            for i in range(5)
+        ]
+        results = await asyncio.gather(*sends)
+        address = client.eth.account.from_key(private_key).address
+        get_nonce_manager(client, address).resync()
+        return [nonce for _, nonce in results], await ledger.functions.recordsCount().call()
+
+    nonces, count = asyncio.run(scenario())
+    assert sorted(nonces) == list(range(nonces[0], nonces[0] + 5))
+    assert count == 5
+
+
+def test_async_read_returns_none_on_error(ledger_standin):
+    async def scenario():
+        client, ledger, _ = await deploy(ledger_standin)
+        return await async_get_onchain_fraud_data("0x" + "00" * 32, client=client, ledger=ledger)
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_shared_async_client_is_pooled_and_closed():
+    async def scenario():
+        client = await web3_client.get_async_w3()
+        assert await web3_client.get_async_w3() is client
+        retry = client.provider.exception_retry_configuration
+        assert retry.retries == web3_client.RPC_MAX_RETRIES
+        assert retry.backoff_factor == web3_client.RPC_BACKOFF_FACTOR
+        session = web3_client._async_session
+        assert session.connector.limit == web3_client.RPC_POOL_SIZE
+        await web3_client.close_async_w3()
+        assert session.closed
+        assert web3_client.async_w3 is None
+
+    asyncio.run(scenario())
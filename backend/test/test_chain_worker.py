@@ -0,0 +1,400 @@
+"""
+Chain outbox worker against a local in-memory chain (EthereumTesterProvider).
+
+No Solidity compiler is needed: the ledger is stood in by the Vyper
+contract from conftest.py, compiled at test time.
+"""
+
+import threading
+import pytest
+from types import SimpleNamespace
+
+eth_tester = pytest.importorskip("eth_tester")
+
+from web3 import Web3, EthereumTesterProvider
+from models.fraud_log import FraudLog
+from models.chain_outbox import ChainOutbox, STATUS_PENDING, STATUS_SENT, STATUS_CONFIRMED, STATUS_FAILED, STATUS_BATCHED
+from models.anchor_batch import AnchorBatch
+from services.anchor_service import verify_fraud_log, from_hex
+from services.chain_service import NonceManager
+import services.chain_worker as chain_worker
+from services.chain_worker import ChainSubmissionWorker, enqueue_fraud_record, requeue_failed, MODE_BATCH
+from utils.merkle import hash_pair, verify_proof
+
+
+@pytest.fixture
+def chain(ledger_standin):
+    provider = EthereumTesterProvider()
+    w3 = Web3(provider)
+    private_key = provider.ethereum_tester.backend.account_keys[0].to_hex()
+    w3.eth.default_account = w3.eth.accounts[0]
+
+    factory = w3.eth.contract(abi=ledger_standin["abi"], bytecode=ledger_standin["bytecode"])
+    receipt = w3.eth.wait_for_transaction_receipt(factory.constructor().transact())
+    ledger = w3.eth.contract(address=receipt.contractAddress, abi=ledger_standin["abi"])
+    return w3, ledger, private_key
+
+
+def add_logs(session_factory, n, start=0):
+    db = session_factory()
+    ids = []
+    for i in range(start, start + n):
+        fraud_log = FraudLog(tx_hash=f"tx_test_{i}", transaction_type="vehicle",
+                             fraud_score=10 * i, model_version="v1.0")
+        db.add(fraud_log)
+        enqueue_fraud_record(db, fraud_log)
+        db.commit()
+        ids.append(fraud_log.id)
+    db.close()
+    return ids
+
+
+def test_enqueue_commits_pending_entry_with_log(session_factory):
+    ids = add_logs(session_factory, 1)
+    db = session_factory()
+    entry = db.query(ChainOutbox).one()
+    assert entry.fraud_log_id == ids[0]
+    assert entry.status == STATUS_PENDING
+    assert entry.reference_id == "tx_test_0"
+    db.close()
+
+
+def test_worker_sends_then_confirms(chain, session_factory):
+    w3, ledger, private_key = chain
+    ids = add_logs(session_factory, 3)
+    worker = ChainSubmissionWorker(session_factory, client=w3, ledger=ledger, private_key=private_key)
+
+    assert worker.submit_pending() == 3
+    db = session_factory()
+    entries = db.query(ChainOutbox).order_by(ChainOutbox.id).all()
+    assert all(e.status == STATUS_SENT and e.chain_tx_hash for e in entries)
+    db.close()
+
+    assert worker.confirm_sent() == 3
+    assert ledger.functions.recordsCount().call() == 3
+
+    db = session_factory()
+    for fraud_log_id in ids:
+        fraud_log = db.get(FraudLog, fraud_log_id)
+        assert fraud_log.gas_used > 0
+        assert fraud_log.blockchain_timestamp > 0
+    assert {e.status for e in db.query(ChainOutbox).all()} == {STATUS_CONFIRMED}
+    db.close()
+
+    # Event payload matches the logged decision
+    receipt = w3.eth.get_transaction_receipt(entries[1].chain_tx_hash)
+    event = ledger.events.FraudLogged().process_receipt(receipt)[0]["args"]
+    assert event["fraudScore"] == 10
+    assert event["transactionHash"] == Web3.keccak(text="tx_test_1")
+
+
+def test_worker_retries_then_fails_without_contract(session_factory):
+    add_logs(session_factory, 1)
+    worker = ChainSubmissionWorker(session_factory, client=Web3(EthereumTesterProvider()),
+                                   ledger=None, private_key=None, max_attempts=2, retry_base=0)
+    # Patch out the configured contract so the send always fails
+    import services.chain_service as chain_service
+    original = chain_service.contract
+    chain_service.contract = None
+    try:
+        worker.run_once()
+        worker.run_once()
+    finally:
+        chain_service.contract = original
+
+    db = session_factory()
+    entry = db.query(ChainOutbox).one()
+    assert entry.attempts == 2
+    assert entry.status == STATUS_FAILED
+    assert "Contract not initialized" in entry.last_error
+    db.close()
+
+
+def flaky_sender(monkeypatch, name, failures, error=ConnectionError("RPC unreachable")):
+    """Replace chain_worker.<name> so its first `failures` calls raise error; returns the call log."""
+    calls = []
+    send = getattr(chain_worker, name)
+
+    def sender(*args, **kwargs):
+        calls.append(args)
+        if len(calls) <= failures:
+            raise error
+        return send(*args, **kwargs)
+    monkeypatch.setattr(chain_worker, name, sender)
+    return calls
+
+
+def test_outage_longer_than_max_attempts_loses_nothing(chain, session_factory, monkeypatch):
+    w3, ledger, private_key = chain
+    add_logs(session_factory, 3)
+    worker = ChainSubmissionWorker(session_factory, client=w3, ledger=ledger, private_key=private_key,
+                                   max_attempts=2, retry_base=0)
+    calls = flaky_sender(monkeypatch, "send_fraud_record", failures=5)
+
+    for _ in range(5):
+        assert worker.submit_pending() == 0
+    # One send per poll: the cycle stops at the first unreachable-provider error
+    assert len(calls) == 5
+    db = session_factory()
+    entries = db.query(ChainOutbox).all()
+    assert {e.status for e in entries} == {STATUS_PENDING}
+    assert {e.attempts or 0 for e in entries} == {0}
+    assert "RPC unreachable" in entries[0].last_error
+    db.close()
+
+    assert worker.submit_pending() == 3
+    assert worker.confirm_sent() == 3
+    assert ledger.functions.recordsCount().call() == 3
+
+
+def test_unreachable_provider_pauses_sending(session_factory, monkeypatch):
+    add_logs(session_factory, 2)
+    worker = ChainSubmissionWorker(session_factory, retry_base=60)
+    calls = flaky_sender(monkeypatch, "send_fraud_record", failures=10)
+
+    assert worker.submit_pending() == 0
+    assert worker.is_paused()
+    assert worker.submit_pending() == 0
+    assert len(calls) == 1
+
+
+def test_failed_send_backs_off_then_requeues(session_factory, monkeypatch):
+    add_logs(session_factory, 1)
+    worker = ChainSubmissionWorker(session_factory, max_attempts=2, retry_base=60)
+    calls = flaky_sender(monkeypatch, "send_fraud_record", failures=10, error=ValueError("bad payload"))
+
+    worker.submit_pending()
+    worker.submit_pending()  # still inside the backoff window
+    assert len(calls) == 1
+    db = session_factory()
+    entry = db.query(ChainOutbox).one()
+    assert entry.status == STATUS_PENDING and entry.attempts == 1 and entry.next_attempt_at is not None
+
+    # Out of attempts, then requeued by the operator
+    entry.next_attempt_at = None
+    db.commit()
+    worker.submit_pending()
+    db.refresh(entry)
+    assert entry.status == STATUS_FAILED and entry.attempts == 2
+    assert requeue_failed(db) == 1
+    db.refresh(entry)
+    assert entry.status == STATUS_PENDING and entry.attempts == 0 and entry.next_attempt_at is None
+    db.close()
+
+
+class CountingClient:
+    """Minimal client whose get_transaction_count is counted."""
+
+    def __init__(self, start):
+        self.calls = 0
+        self.start = start
+        self.eth = SimpleNamespace(get_transaction_count=self.get_transaction_count)
+
+    def get_transaction_count(self, address, block_identifier='latest'):
+        self.calls += 1
+        return self.start
+
+
+def test_nonce_manager_hands_out_unique_nonces_concurrently():
+    client = CountingClient(start=7)
+    manager = NonceManager(client, "0xabc")
+    allocated = []
+    lock = threading.Lock()
+
+    def allocate_many():
+        for _ in range(50):
+            nonce = manager.allocate()
+            with lock:
+                allocated.append(nonce)
+
+    threads = [threading.Thread(target=allocate_many) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(allocated) == list(range(7, 7 + 400))
+    assert client.calls == 1
+
+
+def test_nonce_manager_resync_rereads_chain():
+    client = CountingClient(start=3)
+    manager = NonceManager(client, "0xabc")
+    assert [manager.allocate(), manager.allocate()] == [3, 4]
+    client.start = 10
+    manager.resync()
+    assert manager.allocate() == 10
+    assert client.calls == 2
+
+
+def test_worker_pipelines_up_to_max_in_flight(chain, session_factory):
+    w3, ledger, private_key = chain
+    add_logs(session_factory, 5)
+    worker = ChainSubmissionWorker(session_factory, client=w3, ledger=ledger,
+                                   private_key=private_key, max_in_flight=3)
+
+    # Sends don't wait for receipts; the cap stops further sends until confirmed
+    assert worker.submit_pending() == 3
+    assert worker.submit_pending() == 0
+    db = session_factory()
+    nonces = sorted(e.nonce for e in db.query(ChainOutbox).filter(ChainOutbox.status == STATUS_SENT))
+    db.close()
+    assert nonces == list(range(nonces[0], nonces[0] + 3))
+
+    assert worker.confirm_sent() == 3
+    assert worker.run_once() == {"submitted": 2, "confirmed": 2}
+    assert ledger.functions.recordsCount().call() == 5
+
+
+def test_batch_mode_waits_for_window_or_size(chain, session_factory):
+    w3, ledger, private_key = chain
+    add_logs(session_factory, 3)
+    worker = ChainSubmissionWorker(session_factory, client=w3, ledger=ledger, private_key=private_key,
+                                   mode=MODE_BATCH, anchor_window=3600, anchor_max_size=4)
+
+    # Neither the window nor the size limit is reached yet
+    assert worker.run_once() == {"submitted": 0, "confirmed": 0}
+    add_logs(session_factory, 2, start=3)
+
+    # 5 pending >= 4: a batch of 4 is sealed, the 5th waits for the next window
+    assert worker.run_once() == {"submitted": 1, "confirmed": 1}
+    db = session_factory()
+    statuses = [e.status for e in db.query(ChainOutbox).order_by(ChainOutbox.id)]
+    assert statuses == [STATUS_CONFIRMED] * 4 + [STATUS_PENDING]
+    db.close()
+
+
+def test_batch_mode_anchors_one_root_and_verifies_proofs(chain, session_factory):
+    w3, ledger, private_key = chain
+    ids = add_logs(session_factory, 5)
+    worker = ChainSubmissionWorker(session_factory, client=w3, ledger=ledger, private_key=private_key,
+                                   mode=MODE_BATCH, anchor_window=0)
+
+    assert worker.anchor_pending() == 1
+    db = session_factory()
+    assert {e.status for e in db.query(ChainOutbox)} == {STATUS_SENT}
+    # Proofs exist before the root is mined, but are not anchored yet
+    assert verify_fraud_log(db, ids[0])["anchored"] is False
+    db.close()
+
+    assert worker.confirm_anchors() == 1
+    # One transaction for the whole batch, no per-decision writes
+    assert ledger.functions.recordsCount().call() == 0
+
+    db = session_factory()
+    batch = db.query(AnchorBatch).one()
+    assert batch.batch_size == 5
+    assert ledger.functions.anchoredRoots(from_hex(batch.merkle_root)).call() == batch.blockchain_timestamp
+    for fraud_log_id in ids:
+        result = verify_fraud_log(db, fraud_log_id)
+        assert result["verified"] and result["anchored"]
+        assert result["anchor_tx"] == batch.chain_tx_hash
+        # The contract accepts the same proof
+        assert ledger.functions.verifyInclusion(
+            from_hex(result["record_hash"]), [from_hex(h) for h in result["proof"]], from_hex(batch.merkle_root)
+        ).call()
+        fraud_log = db.get(FraudLog, fraud_log_id)
+        assert fraud_log.gas_used == batch.gas_used // 5
+        assert fraud_log.blockchain_timestamp == batch.blockchain_timestamp
+    assert {e.status for e in db.query(ChainOutbox)} == {STATUS_CONFIRMED}
+
+    # The parent of leaves 0 and 1 proves against the root, but is not accepted as a record
+    first, second = (verify_fraud_log(db, i) for i in ids[:2])
+    parent = hash_pair(from_hex(first["leaf_hash"]), from_hex(second["leaf_hash"]))
+    path = [from_hex(h) for h in first["proof"][1:]]
+    assert verify_proof(parent, path, from_hex(batch.merkle_root))
+    assert not ledger.functions.verifyInclusion(parent, path, from_hex(batch.merkle_root)).call()
+
+    # Tampering with the stored decision breaks the proof
+    db.get(FraudLog, ids[2]).fraud_score = 99
+    db.commit()
+    assert verify_fraud_log(db, ids[2])["verified"] is False
+    assert verify_fraud_log(db, ids[3])["verified"] is True
+    db.close()
+
+
+def test_batch_mode_retries_then_fails_batch(session_factory):
+    add_logs(session_factory, 2)
+    worker = ChainSubmissionWorker(session_factory, client=Web3(EthereumTesterProvider()),
+                                   mode=MODE_BATCH, anchor_window=0, max_attempts=2, retry_base=0)
+    import services.chain_service as chain_service
+    original = chain_service.contract
+    chain_service.contract = None
+    try:
+        worker.run_once()
+        db = session_factory()
+        assert {e.status for e in db.query(ChainOutbox)} == {STATUS_BATCHED}
+        db.close()
+        worker.run_once()
+    finally:
+        chain_service.contract = original
+
+    db = session_factory()
+    batch = db.query(AnchorBatch).one()
+    assert batch.status == STATUS_FAILED and batch.attempts == 2
+    assert {e.status for e in db.query(ChainOutbox)} == {STATUS_FAILED}
+    db.close()
+
+
+def test_anchor_outage_longer_than_max_attempts_loses_nothing(chain, session_factory, monkeypatch):
+    w3, ledger, private_key = chain
+    add_logs(session_factory, 3)
+    worker = ChainSubmissionWorker(session_factory, client=w3, ledger=ledger, private_key=private_key,
+                                   mode=MODE_BATCH, anchor_window=0, max_attempts=2, retry_base=0)
+    calls = flaky_sender(monkeypatch, "send_anchor_root", failures=4)
+
+    for _ in range(4):
+        assert worker.anchor_pending() == 0
+    assert len(calls) == 4
+    db = session_factory()
+    batch = db.query(AnchorBatch).one()
+    assert batch.status == STATUS_PENDING and not batch.attempts
+    assert {e.status for e in db.query(ChainOutbox)} == {STATUS_BATCHED}
+    db.close()
+
+    assert worker.run_once() == {"submitted": 1, "confirmed": 1}
+    db = session_factory()
+    assert {e.status for e in db.query(ChainOutbox)} == {STATUS_CONFIRMED}
+    db.close()
+
+
+def test_failed_batch_is_requeued(chain, session_factory, monkeypatch):
+    w3, ledger, private_key = chain
+    add_logs(session_factory, 2)
+    worker = ChainSubmissionWorker(session_factory, client=w3, ledger=ledger, private_key=private_key,
+                                   mode=MODE_BATCH, anchor_window=0, max_attempts=1, retry_base=0)
+    flaky_sender(monkeypatch, "send_anchor_root", failures=1, error=ValueError("gas estimation failed"))
+
+    worker.anchor_pending()
+    db = session_factory()
+    assert db.query(AnchorBatch).one().status == STATUS_FAILED
+    assert requeue_failed(db) == 2
+    batch = db.query(AnchorBatch).one()
+    assert batch.status == STATUS_PENDING and batch.attempts == 0
+    assert {e.status for e in db.query(ChainOutbox)} == {STATUS_BATCHED}
+    db.close()
+
+    assert worker.run_once() == {"submitted": 1, "confirmed": 1}
+
+
+def test_only_owner_can_anchor(chain):
+    w3, ledger, _ = chain
+    root = b"\x01" * 32
+    with pytest.raises(eth_tester.exceptions.TransactionFailed, match="Only owner"):
+        ledger.functions.anchorBatch(root, 1).transact({"from": w3.eth.accounts[1]})
+    # A root seen in the mempool can't be anchored first by someone else
+    ledger.functions.anchorBatch(root, 1).transact({"from": w3.eth.accounts[0]})
+    assert ledger.functions.anchoredRoots(root).call() > 0
+
+
+def test_missing_outbox_columns_are_added(tmp_path):
+    from sqlalchemy import create_engine, inspect
+    from core.database import add_missing_columns
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE chain_outbox (id INTEGER PRIMARY KEY, status VARCHAR)")
+
+    assert "next_attempt_at" in add_missing_columns(engine, ChainOutbox.__table__)
+    assert add_missing_columns(engine, AnchorBatch.__table__) == []  # table not created yet
+    assert {c["name"] for c in inspect(engine).get_columns("chain_outbox")} == set(ChainOutbox.__table__.columns.keys())
+    assert add_missing_columns(engine, ChainOutbox.__table__) == []
@@ -0,0 +1,121 @@
+"""
+Vectorized synthetic data generation (utils/data_generator.py).
+"""
+
+import uuid
+import numpy as np
+import pandas as pd
+from utils.data_generator import (
+    SyntheticDataGenerator, BankDataGenerator, EcommerceDataGenerator, run_generation, main,
+    spawn_seeds
+)
+
+
+def source_frame(n=200):
+    return pd.DataFrame({
+        "amount": np.tile([0.0, 10.0, -4.0, np.nan], n // 4),
+        "count": np.arange(n),
+        "channel": np.tile(["web", "app", "pos", "web"], n // 4),
+        "Transaction ID": [f"t{i}" for i in range(n)],
+        "label": np.tile([1, 0], n // 2)
+    })
+
+
+def make(cls, seed=1):
+    """Generator of the given domain over an in-memory frame."""
+    generator = SyntheticDataGenerator.__new__(cls)
+    SyntheticDataGenerator.__init__(generator, source_frame(), "label", seed=seed)
+    return generator
+
+
+def test_counts_labels_and_perturbation_bounds():
+    generator = make(SyntheticDataGenerator)
+    out = generator.generate_synthetic_data(n_fraud=30, n_non_fraud=20)
+
+    assert len(out) == 50
+    assert (out["label"].iloc[:30] == 1).all() and (out["label"].iloc[30:] == 0).all()
+    assert list(out.columns) == list(generator.df.columns)
+    amounts = out["amount"].dropna()
+    # Zeros stay zero, positives stay within ±30%, negatives are scaled too
+    assert set(amounts[amounts == 0]) <= {0.0}
+    assert amounts[amounts > 0].between(7.0, 13.0).all()
+    assert amounts[amounts < 0].between(-5.2, -2.8).all()
+
+
+def test_same_seed_same_rows():
+    first = make(BankDataGenerator, seed=5).generate_synthetic_data(40, 40)
+    second = make(BankDataGenerator, seed=5).generate_synthetic_data(40, 40)
+    other = make(BankDataGenerator, seed=6).generate_synthetic_data(40, 40)
+    pd.testing.assert_frame_equal(first, second)
+    assert not first.equals(other)
+
+
+def test_bank_fills_zeros_and_resamples_known_categories():
+    out = make(BankDataGenerator).generate_synthetic_data(100, 100)
+    amounts = out["amount"].dropna()
+    assert (amounts != 0).all()
+    assert set(out["channel"]) <= {"web", "app", "pos"}
+
+
+def test_ecommerce_fraud_scaling_and_fresh_ids():
+    out = make(EcommerceDataGenerator).generate_synthetic_data(50, 50)
+    fraud_amounts = out.loc[out["label"] == 1, "amount"].dropna()
+    assert fraud_amounts[fraud_amounts > 0].between(15.0, 25.0).all()
+    ids = out["Transaction ID"]
+    assert ids.is_unique
+    assert all(uuid.UUID(i).version == 4 for i in ids)
+
+
+def test_write_streams_exact_row_and_fraud_counts(tmp_path):
+    generator = make(SyntheticDataGenerator)
+    path = tmp_path / "load.csv"
+    written = generator.write(str(path), n_rows=1005, fraud_ratio=0.3, chunk_size=100)
+
+    loaded = pd.read_csv(path)
+    assert written == len(loaded) == 1005
+    assert loaded["label"].sum() == round(1005 * 0.3)
+
+
+def write_sources(tmp_path):
+    frame = source_frame()
+    sources = {}
+    for domain, label in [("vehicle", "FraudFound_P"), ("bank", "fraud_bool"), ("ecommerce", "Is Fraudulent")]:
+        path = tmp_path / f"{domain}_source.csv"
+        frame.rename(columns={"label": label}).to_csv(path, index=False)
+        sources[domain] = str(path)
+    return sources
+
+
+def test_output_is_independent_of_worker_count(tmp_path):
+    sources = write_sources(tmp_path)
+    domains = list(sources)
+    serial = run_generation(domains, workers=1, sources=sources, output_dir=str(tmp_path / "serial"))
+    parallel = run_generation(domains, workers=3, sources=sources, output_dir=str(tmp_path / "parallel"))
+    # A domain's stream does not depend on which other domains run
+    alone = run_generation(["bank"], sources=sources, output_dir=str(tmp_path / "alone"))
+
+    assert [r["domain"] for r in parallel] == domains
+    for a, b in zip(serial, parallel):
+        assert a["rows"] == b["rows"] == 50 and a["rows_per_sec"] > 0
+        assert open(a["path"]).read() == open(b["path"]).read()
+    assert open(alone[0]["path"]).read() == open(serial[1]["path"]).read()
+
+
+def test_cli_streams_rows_per_domain(tmp_path):
+    sources = write_sources(tmp_path)
+    results = main(["--domains", "vehicle", "--rows", "250", "--chunk-size", "100",
+                    "--source", f"vehicle={sources['vehicle']}", "--output-dir", str(tmp_path / "out")])
+    assert results[0]["rows"] == 250
+    assert len(pd.read_csv(results[0]["path"])) == 250
+
+
+def test_spawned_seeds_are_independent_and_repeatable():
+    root = np.random.SeedSequence(7)
+    first = spawn_seeds(root, 3)
+    again = spawn_seeds(root, 3)
+    draws = [np.random.default_rng(s).integers(0, 2**32, 8).tolist() for s in first]
+    assert draws == [np.random.default_rng(s).integers(0, 2**32, 8).tolist() for s in again]
+    assert len({tuple(d) for d in draws}) == 3
+    # The sampling child never replays the row stream
+    assert draws[0] != np.random.default_rng(root).integers(0, 2**32, 8).tolist()
+    assert [s.spawn_key for s in spawn_seeds(7, 2)] == [(0,), (1,)]
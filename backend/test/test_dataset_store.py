@@ -0,0 +1,111 @@
+"""
+Cached test-data store behind /test/run-test.
+"""
+
+import os
+import threading
+import pandas as pd
+import pytest
+from services.dataset_store import DatasetStore, find_label_column, read_dataset
+
+
+def write_csv(path, labels, mtime=None):
+    pd.DataFrame({"amount": range(len(labels)), "is_fraud": labels}).to_csv(path, index=False)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def test_labels_split_once_for_int_and_string_values(tmp_path):
+    path = tmp_path / "bank.csv"
+    pd.DataFrame({"amount": [1, 2, 3, 4, 5], "fraud_bool": [1, "0", "1", 0, "x"]}).to_csv(path, index=False)
+    dataset = DatasetStore({"bank": str(path)}).get("bank")
+    assert dataset.label_column == "fraud_bool"
+    assert dataset.fraud_index.tolist() == [0, 2]
+    assert dataset.legit_index.tolist() == [1, 3]
+
+
+def test_sample_draws_distinct_rows_of_the_requested_label(tmp_path):
+    path = tmp_path / "vehicle.csv"
+    write_csv(path, [1, 0] * 50)
+    store = DatasetStore({"vehicle": str(path)}, seed=7)
+
+    rows = store.sample("vehicle", "fraud", 10)
+    assert len(rows) == 10
+    assert all(r["is_fraud"] == 1 for r in rows)
+    assert len({r["amount"] for r in rows}) == 10
+    assert isinstance(rows[0]["amount"], int)
+
+    # Asking for more than exist returns every matching row
+    assert len(store.sample("vehicle", "non-fraud", 500)) == 50
+
+
+def test_file_parsed_once_until_mtime_changes(tmp_path):
+    path = tmp_path / "ethereum.csv"
+    write_csv(path, [1, 0], mtime=1_000_000_000)
+    store = DatasetStore({"ethereum": str(path)})
+
+    first = store.get("ethereum")
+    assert store.get("ethereum") is first
+    assert store.stats == {"loads": 1, "hits": 1}
+
+    write_csv(path, [1, 1, 0], mtime=2_000_000_000)
+    reloaded = store.get("ethereum")
+    assert reloaded is not first
+    assert len(reloaded.fraud_index) == 2
+    assert store.stats["loads"] == 2
+
+
+def test_slow_parse_does_not_block_other_types(tmp_path):
+    write_csv(tmp_path / "bank.csv", [1, 0])
+    write_csv(tmp_path / "vehicle.csv", [1, 0])
+    reading, release = threading.Event(), threading.Event()
+
+    def reader(path):
+        if path.endswith("bank.csv"):
+            reading.set()
+            release.wait(5)
+        return read_dataset(path)
+
+    store = DatasetStore({"bank": str(tmp_path / "bank.csv"), "vehicle": str(tmp_path / "vehicle.csv")},
+                         reader=reader)
+    loader = threading.Thread(target=store.get, args=("bank",))
+    loader.start()
+    assert reading.wait(5)
+    try:
+        # The bank parse is still running; vehicle loads and samples meanwhile
+        assert len(store.sample("vehicle", "fraud", 1)) == 1
+        assert "bank" not in store._datasets
+    finally:
+        release.set()
+        loader.join()
+    assert store.stats["loads"] == 2
+
+
+def test_file_replaced_during_parse_is_read_again(tmp_path):
+    path = tmp_path / "ethereum.csv"
+    write_csv(path, [1, 0], mtime=1_000_000_000)
+    reads = []
+
+    def reader(source):
+        frame = read_dataset(source)
+        reads.append(len(frame))
+        if len(reads) == 1:
+            write_csv(path, [1, 1, 0], mtime=2_000_000_000)
+        return frame
+
+    dataset = DatasetStore({"ethereum": str(path)}, reader=reader).get("ethereum")
+    assert reads == [2, 3]
+    assert len(dataset) == 3 and dataset.mtime == 2_000_000_000
+
+
+def test_unknown_type_and_missing_file(tmp_path):
+    store = DatasetStore({"bank": str(tmp_path / "missing.csv")})
+    with pytest.raises(ValueError):
+        store.get("vehicle")
+    with pytest.raises(FileNotFoundError):
+        store.get("bank")
+
+
+def test_label_column_falls_back_to_name_scan():
+    assert find_label_column(["a", "Is Fraudulent"], "ecommerce") == "Is Fraudulent"
+    assert find_label_column(["a", "fraud_flag"], "ethereum") == "fraud_flag"
@@ -0,0 +1,107 @@
+"""
+Dashboard event stream: committed FraudLog changes fan out to subscribers.
+"""
+
+import asyncio
+import threading
+from models.fraud_log import FraudLog
+from services.event_broadcaster import EventBroadcaster, broadcaster, format_sse
+
+
+async def drain(queue, timeout=0.2):
+    messages = []
+    try:
+        while True:
+            messages.append(await asyncio.wait_for(queue.get(), timeout))
+    except asyncio.TimeoutError:
+        return messages
+
+
+def test_publish_from_worker_thread_reaches_every_subscriber():
+    async def scenario():
+        hub = EventBroadcaster()
+        queues = [hub.subscribe() for _ in range(3)]
+        thread = threading.Thread(target=hub.publish, args=("created", {"n": 1}))
+        thread.start()
+        thread.join()
+        return [await drain(q) for q in queues]
+
+    for messages in asyncio.run(scenario()):
+        assert [(m["event"], m["data"]) for m in messages] == [("created", {"n": 1})]
+
+
+def test_slow_subscriber_gets_resync_instead_of_backlog():
+    async def scenario():
+        hub = EventBroadcaster(max_queue=3)
+        queue = hub.subscribe()
+        for i in range(10):
+            hub.publish("created", {"n": i})
+        return await drain(queue)
+
+    messages = asyncio.run(scenario())
+    assert messages[0]["event"] == "resync"
+    assert len(messages) <= 3
+
+
+def test_committed_rows_are_published_and_rollbacks_are_not(session_factory):
+    async def scenario():
+        queue = broadcaster.subscribe()
+        try:
+            def write():
+                db = session_factory()
+                db.add(FraudLog(tx_hash="tx_stream_1", transaction_type="bank", fraud_score=87, model_version="v1.0"))
+                db.commit()
+                db.add(FraudLog(tx_hash="tx_stream_2", transaction_type="bank", fraud_score=10, model_version="v1.0"))
+                db.flush()
+                db.rollback()
+                log = db.query(FraudLog).filter(FraudLog.tx_hash == "tx_stream_1").one()
+                log.gas_used = 21000
+                db.commit()
+                db.close()
+            await asyncio.to_thread(write)
+            return await drain(queue)
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    messages = asyncio.run(scenario())
+    assert [m["event"] for m in messages] == ["created", "updated"]
+    created = messages[0]["data"]
+    assert created["record"]["tx_hash"] == "tx_stream_1"
+    assert created["record"]["created_at"] is not None
+    assert created["summary_delta"] == {"transaction_type": "bank", "histogram_bin": 8, "fraud": True}
+    assert messages[1]["data"]["record"]["gas_used"] == 21000
+
+
+def test_sse_frame_format():
+    frame = format_sse({"id": 7, "event": "created", "data": {"a": 1}})
+    assert frame == 'id: 7\nevent: created\ndata: {"a": 1}\n\n'
+
+
+def test_rows_in_the_snapshot_are_not_streamed_again(session_factory):
+    from routers.dash import already_in_snapshot, load_snapshot
+
+    def add(tx_hash):
+        db = session_factory()
+        db.add(FraudLog(tx_hash=tx_hash, transaction_type="vehicle", fraud_score=42, model_version="v1.0"))
+        db.commit()
+        db.close()
+
+    async def scenario():
+        # Same order as /stats/stream: subscribe first, then read the snapshot
+        queue = broadcaster.subscribe()
+        try:
+            await asyncio.to_thread(add, "tx_before_snapshot")
+            db = session_factory()
+            snapshot = load_snapshot(db)
+            db.close()
+            await asyncio.to_thread(add, "tx_after_snapshot")
+            return snapshot, await drain(queue)
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    snapshot, messages = asyncio.run(scenario())
+    assert snapshot["summary"]["total_records"] == 1
+    assert [r["tx_hash"] for r in snapshot["records"]] == ["tx_before_snapshot"]
+    streamed = [m["data"]["record"]["tx_hash"] for m in messages
+                if m["event"] == "created" and not already_in_snapshot(m, snapshot["last_id"])]
+    assert streamed == ["tx_after_snapshot"]
@@ -0,0 +1,231 @@
+"""
+Equivalence tests: fast dict-to-array transforms vs. the pandas transforms.
+
+Every record is pushed through both paths the way FraudDetectionService sees
+it (one record at a time) and the resulting feature rows must match.
+"""
+
+import os
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from utils.load_models import FeatureLayout, BASE_DIR, predict_dense
+from utils.fast_transforms import records_to_matrix
+from utils.transforms import (
+    transform_vehicle_fraud_data,
+    transform_bank_fraud_data,
+    transform_ecommerce_fraud_data,
+    transform_ethereum_fraud_data
+)
+
+
+PANDAS_TRANSFORMS = {
+    "vehicle": transform_vehicle_fraud_data,
+    "bank": transform_bank_fraud_data,
+    "ecommerce": transform_ecommerce_fraud_data,
+    "ethereum": transform_ethereum_fraud_data
+}
+
+TEST_DATA_FILES = {
+    "vehicle": ("vehicle_test_data.csv", "FraudFound_P"),
+    "bank": ("bank_test_data.csv", "fraud_bool"),
+    "ecommerce": ("ecommerce_test_data.csv", "Is Fraudulent"),
+    "ethereum": ("ethereum_test_data.csv", "Fraud")
+}
+
+# Hand-written records so the suite runs even without the generated CSVs
+SAMPLE_RECORDS = {
+    "vehicle": [
+        {'Month': 'Dec', 'WeekOfMonth': 5, 'DayOfWeek': 'Wednesday', 'Make': 'Honda', 'AccidentArea': 'Urban',
+         'DayOfWeekClaimed': 'Tuesday', 'MonthClaimed': 'Jan', 'WeekOfMonthClaimed': 1, 'Sex': 'Female',
+         'MaritalStatus': 'Single', 'Age': 21, 'Fault': 'Policy Holder', 'PolicyType': 'Sport - Liability',
+         'VehicleCategory': 'Sport', 'VehiclePrice': 'more than 69000', 'PolicyNumber': 1, 'RepNumber': 12,
+         'Deductible': 300, 'DriverRating': 1, 'Days_Policy_Accident': 'more than 30',
+         'Days_Policy_Claim': 'more than 30', 'PastNumberOfClaims': 'none', 'AgeOfVehicle': '3 years',
+         'AgeOfPolicyHolder': '26 to 30', 'PoliceReportFiled': 'No', 'WitnessPresent': 'No',
+         'AgentType': 'External', 'NumberOfSuppliments': 'none', 'AddressChange_Claim': '1 year',
+         'NumberOfCars': '3 to 4', 'Year': 1994, 'BasePolicy': 'Liability'},
+        {'Make': 'Toyota', 'AccidentArea': 'Rural', 'MonthClaimed': 'Sep', 'Sex': 'Male', 'MaritalStatus': 'Married',
+         'Age': 0, 'Fault': 'Third Party', 'PolicyType': 'Sedan - Collision', 'VehicleCategory': 'Sedan',
+         'VehiclePrice': '20000 to 29000', 'RepNumber': 7.3, 'Deductible': 400.0, 'DriverRating': 3.6,
+         'PastNumberOfClaims': '2 to 4', 'AgeOfVehicle': 'new', 'AgeOfPolicyHolder': '31 to 35',
+         'AddressChange_Claim': 'no change', 'Year': 1996, 'BasePolicy': 'All Perils'},
+        # Already-encoded numeric values are passed through untouched
+        {'Make': 'Mazda', 'AccidentArea': 1, 'Fault': 0, 'VehiclePrice': 1, 'AgeOfVehicle': 2, 'Age': 80,
+         'DriverRating': np.nan, 'Year': 1995, 'MonthClaimed': np.nan},
+    ],
+    "bank": [
+        {'income': 0.9, 'name_email_similarity': 0.16, 'prev_address_months_count': -1,
+         'current_address_months_count': 88, 'customer_age': 50, 'days_since_request': 0.02,
+         'intended_balcon_amount': -1.3, 'payment_type': 'AA', 'zip_count_4w': 769, 'velocity_6h': 10650.7,
+         'employment_status': 'CB', 'credit_risk_score': 185, 'email_is_free': 0, 'housing_status': 'BA',
+         'phone_home_valid': 1, 'has_other_cards': 0, 'proposed_credit_limit': 500.0, 'source': 'INTERNET',
+         'session_length_in_minutes': 3.9, 'device_os': 'windows', 'keep_alive_session': 0, 'month': 7},
+        {'income': np.nan, 'customer_age': 20, 'payment_type': None, 'velocity_6h': 0.0,
+         'email_is_free': True, 'device_os': 'linux', 'month': 0},
+    ],
+    "ecommerce": [
+        {'Transaction ID': 'c12e07a0', 'Customer ID': 'd1b87f62', 'Transaction Amount': 58.09,
+         'Transaction Date': '2024-02-20 05:58:41', 'Payment Method': 'bank transfer',
+         'Product Category': 'electronics', 'Quantity': 1, 'Customer Age': 17,
+         'Customer Location': 'Amandaborough', 'Device Used': 'tablet', 'IP Address': '212.195.49.198',
+         'Shipping Address': '123 Main St', 'Billing Address': '123 Main St', 'Account Age Days': 30,
+         'Transaction Hour': 5},
+        {'Transaction ID': 'x', 'Customer ID': 'y', 'Transaction Amount': 1020.5,
+         'Transaction Date': '2024-03-31 23:10:00', 'Payment Method': 'PayPal',
+         'Product Category': 'toys & games', 'Quantity': 4, 'Customer Age': 4,
+         'Device Used': 'mobile', 'Shipping Address': 'A', 'Billing Address': 'B',
+         'Account Age Days': 1, 'Transaction Hour': 23},
+    ],
+    "ethereum": [
+        {'blockNumber': 17000000, 'confirmations': 120, 'Month': 3, 'Day': 14, 'Hour': 22,
+         'mean_value_received': 0.52, 'variance_value_received': 0.1, 'total_received': 12.5,
+         'time_diff_first_last_received': 86400.0, 'total_tx_sent': 40, 'total_tx_sent_malicious': 2,
+         'total_tx_sent_unique': 31, 'total_tx_sent_malicious_unique': 1,
+         'total_tx_received_malicious_unique': 0, 'received_coef_variation': 1.7},
+        {'Day': 31, 'Hour': 0, 'mean_value_received': np.nan, 'total_received': 0.0,
+         'time_diff_first_last_received': 0.0, 'total_tx_sent': 0, 'total_tx_sent_unique': 0},
+    ],
+}
+
+
+# Fields sent as JSON null (None) or left out of the request entirely
+NULLABLE_FIELDS = {
+    "vehicle": ['Age', 'DriverRating'],
+    "bank": ['income', 'customer_age', 'payment_type', 'velocity_6h'],
+    "ecommerce": ['Transaction Amount', 'Quantity', 'Customer Age', 'Account Age Days',
+                  'Transaction Date', 'Shipping Address'],
+    "ethereum": ['Hour', 'Day', 'total_received', 'time_diff_first_last_received',
+                 'total_tx_sent', 'total_tx_sent_unique'],
+}
+
+# Read alongside another field: a request without them scores as if they were null
+SECONDARY_FIELDS = {'total_tx_sent', 'time_diff_first_last_received'}
+
+NULL_CASES = [(t, field) for t, fields in sorted(NULLABLE_FIELDS.items()) for field in fields]
+
+
+def load_test_records(transaction_type):
+    """Records from the generated test data, or [] when the CSV is unavailable."""
+    filename, fraud_col = TEST_DATA_FILES[transaction_type]
+    path = os.path.join(BASE_DIR, 'data', 'test_data', filename)
+    try:
+        df = pd.read_csv(path)
+    except Exception:
+        return []
+    if fraud_col not in df.columns:
+        # e.g. an un-fetched git-lfs pointer file
+        return []
+    return df.drop(columns=[fraud_col]).to_dict('records')
+
+
+def pandas_row(record, transaction_type, layout):
+    transformed = PANDAS_TRANSFORMS[transaction_type](pd.DataFrame([record]), selected_features=None)
+    return layout.fill_from_frame(transformed)[0]
+
+
+def reference_layout(records, transaction_type):
+    """Layout over every numeric column the pandas path produces."""
+    columns = []
+    for record in records:
+        transformed = PANDAS_TRANSFORMS[transaction_type](pd.DataFrame([record]), selected_features=None)
+        for col in transformed.select_dtypes(include=['number', 'bool']).columns:
+            if col not in columns:
+                columns.append(col)
+    # A feature no record produces must stay 0 on both paths
+    return FeatureLayout(columns + ['__never_produced__'])
+
+
+def assert_equivalent(records, transaction_type, layout):
+    fast = records_to_matrix(records, transaction_type, layout)
+    assert fast.shape == (len(records), layout.n_features)
+    assert fast.dtype == np.float32
+    for i, record in enumerate(records):
+        np.testing.assert_allclose(
+            fast[i], pandas_row(record, transaction_type, layout),
+            rtol=1e-6, equal_nan=True,
+            err_msg=f"{transaction_type} record {i} differs: {record}"
+        )
+
+
+@pytest.mark.parametrize("transaction_type", sorted(PANDAS_TRANSFORMS))
+def test_sample_records_match_pandas(transaction_type):
+    records = SAMPLE_RECORDS[transaction_type]
+    assert_equivalent(records, transaction_type, reference_layout(records, transaction_type))
+
+
+@pytest.mark.parametrize("transaction_type", sorted(PANDAS_TRANSFORMS))
+def test_generated_test_data_matches_pandas(transaction_type):
+    records = load_test_records(transaction_type)
+    if not records:
+        pytest.skip(f"generated test data for {transaction_type} not available")
+    assert_equivalent(records, transaction_type, reference_layout(records, transaction_type))
+
+
+def test_vehicle_model_layout_matches_pandas():
+    features = joblib_features('vehicle_model_features.pkl')
+    if not features:
+        pytest.skip("vehicle feature list not available")
+    records = SAMPLE_RECORDS["vehicle"] + load_test_records("vehicle")
+    assert_equivalent(records, "vehicle", FeatureLayout(features))
+
+
+def null_row(record, transaction_type, field, layout):
+    """The pandas row when `field` is null, as a batch sees it: a float column of NaN."""
+    frame = pd.DataFrame([record])
+    frame[field] = np.nan
+    transformed = PANDAS_TRANSFORMS[transaction_type](frame, selected_features=None)
+    return layout.fill_from_frame(transformed)[0]
+
+
+@pytest.mark.parametrize("transaction_type,field", NULL_CASES)
+def test_null_fields_match_pandas(transaction_type, field):
+    base = SAMPLE_RECORDS[transaction_type][0]
+    layout = reference_layout([base], transaction_type)
+    fast = records_to_matrix([dict(base, **{field: None})], transaction_type, layout)[0]
+    np.testing.assert_allclose(fast, null_row(base, transaction_type, field, layout), rtol=1e-6, equal_nan=True)
+
+
+@pytest.mark.parametrize("transaction_type,field", NULL_CASES)
+def test_missing_fields_match_pandas(transaction_type, field):
+    base = SAMPLE_RECORDS[transaction_type][0]
+    layout = reference_layout([base], transaction_type)
+    record = {col: value for col, value in base.items() if col != field}
+    fast = records_to_matrix([record], transaction_type, layout)[0]
+    if field in SECONDARY_FIELDS:
+        expected = null_row(base, transaction_type, field, layout)
+        if field in layout.index:
+            expected[layout.index[field]] = 0
+    else:
+        expected = pandas_row(record, transaction_type, layout)
+    np.testing.assert_allclose(fast, expected, rtol=1e-6, equal_nan=True)
+
+
+def test_unseen_category_is_ignored():
+    layout = FeatureLayout(['Make_Honda', 'Make_Toyota', 'Age'])
+    row = records_to_matrix([{'Make': 'Ferrari', 'Age': 30}], "vehicle", layout)[0]
+    np.testing.assert_array_equal(row, [0, 0, 1])
+
+
+def test_feature_name_warning_is_only_silenced_for_dense_matrices():
+    from sklearn.linear_model import LogisticRegression
+    import services.ai_service  # noqa: F401  (must not install a process-wide filter)
+    X = pd.DataFrame({'Age': [20.0, 30.0, 40.0, 50.0], 'Deductible': [300.0, 400.0, 300.0, 500.0]})
+    model = LogisticRegression().fit(X, [0, 1, 0, 1])
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        predict_dense(model, X.to_numpy(dtype=np.float32))
+    with pytest.warns(UserWarning, match="valid feature names"):
+        model.predict_proba(X.to_numpy())
+
+
+def joblib_features(filename):
+    import joblib
+    path = os.path.join(BASE_DIR, 'model_wts', filename)
+    try:
+        data = joblib.load(path)
+    except Exception:
+        return None
+    return data.get('feature_names') if isinstance(data, dict) else data
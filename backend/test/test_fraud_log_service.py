@@ -0,0 +1,75 @@
+"""
+Batched FraudLog persistence, session_scope and SQLite pragmas.
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from core.database import Base, configure_sqlite, session_scope
+from models.fraud_log import FraudLog
+from models.chain_outbox import ChainOutbox, STATUS_PENDING
+from services.fraud_log_service import save_fraud_logs
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = configure_sqlite(create_engine(f"sqlite:///{tmp_path / 'fraud.db'}",
+                                            connect_args={"check_same_thread": False}))
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def make_logs(n):
+    return [FraudLog(tx_hash=f"tx_bulk_{i}", transaction_type="bank", fraud_score=i, model_version="v1.0")
+            for i in range(n)]
+
+
+def test_pragmas_set_on_connect(engine):
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # 1 == NORMAL
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+
+
+def test_batch_is_written_with_one_commit(session_factory):
+    commits = []
+    listener = lambda session: commits.append(session)
+    event.listen(session_factory, "after_commit", listener)
+    try:
+        with session_scope(session_factory) as db:
+            logs = make_logs(25)
+            entries = save_fraud_logs(db, logs)
+            assert all(log.id is not None for log in logs)
+            assert [e.fraud_log_id for e in entries] == [log.id for log in logs]
+    finally:
+        event.remove(session_factory, "after_commit", listener)
+    assert len(commits) == 1
+
+    with session_scope(session_factory) as db:
+        assert db.query(FraudLog).count() == 25
+        assert {e.status for e in db.query(ChainOutbox)} == {STATUS_PENDING}
+        assert db.query(ChainOutbox).count() == 25
+
+
+def test_session_scope_rolls_back_on_error(session_factory):
+    rolled_back = []
+    listener = lambda session: rolled_back.append(session)
+    with pytest.raises(RuntimeError):
+        with session_scope(session_factory) as db:
+            event.listen(db, "after_rollback", listener)
+            save_fraud_logs(db, make_logs(3))
+            raise RuntimeError("boom")
+    assert rolled_back
+    with session_scope(session_factory) as db:
+        assert db.query(FraudLog).count() == 0
+
+
+def test_empty_batch_is_a_no_op(session_factory):
+    with session_scope(session_factory) as db:
+        assert save_fraud_logs(db, []) == []
@@ -0,0 +1,67 @@
+"""
+Merkle tree helpers used for batch anchoring.
+"""
+
+import pytest
+from eth_utils import keccak
+from utils.merkle import (
+    fraud_leaf, hash_pair, build_tree, merkle_root, merkle_proof, record_hash, verify_proof, verify_record
+)
+
+
+def leaves(n):
+    return [fraud_leaf(f"tx_{i}", i, "v1.0") for i in range(n)]
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 5, 7, 8, 9, 33])
+def test_every_leaf_proves_against_root(n):
+    levels = build_tree(leaves(n))
+    root = merkle_root(levels)
+    for i, leaf in enumerate(levels[0]):
+        proof = merkle_proof(levels, i)
+        assert len(proof) <= (n - 1).bit_length()
+        assert verify_proof(leaf, proof, root)
+
+
+def test_wrong_leaf_or_sibling_fails():
+    levels = build_tree(leaves(6))
+    root = merkle_root(levels)
+    proof = merkle_proof(levels, 2)
+    assert not verify_proof(fraud_leaf("tx_2", 3, "v1.0"), proof, root)
+    assert not verify_proof(levels[0][2], proof[:-1] + [keccak(b"x")], root)
+
+
+def test_single_leaf_is_its_own_root():
+    levels = build_tree(leaves(1))
+    assert merkle_root(levels) == levels[0][0]
+    assert merkle_proof(levels, 0) == []
+
+
+def test_pair_hash_is_order_independent():
+    a, b = leaves(2)
+    assert hash_pair(a, b) == hash_pair(b, a) == keccak(min(a, b) + max(a, b))
+
+
+def test_leaf_depends_on_every_field():
+    base = fraud_leaf("tx_1", 10, "v1.0")
+    assert base != fraud_leaf("tx_2", 10, "v1.0")
+    assert base != fraud_leaf("tx_1", 11, "v1.0")
+    assert base != fraud_leaf("tx_1", 10, "v1.1")
+
+
+def test_internal_node_is_not_a_valid_record():
+    records = [record_hash(f"tx_{i}", i, "v1.0") for i in range(4)]
+    levels = build_tree([keccak(record) for record in records])
+    root = merkle_root(levels)
+    assert levels[0] == leaves(4)
+    assert verify_record(records[1], merkle_proof(levels, 1), root)
+    # The parent of leaves 0 and 1 proves against the root as a node,
+    # but not when presented as a record
+    node, sibling = levels[1]
+    assert verify_proof(node, [sibling], root)
+    assert not verify_record(node, [sibling], root)
+
+
+def test_empty_tree_rejected():
+    with pytest.raises(ValueError):
+        build_tree([])
@@ -0,0 +1,153 @@
+"""
+Versioned model registry over a model directory and the hot-swap watcher.
+"""
+
+import os
+import pytest
+from services.model_watcher import ModelWatcher
+from utils.load_models import ModelRegistry, discover_artifacts, LEGACY_VERSION
+
+
+def make_registry(model_dir, keep_versions=3):
+    def missing():
+        raise FileNotFoundError("no weights")
+    return ModelRegistry(loaders={"ethereum": missing, "bank": missing},
+                         model_dir=str(model_dir), keep_versions=keep_versions)
+
+
+def test_discover_artifacts_orders_by_mtime(tmp_path, write_model):
+    write_model(tmp_path, "ethereum_model_weights.pkl", 0.1, age=120)
+    write_model(tmp_path, "ethereum_model_weights-v2.pkl", 0.2, age=60)
+    write_model(tmp_path, "ethereum_model_features.pkl", 0.0)
+    (tmp_path / "ethereum_model_weights.mmap.joblib").write_bytes(b"")
+
+    artifacts = discover_artifacts(str(tmp_path))
+    assert list(artifacts) == ["ethereum"]
+    assert [a.version for a in artifacts["ethereum"]] == [LEGACY_VERSION, "v2"]
+
+
+def test_registry_serves_newest_artifact(tmp_path, write_model):
+    write_model(tmp_path, "ethereum_model_weights.pkl", 0.1, age=120)
+    write_model(tmp_path, "ethereum_model_weights-v2.pkl", 0.2, age=60)
+    registry = make_registry(tmp_path)
+
+    (model, layout), version = registry.get_versioned("ethereum")
+    assert version == "v2" and model.p == 0.2
+    assert layout.features == ['total_received', 'total_tx_sent']
+
+
+def test_watcher_swaps_in_new_version_and_retains_old(tmp_path, write_model):
+    write_model(tmp_path, "ethereum_model_weights.pkl", 0.1, age=120)
+    registry = make_registry(tmp_path)
+    reloaded = []
+    registry.add_reload_listener(reloaded.append)
+    old_entry, old_version = registry.get_versioned("ethereum")
+    assert old_version == LEGACY_VERSION
+
+    watcher = ModelWatcher(registry, poll_interval=0.01)
+    assert watcher.poll_once() == []
+
+    write_model(tmp_path, "ethereum_model_weights-v1.1.pkl", 0.3)
+    assert watcher.poll_once() == [("ethereum", "v1.1")]
+    assert registry.version("ethereum") == "v1.1"
+    assert registry.get("ethereum")[0].p == 0.3
+    assert reloaded == ["ethereum"]
+
+    # The previous version stays available for shadow scoring
+    assert registry.versions("ethereum") == [LEGACY_VERSION, "v1.1"]
+    assert registry.get_version("ethereum", LEGACY_VERSION) is old_entry
+    assert watcher.poll_once() == []
+
+
+def test_watcher_skips_unloaded_types_and_fresh_files(tmp_path, write_model):
+    write_model(tmp_path, "ethereum_model_weights.pkl", 0.1, age=120)
+    write_model(tmp_path, "bank_model_weights-v3.pkl", 0.5)
+    registry = make_registry(tmp_path)
+    registry.get("ethereum")
+    watcher = ModelWatcher(registry, min_age=30)
+
+    # Still being written (mtime inside min_age)
+    write_model(tmp_path, "ethereum_model_weights-v2.pkl", 0.2, age=0)
+    assert watcher.poll_once() == []
+    assert not registry.is_loaded("bank")
+    assert registry.version("ethereum") == LEGACY_VERSION
+
+
+def test_broken_artifact_keeps_current_model(tmp_path, write_model):
+    write_model(tmp_path, "ethereum_model_weights.pkl", 0.1, age=120)
+    registry = make_registry(tmp_path)
+    registry.get("ethereum")
+
+    path = tmp_path / "ethereum_model_weights-v2.pkl"
+    path.write_bytes(b"not a pickle")
+    stamp = os.path.getmtime(path) - 60
+    os.utime(path, (stamp, stamp))
+
+    watcher = ModelWatcher(registry)
+    assert watcher.poll_once() == []
+    assert watcher.poll_once() == []  # not retried until the file changes
+    assert registry.version("ethereum") == LEGACY_VERSION
+    assert "reload_error" in registry.stats()["ethereum"]
+
+
+def test_same_version_with_new_weights_is_refused(tmp_path, write_model):
+    path = write_model(tmp_path, "ethereum_model_weights-v2.pkl", 0.1, age=120)
+    registry = make_registry(tmp_path)
+    registry.get("ethereum")
+    watcher = ModelWatcher(registry)
+
+    # Overwritten in place: same file name and version, different weights
+    write_model(tmp_path, "ethereum_model_weights-v2.pkl", 0.9)
+    assert watcher.poll_once() == []
+    assert watcher.poll_once() == []
+    assert registry.get("ethereum")[0].p == 0.1
+    (artifact,) = discover_artifacts(str(tmp_path))["ethereum"]
+    with pytest.raises(ValueError, match="already loaded"):
+        registry.install(artifact)
+
+    # Published under a new version it is swapped in
+    os.replace(path, tmp_path / "ethereum_model_weights-v3.pkl")
+    assert watcher.poll_once() == [("ethereum", "v3")]
+    assert registry.get("ethereum")[0].p == 0.9
+
+
+def test_retained_versions_are_bounded(tmp_path, write_model):
+    write_model(tmp_path, "ethereum_model_weights.pkl", 0.1, age=300)
+    registry = make_registry(tmp_path, keep_versions=2)
+    registry.get("ethereum")
+    watcher = ModelWatcher(registry)
+    for i, age in ((2, 200), (3, 100)):
+        write_model(tmp_path, f"ethereum_model_weights-v{i}.pkl", i / 10, age=age)
+        watcher.poll_once()
+
+    assert registry.versions("ethereum") == ["v2", "v3"]
+    assert registry.get_version("ethereum", LEGACY_VERSION) is None
+
+
+def test_loader_fallback_without_artifacts(tmp_path):
+    registry = make_registry(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        registry.get("bank")
+    assert registry.stats()["bank"]["error"] == "no weights"
+
+
+def test_failed_load_is_not_retried_until_backoff_expires(tmp_path, write_model):
+    calls = []
+
+    def missing():
+        calls.append(1)
+        raise FileNotFoundError("no weights")
+
+    registry = ModelRegistry(loaders={"bank": missing}, model_dir=str(tmp_path), retry_seconds=60)
+    with pytest.raises(FileNotFoundError):
+        registry.get("bank")
+    for _ in range(5):
+        with pytest.raises(RuntimeError, match="no weights"):
+            registry.get("bank")
+    assert len(calls) == 1
+
+    # Backoff over: the next request loads again, and succeeds once weights appear
+    registry.retry_seconds = 0
+    write_model(tmp_path, "bank_model_weights.pkl", 0.3)
+    assert registry.get("bank")[0].p == 0.3
+    assert len(calls) == 1
@@ -0,0 +1,124 @@
+"""
+ONNX backend: exported models must reproduce predict_proba of the
+LightGBM / XGBoost / scikit-learn models they were converted from.
+Skipped when onnxruntime or the converters are not installed.
+"""
+
+import os
+import joblib
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnxmltools")
+pytest.importorskip("skl2onnx")
+
+from utils.load_models import compile_feature_layout, discover_artifacts, load_model_path
+from utils.onnx_backend import (
+    DEFAULT_TOLERANCE,
+    OnnxModel,
+    convert_model,
+    export_artifact,
+    onnx_path_for,
+    parity_rows
+)
+
+
+def lightgbm_model():
+    lightgbm = pytest.importorskip("lightgbm")
+    return lightgbm.LGBMClassifier(n_estimators=25, num_leaves=15, verbose=-1)
+
+
+def xgboost_model():
+    xgboost = pytest.importorskip("xgboost")
+    return xgboost.XGBClassifier(n_estimators=25, max_depth=4)
+
+
+def random_forest_model():
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0)
+
+
+def gradient_boosting_model():
+    from sklearn.ensemble import GradientBoostingClassifier
+    return GradientBoostingClassifier(n_estimators=25, max_depth=3, random_state=0)
+
+
+def logistic_regression_model():
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression()
+
+
+@pytest.mark.parametrize("factory", [
+    lightgbm_model, xgboost_model, random_forest_model, gradient_boosting_model, logistic_regression_model
+], ids=lambda factory: factory.__name__.removesuffix("_model"))
+def test_onnx_matches_predict_proba(factory, training_data):
+    X, y = training_data
+    model = factory()
+    # No NaN support in sklearn's GradientBoostingClassifier or LogisticRegression
+    nan_free = type(model).__name__ in ("GradientBoostingClassifier", "LogisticRegression")
+    model.fit(X.fillna(0) if nan_free else X, y)
+    onnx_model = OnnxModel(convert_model(model).SerializeToString())
+
+    rows = parity_rows(model, 2000)
+    if nan_free:
+        rows = np.nan_to_num(rows)
+    diff = np.abs(onnx_model.predict_proba(rows)[:, 1] - model.predict_proba(rows)[:, 1])
+    assert diff.max() <= DEFAULT_TOLERANCE, type(model).__name__
+    # Feature names survive the export, so the request path can build its layout
+    assert list(onnx_model.feature_names_in_) == list(X.columns)
+    assert compile_feature_layout(onnx_model) is not None
+
+
+def test_intra_op_threads_do_not_change_scores(training_data):
+    lightgbm = pytest.importorskip("lightgbm")
+    X, y = training_data
+    serialized = convert_model(lightgbm.LGBMClassifier(n_estimators=25, verbose=-1).fit(X, y)).SerializeToString()
+    rows = X.to_numpy()
+    np.testing.assert_allclose(OnnxModel(serialized, intra_op_threads=1).predict_proba(rows),
+                               OnnxModel(serialized, intra_op_threads=4).predict_proba(rows), atol=1e-6)
+
+
+def test_onnx_backend_prefers_fresh_export(tmp_path, training_data):
+    lightgbm = pytest.importorskip("lightgbm")
+    X, y = training_data
+    path = str(tmp_path / "vehicle_model_weights.pkl")
+    joblib.dump(lightgbm.LGBMClassifier(n_estimators=5, verbose=-1).fit(X, y), path)
+
+    # No export yet: falls back to the pickle
+    assert not isinstance(load_model_path(path, backend="onnx"), OnnxModel)
+
+    (artifact,) = discover_artifacts(str(tmp_path))["vehicle"]
+    result = export_artifact(artifact, rows=500)
+    assert result["validated"] and result["path"] == onnx_path_for(path)
+    assert isinstance(load_model_path(path, backend="onnx"), OnnxModel)
+    assert not isinstance(load_model_path(path, backend="pickle"), OnnxModel)
+
+    # A newer pickle makes the export stale
+    stamp = os.path.getmtime(onnx_path_for(path)) + 10
+    os.utime(path, (stamp, stamp))
+    assert not isinstance(load_model_path(path, backend="onnx"), OnnxModel)
+
+
+def test_failed_parity_is_not_saved(tmp_path, training_data):
+    lightgbm = pytest.importorskip("lightgbm")
+    X, y = training_data
+    path = str(tmp_path / "bank_model_weights.pkl")
+    joblib.dump(lightgbm.LGBMClassifier(n_estimators=5, verbose=-1).fit(X, y), path)
+
+    (artifact,) = discover_artifacts(str(tmp_path))["bank"]
+    result = export_artifact(artifact, rows=500, tolerance=-1.0)
+    assert not result["validated"]
+    assert not os.path.exists(onnx_path_for(path))
+
+
+REPO_ARTIFACTS = [a for artifacts in discover_artifacts().values() for a in artifacts]
+
+
+@pytest.mark.parametrize("artifact", REPO_ARTIFACTS, ids=lambda a: f"{a.transaction_type}-{a.version}")
+def test_repo_models_export_within_tolerance(artifact):
+    model = load_model_path(artifact.path, mmap=False, backend="pickle")
+    onnx_model = OnnxModel(convert_model(model).SerializeToString())
+    rows = parity_rows(model, 5000)
+    diff = np.abs(onnx_model.predict_proba(rows)[:, 1] - model.predict_proba(rows)[:, 1])
+    assert diff.max() <= DEFAULT_TOLERANCE
@@ -0,0 +1,152 @@
+"""
+Prediction cache tests: repeated feature rows skip predict_proba, and a
+model reload never serves the previous model's results.
+"""
+
+import joblib
+import numpy as np
+from services.ai_service import FraudDetectionService, PredictionCache, feature_digests
+from utils.load_models import FeatureLayout, ModelRegistry, LEGACY_VERSION
+
+
+ETH_FEATURES = [
+    'blockNumber', 'confirmations', 'Month', 'Day', 'Hour', 'mean_value_received',
+    'variance_value_received', 'total_received', 'time_diff_first_last_received',
+    'total_tx_sent', 'total_tx_sent_malicious', 'total_tx_sent_unique',
+    'total_tx_sent_malicious_unique', 'total_tx_received_malicious_unique',
+    'received_coef_variation'
+]
+
+
+class CountingModel:
+    """Fraud probability = total_received / 10; counts scored rows."""
+
+    def __init__(self, offset=0.0):
+        self.offset = offset
+        self.rows_scored = 0
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        self.rows_scored += len(X)
+        p = np.clip(X[:, ETH_FEATURES.index('total_received')] / 10.0 + self.offset, 0.0, 1.0)
+        return np.column_stack([1 - p, p])
+
+
+class NamedCountingModel(CountingModel):
+    """CountingModel pickled into a model directory, with its feature names."""
+
+    feature_names_in_ = np.array(ETH_FEATURES)
+
+
+def record(received):
+    return {'blockNumber': 17000000, 'confirmations': 12, 'Month': 3, 'Day': 14, 'Hour': 22,
+            'mean_value_received': 0.5, 'total_received': float(received), 'time_diff_first_last_received': 3600.0,
+            'total_tx_sent': 4, 'total_tx_sent_unique': 3}
+
+
+def make_service(cache_size=100, models=None):
+    models = models if models is not None else [CountingModel()]
+    loads = iter(models)
+    registry = ModelRegistry(loaders={"ethereum": lambda: (next(loads), FeatureLayout(ETH_FEATURES))})
+    return FraudDetectionService(registry, cache_size=cache_size), models
+
+
+def test_repeated_record_is_served_from_cache():
+    service, (model,) = make_service()
+    first = service.detect_fraud(record(12), "ethereum")
+    second = service.detect_fraud(record(12), "ethereum")
+
+    assert first["success"] and second["success"]
+    assert first["fraud_score"] == second["fraud_score"]
+    assert model.rows_scored == 1
+    stats = service.cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["size"] == 1
+
+
+def test_batch_scores_only_uncached_rows():
+    service, (model,) = make_service()
+    service.detect_fraud_batch([record(1), record(2)], "ethereum")
+    result = service.detect_fraud_batch([record(2), record(3), record(1), record(4)], "ethereum")
+
+    assert result["success"]
+    assert model.rows_scored == 4  # 2 in the first batch, rows 3 and 4 in the second
+    uncached, _ = make_service(cache_size=0)
+    expected = uncached.detect_fraud_batch([record(2), record(3), record(1), record(4)], "ethereum")
+    assert result["fraud_scores"] == expected["fraud_scores"]
+
+
+def test_lru_evicts_oldest_entry():
+    service, (model,) = make_service(cache_size=2)
+    for received in (1, 2, 3):
+        service.detect_fraud(record(received), "ethereum")
+    service.detect_fraud(record(3), "ethereum")
+    service.detect_fraud(record(1), "ethereum")
+
+    stats = service.cache.stats()
+    assert stats["evictions"] >= 1
+    assert model.rows_scored == 4  # row 1 was evicted and scored again
+
+
+def test_reload_invalidates_cached_predictions():
+    service, models = make_service(models=[CountingModel(), CountingModel(offset=0.25)])
+    before = service.detect_fraud(record(6), "ethereum")["fraud_score"]
+    old_version = service.models.version("ethereum")
+
+    service.models.reload("ethereum")
+    after = service.detect_fraud(record(6), "ethereum")["fraud_score"]
+
+    assert service.models.version("ethereum") != old_version
+    assert after > before
+    assert models[1].rows_scored == 1
+    assert service.cache.stats()["invalidations"] == 1
+
+
+def test_disabled_cache_always_calls_model():
+    service, (model,) = make_service(cache_size=0)
+    service.detect_fraud(record(5), "ethereum")
+    service.detect_fraud(record(5), "ethereum")
+
+    assert service.cache is None
+    assert model.rows_scored == 2
+
+
+def test_feature_digests_canonicalize_zero_and_nan():
+    a = np.array([[0.0, np.nan, 1.0]], dtype=np.float64)
+    b = np.array([[-0.0, -np.nan, 1.0]], dtype=np.float32)
+    c = np.array([[0.0, 0.0, 1.0]], dtype=np.float32)
+
+    assert feature_digests(a) == feature_digests(b)
+    assert feature_digests(a) != feature_digests(c)
+
+
+def test_invalidate_single_type():
+    cache = PredictionCache(max_size=10)
+    cache.put_many([(("ethereum", "v1", b"a"), 0.1), (("bank", "v1", b"a"), 0.2)])
+    cache.invalidate("ethereum")
+
+    assert cache.get_many([("ethereum", "v1", b"a"), ("bank", "v1", b"a")]) == [None, 0.2]
+
+
+def test_same_version_reload_is_cached_separately(tmp_path):
+    path = tmp_path / "ethereum_model_weights.pkl"
+    joblib.dump(NamedCountingModel(), path)
+
+    def missing():
+        raise FileNotFoundError("no weights")
+    registry = ModelRegistry(loaders={"ethereum": missing}, model_dir=str(tmp_path))
+    service = FraudDetectionService(registry, cache_size=100)
+    (old_model, layout), version, old_token = registry.get_serving("ethereum")
+    features = service._prepare_batch([record(6)], "ethereum", service.transforms["ethereum"], layout)
+
+    # Replaced in place and reloaded under the same version name
+    joblib.dump(NamedCountingModel(offset=0.25), path)
+    registry.reload("ethereum")
+    _, new_version, new_token = registry.get_serving("ethereum")
+    assert new_version == version == LEGACY_VERSION and new_token != old_token
+
+    # A request still holding the old model caches its row after the reload
+    stale = service._predict(old_model, old_token, "ethereum", features)
+    fresh = registry.get("ethereum")[0].predict_proba(features)[:, 1]
+    np.testing.assert_allclose(service._predict(registry.get("ethereum")[0], new_token, "ethereum", features), fresh)
+    assert fresh[0] > stale[0]
@@ -0,0 +1,116 @@
+"""
+Read-through receipt cache: memory -> chain_receipts table -> RPC.
+"""
+
+import asyncio
+from models.fraud_log import FraudLog
+from models.chain_outbox import ChainOutbox, STATUS_CONFIRMED
+from models.chain_receipt import ChainReceipt
+from services.receipt_cache import ReceiptCache, TTLCache
+
+
+class FakeChain:
+    """Counts fetches; receipts mined at the given block numbers."""
+
+    def __init__(self, blocks, latest=100):
+        self.blocks = blocks
+        self.latest = latest
+        self.fetches = []
+
+    async def fetch(self, tx_hash):
+        self.fetches.append(tx_hash)
+        block = self.blocks.get(tx_hash)
+        if block is None:
+            return None
+        return {"fraud_score": 70, "model_version": "v1.0", "timestamp": 1700000000 + block,
+                "gas_used": 50000, "block_number": block, "tx_hash": tx_hash}
+
+    async def latest_block(self):
+        return self.latest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(session_factory, chain, clock=None):
+    return ReceiptCache(session_factory, fetch=chain.fetch, latest_block=chain.latest_block,
+                        ttl=15, finality_blocks=12, clock=clock or FakeClock())
+
+
+def test_final_receipt_is_fetched_once_and_persisted(session_factory):
+    db = session_factory()
+    direct = FraudLog(tx_hash="0xaaa", transaction_type="bank", fraud_score=70, model_version="v1.0")
+    queued = FraudLog(tx_hash="tx_ref_1", transaction_type="bank", fraud_score=70, model_version="v1.0")
+    db.add_all([direct, queued])
+    db.flush()
+    db.add(ChainOutbox(fraud_log_id=queued.id, reference_id="tx_ref_1", chain_tx_hash="0xbbb",
+                       status=STATUS_CONFIRMED))
+    db.commit()
+    db.close()
+
+    chain = FakeChain({"0xaaa": 50, "0xbbb": 60})
+    cache = make_cache(session_factory, chain)
+    first = asyncio.run(cache.get_many(["0xaaa", "0xbbb"]))
+    assert first["0xaaa"]["block_number"] == 50
+    for _ in range(3):
+        assert asyncio.run(cache.get_many(["0xaaa", "0xbbb"])) == first
+    assert chain.fetches == ["0xaaa", "0xbbb"]
+
+    # A fresh process reads them from the DB, not the RPC
+    restarted = make_cache(session_factory, chain)
+    assert asyncio.run(restarted.get("0xbbb")) == first["0xbbb"]
+    assert chain.fetches == ["0xaaa", "0xbbb"]
+    assert restarted.stats["db_hits"] == 1
+
+    db = session_factory()
+    assert db.query(ChainReceipt).count() == 2
+    for fraud_log in db.query(FraudLog):
+        assert fraud_log.gas_used == 50000
+        assert fraud_log.blockchain_timestamp is not None
+    db.close()
+
+
+def test_recent_receipt_is_only_cached_until_ttl(session_factory):
+    clock = FakeClock()
+    chain = FakeChain({"0xccc": 95}, latest=100)
+    cache = make_cache(session_factory, chain, clock)
+
+    asyncio.run(cache.get("0xccc"))
+    asyncio.run(cache.get("0xccc"))
+    assert chain.fetches == ["0xccc"]
+
+    clock.now = 16
+    chain.latest = 120
+    asyncio.run(cache.get("0xccc"))
+    assert chain.fetches == ["0xccc", "0xccc"]
+
+    db = session_factory()
+    assert db.query(ChainReceipt).count() == 1
+    db.close()
+
+
+def test_missing_receipt_is_negatively_cached(session_factory):
+    clock = FakeClock()
+    chain = FakeChain({})
+    cache = make_cache(session_factory, chain, clock)
+    assert asyncio.run(cache.get("0xddd")) is None
+    assert asyncio.run(cache.get("0xddd")) is None
+    assert chain.fetches == ["0xddd"]
+    clock.now = 20
+    asyncio.run(cache.get("0xddd"))
+    assert len(chain.fetches) == 2
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
@@ -0,0 +1,79 @@
+"""
+Chunked reservoir sampling of large generator sources (utils/reservoir.py).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.reservoir import ReservoirSampler, sample_source
+from utils.data_generator import BankDataGenerator
+
+
+def write_source(path, n=10_000, fraud_every=50, sep=','):
+    frame = pd.DataFrame({
+        "row": np.arange(n),
+        "amount": np.arange(n) % 97 * 1.5,
+        "channel": np.array(["web", "app", "pos", "atm"])[np.arange(n) % 4],
+        "fraud_bool": (np.arange(n) % fraud_every == 0).astype(int)
+    })
+    frame.to_csv(path, index=False, sep=sep)
+    return frame
+
+
+def test_reservoir_is_uniform_over_the_whole_stream():
+    sampler = ReservoirSampler(1000, np.random.default_rng(0))
+    for start in range(0, 100_000, 7_000):
+        sampler.add(pd.DataFrame({"row": np.arange(start, min(start + 7_000, 100_000))}))
+
+    rows = sampler.sample["row"].to_numpy()
+    assert sampler.seen == 100_000
+    assert len(rows) == 1000 and len(np.unique(rows)) == 1000
+    # Not biased toward the head of the file
+    assert 45_000 < rows.mean() < 55_000
+    assert (rows > 90_000).sum() > 50
+
+
+def test_per_class_reservoirs_keep_rare_class_and_stats_cover_every_row(tmp_path):
+    path = tmp_path / "bank.csv"
+    frame = write_source(path)
+    source = sample_source(str(path), label_col="fraud_bool", per_class=500, chunksize=1_000, seed=1)
+
+    assert source.class_counts == {0: 9_800, 1: 200}
+    labels = source.frame["fraud_bool"]
+    assert (labels == 1).sum() == 200 and (labels == 0).sum() == 500
+
+    summary = source.stats.summary("amount")
+    assert summary["count"] == 10_000
+    assert summary["mean"] == pytest.approx(frame["amount"].mean())
+    assert summary["std"] == pytest.approx(frame["amount"].std())
+    assert (summary["min"], summary["max"]) == (frame["amount"].min(), frame["amount"].max())
+
+    assert isinstance(source.frame["channel"].dtype, pd.CategoricalDtype)
+    assert set(source.stats.category_values("channel")) == {"web", "app", "pos", "atm"}
+
+
+def test_same_seed_same_sample(tmp_path):
+    path = tmp_path / "bank.csv"
+    write_source(path)
+    first = sample_source(str(path), label_col="fraud_bool", per_class=100, chunksize=999, seed=3)
+    second = sample_source(str(path), label_col="fraud_bool", per_class=100, chunksize=999, seed=3)
+    pd.testing.assert_frame_equal(first.frame, second.frame)
+
+
+def test_category_tracking_is_bounded(tmp_path):
+    path = tmp_path / "ids.csv"
+    pd.DataFrame({"id": [f"id{i}" for i in range(300)], "fraud_bool": 0}).to_csv(path, index=False)
+    source = sample_source(str(path), label_col="fraud_bool", per_class=10, chunksize=50, max_categories=100)
+    assert len(source.stats.categories["id"]) == 100
+    assert "id" in source.stats.overflowed
+
+
+def test_bank_generator_draws_from_the_whole_file(tmp_path):
+    path = tmp_path / "bank.csv"
+    write_source(path)
+    generator = BankDataGenerator(str(path), reservoir_size=300, chunksize=1_000)
+
+    assert generator.df["row"].max() > 5_000
+    out = generator.generate_synthetic_data(20, 20)
+    assert len(out) == 40 and out["fraud_bool"].sum() == 20
+    assert set(out["channel"]) <= {"web", "app", "pos", "atm"}
@@ -0,0 +1,115 @@
+"""
+Shadow scoring: challenger versions score copies of requests off the
+request path and comparisons land in the append-only shadow store.
+"""
+
+import os
+import pytest
+import utils.load_models
+from services.ai_service import FraudDetectionService
+from services.shadow_service import SHADOW_RECORD, ShadowStore, parse_challengers
+from utils.load_models import ModelRegistry, LEGACY_VERSION
+
+
+def record(received):
+    return {'total_received': float(received), 'total_tx_sent': 3,
+            'time_diff_first_last_received': 60.0, 'total_tx_sent_unique': 2}
+
+
+@pytest.fixture
+def make_service(tmp_path, write_model):
+    """make_service(challengers): service shadowing over a scratch model directory."""
+    def make(challengers):
+        model_dir = tmp_path / "model_wts"
+        model_dir.mkdir()
+        # Production serves the newest file (v1.0); v0.9 is an older challenger on disk
+        write_model(model_dir, "ethereum_model_weights-v0.9.pkl", 0.9, age=120)
+        write_model(model_dir, "ethereum_model_weights.pkl", 0.1, age=60)
+        registry = ModelRegistry(loaders={"ethereum": lambda: None}, model_dir=str(model_dir))
+        service = FraudDetectionService(registry)
+        service.enable_shadow(challengers, str(tmp_path / "shadow"))
+        return service
+    return make
+
+
+def test_parse_challengers():
+    assert parse_challengers("ethereum=v2, bank = v1.0,bogus,") == {"ethereum": "v2", "bank": "v1.0"}
+    assert parse_challengers("") == {}
+
+
+def test_challenger_scores_copies_in_background(make_service):
+    service = make_service({"ethereum": "v0.9"})
+    records = [record(1), record(2), record(3)]
+    result = service.detect_fraud_batch(records, "ethereum")
+    assert result["model_version"] == LEGACY_VERSION
+
+    assert service.shadow.submit(records, "ethereum", result["fraud_scores"], result["model_version"])
+    records[0]["total_received"] = -1  # the queued job works on its own copy
+    service.shadow.shutdown(wait=True)
+
+    stats = service.shadow.stats()
+    assert stats["scored_rows"] == 3 and stats["errors"] == 0 and stats["pending"] == 0
+    (summary,) = service.shadow.store.summary("ethereum")
+    assert summary["production_version"] == LEGACY_VERSION
+    assert summary["challenger_version"] == "v0.9"
+    assert summary["rows"] == 3
+    assert summary["mean_delta"] > 0
+    assert summary["flagged_production"] == 0 and summary["flagged_challenger"] == 3
+    assert summary["flag_agreement"] == 0.0
+
+
+def test_same_version_or_unshadowed_type_is_not_queued(make_service):
+    service = make_service({"ethereum": LEGACY_VERSION})
+    assert not service.shadow.submit([record(1)], "ethereum", [10], LEGACY_VERSION)
+    assert not service.shadow.submit([record(1)], "bank", [10], "v1.0")
+    assert service.shadow.stats()["submitted"] == 0
+
+
+def test_full_queue_drops_jobs(make_service):
+    service = make_service({"ethereum": "v0.9"})
+    service.shadow.max_pending = 0
+    assert not service.shadow.submit([record(1)], "ethereum", [10], LEGACY_VERSION)
+    assert service.shadow.stats()["dropped"] == 1
+
+
+def test_unknown_challenger_counts_error(make_service):
+    service = make_service({"ethereum": "v7"})
+    service.shadow.submit([record(1)], "ethereum", [10], LEGACY_VERSION)
+    service.shadow.shutdown(wait=True)
+    assert service.shadow.stats()["errors"] == 1
+    assert service.shadow.store.summary() == []
+
+
+def test_broken_challenger_is_not_reloaded_until_it_changes(tmp_path, monkeypatch, make_service, write_model):
+    service = make_service({"ethereum": "v2"})
+    path = tmp_path / "model_wts" / "ethereum_model_weights-v2.pkl"
+    path.write_bytes(b"not a pickle")
+    loads = []
+    load_model_path = utils.load_models.load_model_path
+    monkeypatch.setattr(utils.load_models, "load_model_path",
+                        lambda *args, **kwargs: loads.append(1) or load_model_path(*args, **kwargs))
+
+    for _ in range(3):
+        with pytest.raises(Exception):
+            service.shadow._challenger_entry("ethereum", "v2")
+    assert len(loads) == 1
+
+    write_model(tmp_path / "model_wts", "ethereum_model_weights-v2.pkl", 0.7, age=0)
+    model, _ = service.shadow._challenger_entry("ethereum", "v2")
+    assert model.p == 0.7 and len(loads) == 2
+
+
+def test_store_is_append_only_and_ignores_torn_tail(tmp_path):
+    store = ShadowStore(str(tmp_path))
+    store.append("bank", "v1.0", "v2", 1.0, [10, 90], [20, 40], 0.5)
+    store.append("bank", "v1.0", "v2", 2.0, [60], [70], 0.25)
+    path = store.path_for("bank", "v1.0", "v2")
+    assert os.path.getsize(path) == 3 * SHADOW_RECORD.itemsize
+
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 5)
+    (summary,) = store.summary()
+    assert summary["rows"] == 3
+    assert summary["max_abs_delta"] == 50
+    assert summary["flag_agreement"] == round(2 / 3, 4)
+    assert summary["last_timestamp"] == 2.0
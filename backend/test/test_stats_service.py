@@ -0,0 +1,135 @@
+"""
+Dashboard aggregates (score rollup) and keyset pagination.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from core.database import Base
+from models.fraud_log import FraudLog
+from models.score_rollup import FraudScoreRollup
+from services.stats_service import (
+    get_summary,
+    list_records,
+    rebuild_score_rollup,
+    sync_score_rollup,
+    MAX_PAGE_SIZE
+)
+
+TYPES = ["vehicle", "bank", "ecommerce", "ethereum"]
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fraud.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def add_logs(db, n, same_timestamp_every=3):
+    start = datetime(2024, 1, 1)
+    for i in range(n):
+        db.add(FraudLog(
+            tx_hash=f"tx_{i}",
+            transaction_type=TYPES[i % 4],
+            fraud_score=(i * 7) % 101,
+            model_version="v1.0",
+            # Groups of rows share a created_at so the id tie-break matters
+            created_at=start + timedelta(seconds=i // same_timestamp_every)
+        ))
+    db.commit()
+
+
+def expected_summary(db):
+    logs = db.query(FraudLog).all()
+    histogram = [0] * 10
+    for log in logs:
+        histogram[9 if log.fraud_score >= 100 else int(log.fraud_score) // 10] += 1
+    return len(logs), sum(1 for l in logs if l.fraud_score > 50), histogram
+
+
+def test_rollup_is_maintained_on_insert(db):
+    add_logs(db, 203)
+    total, fraud, histogram = expected_summary(db)
+    summary = get_summary(db)
+    assert summary["total_records"] == total == 203
+    assert summary["fraud_records"] == fraud
+    assert summary["histogram"] == histogram
+    assert sum(t["total"] for t in summary["by_type"].values()) == 203
+
+    bank = get_summary(db, transaction_type="bank")
+    bank_logs = db.query(FraudLog).filter(FraudLog.transaction_type == "bank").all()
+    assert bank["total_records"] == len(bank_logs)
+    assert bank["by_type"]["bank"]["avg_score"] == pytest.approx(
+        sum(l.fraud_score for l in bank_logs) / len(bank_logs))
+
+
+def test_rebuild_matches_incremental(db):
+    add_logs(db, 150)
+    incremental = get_summary(db)
+    assert sync_score_rollup(db) is False
+
+    db.query(FraudScoreRollup).delete()
+    db.commit()
+    assert sync_score_rollup(db) is True
+    assert get_summary(db) == incremental
+    assert rebuild_score_rollup(db) == 150
+
+
+def test_sync_repairs_drift_with_unchanged_total(db):
+    add_logs(db, 40)
+    incremental = get_summary(db)
+
+    # Move counts between buckets and types without changing the total
+    rows = db.query(FraudScoreRollup).order_by(FraudScoreRollup.transaction_type, FraudScoreRollup.score).all()
+    rows[0].count += 1
+    rows[-1].count -= 1
+    db.commit()
+    assert get_summary(db) != incremental
+
+    assert sync_score_rollup(db) is True
+    assert get_summary(db) == incremental
+    assert sync_score_rollup(db) is False
+
+
+def test_keyset_pages_cover_every_row_once(db):
+    add_logs(db, 95)
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = list_records(db, limit=10, cursor=cursor)
+        seen.extend((r.created_at, r.id) for r in page)
+        if cursor is None:
+            break
+    assert len(seen) == 95
+    assert seen == sorted(seen, reverse=True)
+    assert len(set(seen)) == 95
+
+
+def test_filters_apply_across_pages(db):
+    add_logs(db, 120)
+    ids = []
+    cursor = None
+    while True:
+        page, cursor = list_records(db, limit=7, cursor=cursor, transaction_type="ethereum",
+                                    min_score=20, max_score=80)
+        ids.extend(r.id for r in page)
+        if cursor is None:
+            break
+    expected = [
+        r.id for r in db.query(FraudLog)
+        .filter(FraudLog.transaction_type == "ethereum", FraudLog.fraud_score.between(20, 80))
+        .order_by(FraudLog.created_at.desc(), FraudLog.id.desc())
+    ]
+    assert ids == expected
+
+
+def test_page_size_is_capped_and_bad_cursor_rejected(db):
+    add_logs(db, 3)
+    page, cursor = list_records(db, limit=MAX_PAGE_SIZE * 10)
+    assert len(page) == 3 and cursor is None
+    with pytest.raises(ValueError):
+        list_records(db, cursor="not-a-cursor")
@@ -1,15 +1,38 @@
-import joblib
+"""
+Score a transaction and log it on a local chain (stand-in ledger from conftest.py).
+"""
+
 import numpy as np
-from backend.tochain import log_fraud_to_chain
+import pytest
+
+eth_tester = pytest.importorskip("eth_tester")
+
+from web3 import Web3, EthereumTesterProvider
+from services.chain_service import send_fraud_record
+
 
+def test_log_transaction_score_on_chain(ledger_standin):
+    provider = EthereumTesterProvider()
+    w3 = Web3(provider)
+    private_key = provider.ethereum_tester.backend.account_keys[0].to_hex()
+    w3.eth.default_account = w3.eth.accounts[0]
+    factory = w3.eth.contract(abi=ledger_standin["abi"], bytecode=ledger_standin["bytecode"])
+    receipt = w3.eth.wait_for_transaction_receipt(factory.constructor().transact())
+    ledger = w3.eth.contract(address=receipt.contractAddress, abi=ledger_standin["abi"])
 
-transaction = np.array([100.0, 1.0, 0.0, 0.0, 1.0])  # Example transaction features
-# Fraud score (simple normalization)
-raw_score = 0.5
-fraud_score = int((1 - raw_score) * 50)
-fraud_score = max(0, min(100, fraud_score))
+    transaction = np.array([100.0, 1.0, 0.0, 0.0, 1.0])  # Example transaction features
+    # Fraud score (simple normalization)
+    raw_score = 0.5
+    fraud_score = int((1 - raw_score) * 50)
+    fraud_score = max(0, min(100, fraud_score))
 
-print("Fraud Score:", fraud_score)
+    # Send to Ethereum
+    reference_id = ",".join(map(str, transaction.tolist()))
+    tx_hash, _ = send_fraud_record(fraud_score, "v1.0", reference_id,
+                                   client=w3, ledger=ledger, private_key=private_key)
 
-# Send to Ethereum
-log_fraud_to_chain(transaction.tolist(), fraud_score)
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    event = ledger.events.FraudLogged().process_receipt(receipt)[0]["args"]
+    assert event["fraudScore"] == fraud_score == 25
+    assert event["transactionHash"] == Web3.keccak(text=reference_id)
+    assert event["modelVersion"] == "v1.0"
@@ -0,0 +1,178 @@
+"""
+Flat-array tree compiler: compiled models must reproduce predict_proba of
+the LightGBM / XGBoost / scikit-learn models they were exported from.
+"""
+
+import os
+import subprocess
+import sys
+import joblib
+import numpy as np
+import pytest
+from utils.load_models import BASE_DIR, discover_artifacts, load_model_path
+from utils.tree_compiler import (
+    CompiledEnsemble,
+    boundary_rows,
+    compile_artifact,
+    compile_model,
+    compiled_path_for,
+    load_compiled,
+    save_compiled,
+    validate
+)
+
+TOLERANCE = 1e-6
+
+
+def check_rows(compiled, seed=1):
+    rng = np.random.default_rng(seed)
+    random_rows = rng.normal(size=(500, compiled.n_features_in_)).astype(np.float32)
+    random_rows[rng.random(random_rows.shape) < 0.05] = np.nan
+    return np.vstack([boundary_rows(compiled, 2000, seed=seed), random_rows])
+
+
+def lightgbm_models():
+    lightgbm = pytest.importorskip("lightgbm")
+    return [
+        lightgbm.LGBMClassifier(n_estimators=25, num_leaves=15, verbose=-1),
+        lightgbm.LGBMClassifier(n_estimators=25, num_leaves=15, zero_as_missing=True, verbose=-1),
+        lightgbm.LGBMClassifier(n_estimators=25, num_leaves=15, use_missing=False, verbose=-1),
+    ]
+
+
+def xgboost_models():
+    xgboost = pytest.importorskip("xgboost")
+    return [xgboost.XGBClassifier(n_estimators=25, max_depth=4, base_score=0.3)]
+
+
+def sklearn_models():
+    ensemble = pytest.importorskip("sklearn.ensemble")
+    from sklearn.tree import DecisionTreeClassifier
+    return [
+        DecisionTreeClassifier(max_depth=6, random_state=0),
+        ensemble.RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0),
+        ensemble.ExtraTreesClassifier(n_estimators=15, max_depth=6, random_state=0),
+        ensemble.GradientBoostingClassifier(n_estimators=25, max_depth=3, random_state=0),
+    ]
+
+
+@pytest.mark.parametrize("family", [lightgbm_models, xgboost_models, sklearn_models])
+def test_compiled_matches_predict_proba(family, training_data):
+    X, y = training_data
+    for model in family():
+        if "GradientBoosting" in type(model).__name__:
+            # No NaN support in sklearn's GradientBoostingClassifier
+            X_fit = X.fillna(0)
+        else:
+            X_fit = X
+        model.fit(X_fit, y)
+        compiled = compile_model(model)
+        rows = check_rows(compiled)
+        if X_fit is not X:
+            rows = np.nan_to_num(rows)
+        assert list(compiled.feature_names_in_) == list(X.columns)
+        assert validate(model, compiled, rows) <= TOLERANCE, type(model).__name__
+
+
+def test_xgboost_early_stopping_uses_best_iteration(training_data):
+    xgboost = pytest.importorskip("xgboost")
+    X, y = training_data
+    model = xgboost.XGBClassifier(n_estimators=200, max_depth=3, learning_rate=0.5, early_stopping_rounds=2)
+    model.fit(X[:400], y[:400], eval_set=[(X[400:], y[400:])], verbose=False)
+    compiled = compile_model(model)
+
+    assert compiled.n_trees == model.best_iteration + 1 < 200
+    assert validate(model, compiled, check_rows(compiled)) <= TOLERANCE
+
+
+def test_unsupported_model_raises(training_data):
+    from sklearn.linear_model import LogisticRegression
+    X, y = training_data
+    with pytest.raises(NotImplementedError):
+        compile_model(LogisticRegression().fit(X.fillna(0), y))
+
+
+def test_save_and_mmap_load_round_trip(tmp_path, training_data):
+    lightgbm = pytest.importorskip("lightgbm")
+    X, y = training_data
+    model = lightgbm.LGBMClassifier(n_estimators=10, verbose=-1).fit(X, y)
+    compiled = compile_model(model)
+    save_compiled(compiled, str(tmp_path / "m.trees"))
+
+    loaded = load_compiled(str(tmp_path / "m.trees"))
+    assert isinstance(loaded.feature, np.memmap)
+    rows = check_rows(compiled)
+    np.testing.assert_array_equal(loaded.predict_proba(rows), compiled.predict_proba(rows))
+    assert loaded.source == "lightgbm.sklearn.LGBMClassifier"
+
+
+def test_re_export_leaves_mapped_arrays_intact(tmp_path, training_data):
+    lightgbm = pytest.importorskip("lightgbm")
+    X, y = training_data
+    first = compile_model(lightgbm.LGBMClassifier(n_estimators=10, verbose=-1).fit(X, y))
+    second = compile_model(lightgbm.LGBMClassifier(n_estimators=20, num_leaves=7, verbose=-1).fit(X, y))
+    directory = str(tmp_path / "m.trees")
+    save_compiled(first, directory)
+    mapped = load_compiled(directory)
+
+    save_compiled(second, directory)
+    rows = check_rows(first)
+    # The old mapping still reads the first export; a new load gets the second
+    np.testing.assert_array_equal(mapped.predict_proba(rows), first.predict_proba(rows))
+    assert load_compiled(directory).n_trees == second.n_trees
+    assert sorted(os.listdir(tmp_path)) == ["m.trees"]
+
+
+def test_compiled_backend_prefers_fresh_export(tmp_path, training_data):
+    lightgbm = pytest.importorskip("lightgbm")
+    X, y = training_data
+    path = str(tmp_path / "ethereum_model_weights.pkl")
+    joblib.dump(lightgbm.LGBMClassifier(n_estimators=5, verbose=-1).fit(X, y), path)
+
+    # No export yet: falls back to the pickle
+    assert not isinstance(load_model_path(path, backend="compiled"), CompiledEnsemble)
+
+    (artifact,) = discover_artifacts(str(tmp_path))["ethereum"]
+    assert compile_artifact(artifact, rows=500)["validated"]
+    assert isinstance(load_model_path(path, backend="compiled"), CompiledEnsemble)
+    assert not isinstance(load_model_path(path, backend="pickle"), CompiledEnsemble)
+
+    # A newer pickle makes the export stale
+    stamp = os.path.getmtime(os.path.join(compiled_path_for(path), "meta.json")) + 10
+    os.utime(path, (stamp, stamp))
+    assert not isinstance(load_model_path(path, backend="compiled"), CompiledEnsemble)
+
+
+REPO_ARTIFACTS = [a for artifacts in discover_artifacts().values() for a in artifacts]
+
+
+@pytest.mark.parametrize("artifact", REPO_ARTIFACTS, ids=lambda a: f"{a.transaction_type}-{a.version}")
+def test_repo_models_compile_exactly(artifact):
+    model = load_model_path(artifact.path, mmap=False, backend="pickle")
+    compiled = compile_model(model)
+    assert validate(model, compiled, boundary_rows(compiled, 5000)) <= TOLERANCE
+
+
+def test_serving_compiled_model_skips_ml_imports(tmp_path, training_data):
+    lightgbm = pytest.importorskip("lightgbm")
+    X, y = training_data
+    model_dir = tmp_path / "model_wts"
+    model_dir.mkdir()
+    compiled = compile_model(lightgbm.LGBMClassifier(n_estimators=5, verbose=-1).fit(X, y))
+    joblib.dump(None, model_dir / "ethereum_model_weights.pkl")
+    save_compiled(compiled, compiled_path_for(str(model_dir / "ethereum_model_weights.pkl")))
+
+    script = (
+        "import sys\n"
+        "from services.ai_service import FraudDetectionService\n"
+        "from utils.load_models import ModelRegistry\n"
+        f"registry = ModelRegistry(loaders={{'ethereum': None}}, model_dir={str(model_dir)!r})\n"
+        "result = FraudDetectionService(registry).detect_fraud_batch([{'amount': 1.0, 'age': 30}], 'ethereum')\n"
+        "assert result['success'], result\n"
+        "print(sorted(m for m in ('lightgbm', 'xgboost', 'sklearn', 'catboost') if m in sys.modules))\n"
+    )
+    env = dict(os.environ, MODEL_BACKEND="compiled", PYTHONPATH=os.path.join(BASE_DIR, "backend"))
+    out = subprocess.run([sys.executable, "-c", script], cwd=BASE_DIR, env=env,
+                         capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "[]"
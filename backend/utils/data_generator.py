@@ -3,7 +3,7 @@ Test Data Generator for FraudProof Ledger
 
 Generates synthetic test data for all 4 fraud detection models:
 - Vehicle Insurance Fraud
-- Bank Account Fraud  
+- Bank Account Fraud
 - E-commerce Fraud
 - Ethereum Blockchain Fraud
 
@@ -13,450 +13,525 @@ Features:
 - Handles numeric ranges, categorical features
 - Preserves all original columns and data types
 - Generates ~50 rows per category
+- Vectorized: a block of rows is one index draw plus one perturbation
+  matrix, so load-test datasets of millions of rows are practical
+- Seeded np.random.Generator per generator for reproducible output
+- Streams large datasets to CSV/Parquet in chunks
+- Generates the domains in parallel worker processes (--workers); each
+  domain has its own SeedSequence child, so output does not depend on
+  the number of workers
+
+Usage (from the repository root, source paths are relative to it):
+    PYTHONPATH=backend python -m utils.data_generator
+    PYTHONPATH=backend python -m utils.data_generator --workers 4 --rows 1000000 --format parquet
+    PYTHONPATH=backend python -m utils.data_generator --domains bank ethereum --source bank=/data/bank_fraud.csv
 """
 
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import uuid
-import os
+from utils.reservoir import sample_source, DEFAULT_CHUNKSIZE
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
 
-# Set random seed for reproducibility
-np.random.seed(42)
+# Default seed for reproducibility
+DEFAULT_SEED = 42
 
 # Output directory
 OUTPUT_DIR = 'data/test_data'
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Rows per chunk when streaming to disk
+DEFAULT_CHUNK_SIZE = 100_000
 
-class VehicleDataGenerator:
-    """Generate synthetic vehicle insurance fraud test data."""
-    
-    def __init__(self, csv_path='data/vehicle_insurance_fraud.csv'):
-        """Load and analyze vehicle insurance dataset."""
-        self.df = pd.read_csv(csv_path)
-        self.fraud_col = 'FraudFound_P'  # Fraud column
-        self.categorical_cols = self.df.select_dtypes(include='object').columns.tolist()
+_HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+# Where the 32 hex digits go in the 8-4-4-4-12 layout
+_UUID_DIGIT_POSITIONS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+
+class SyntheticDataGenerator:
+    """
+    Base class: resample rows of a source dataset and perturb them.
+
+    Subclasses load their source data and set the class attributes that
+    describe how their domain is perturbed. All randomness comes from
+    self.rng, so the same seed produces the same rows.
+    """
+
+    name = 'dataset'
+    output_file = 'test_data.csv'
+
+    perturbation = (-0.3, 0.3)   # numeric values are scaled by 1 + U(low, high)
+    fraud_perturbation = None    # different range for fraud rows, if any
+    positive_only = False        # only perturb values > 0 (otherwise != 0)
+    zero_fill = None             # (low, high) drawn for zero values, if any
+    categorical_rate = 0.0       # chance of resampling each categorical value
+    id_columns = ()              # regenerated as fresh UUIDs
+
+    def __init__(self, df, fraud_col, seed=DEFAULT_SEED, source=None):
+        """
+        df is the data rows are drawn from. source, if given, is the
+        SourceSample df was streamed from; its whole-file statistics are
+        used for category values and class counts.
+        """
+        self.df = df
+        self.fraud_col = fraud_col
+        self.source = source
+        self.rng = np.random.default_rng(seed)
+        self.categorical_cols = self.df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
         self.numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        
-        print(f"Vehicle Dataset: {len(self.df)} rows, {len(self.df.columns)} columns")
-        print(f"Fraud samples: {(self.df[self.fraud_col]==1).sum()}")
-        print(f"Non-fraud samples: {(self.df[self.fraud_col]==0).sum()}")
-    
+        self._perturbed_cols = [c for c in self.numeric_cols if c != self.fraud_col]
+        self._resampled_cols = [c for c in self.categorical_cols if c not in self.id_columns]
+        # Distinct values per categorical column, computed once
+        self._category_values = {
+            col: self._distinct_values(col) for col in self._resampled_cols
+        }
+        self._pools = {}
+        if self.fraud_col in self.df.columns:
+            self._pools = {
+                1: np.flatnonzero((self.df[self.fraud_col] == 1).to_numpy()),
+                0: np.flatnonzero((self.df[self.fraud_col] == 0).to_numpy())
+            }
+
+    def _distinct_values(self, col):
+        if self.source is not None and col in self.source.stats.categories and col not in self.source.stats.overflowed:
+            return self.source.stats.category_values(col)
+        return np.asarray(self.df[col].dropna().unique(), dtype=object)
+
+    def describe(self):
+        if self.source is not None:
+            print(f"{self.name} Dataset: {self.source.stats.rows} rows streamed, "
+                  f"{len(self.df)} sampled, {len(self.df.columns)} columns")
+            print(f"Fraud samples: {self.source.class_counts.get(1, 0)}")
+            print(f"Non-fraud samples: {self.source.class_counts.get(0, 0)}")
+            return
+        print(f"{self.name} Dataset: {len(self.df)} rows, {len(self.df.columns)} columns")
+        if self._pools:
+            print(f"Fraud samples: {len(self._pools[1])}")
+            print(f"Non-fraud samples: {len(self._pools[0])}")
+
+    # ============= Generation =============
+
     def generate_synthetic_data(self, n_fraud=25, n_non_fraud=25):
         """
-        Generate synthetic vehicle data by sampling and perturbing real data.
-        
+        Generate synthetic data by sampling and perturbing real data.
+
         Args:
             n_fraud: Number of fraud samples to generate
             n_non_fraud: Number of non-fraud samples to generate
-        
+
         Returns:
-            DataFrame with synthetic data
+            DataFrame with synthetic data (fraud rows first)
+        """
+        blocks = [self._generate_block(n_fraud, 1), self._generate_block(n_non_fraud, 0)]
+        return pd.concat(blocks, ignore_index=True)
+
+    def iter_chunks(self, n_rows, fraud_ratio=0.5, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yield n_rows synthetic rows as shuffled DataFrames of at most chunk_size rows.
+        The fraud count is exact over the whole stream (round(n_rows * fraud_ratio)).
         """
-        fraud_data = self.df[self.df[self.fraud_col] == 1]
-        non_fraud_data = self.df[self.df[self.fraud_col] == 0]
-        
-        synthetic_records = []
-        
-        # Sample and perturb fraud records
-        for _ in range(n_fraud):
-            record = fraud_data.sample(1).iloc[0].copy()
-            record = self._perturb_record(record)
-            record[self.fraud_col] = 1
-            synthetic_records.append(record)
-        
-        # Sample and perturb non-fraud records
-        for _ in range(n_non_fraud):
-            record = non_fraud_data.sample(1).iloc[0].copy()
-            record = self._perturb_record(record)
-            record[self.fraud_col] = 0
-            synthetic_records.append(record)
-        
-        return pd.DataFrame(synthetic_records)
-    
-    def _perturb_record(self, record):
-        """Apply randomization to numeric and categorical features."""
-        # Perturb numeric columns by ±10-30%
-        for col in self.numeric_cols:
-            if col != self.fraud_col:
-                try:
-                    if pd.notna(record[col]) and record[col] != 0:
-                        perturbation = np.random.uniform(-0.3, 0.3)
-                        record[col] = record[col] * (1 + perturbation)
-                except:
-                    pass
-        
-        return record
-    
-    def save(self, df):
+        for start in range(0, n_rows, chunk_size):
+            end = min(start + chunk_size, n_rows)
+            n_fraud = round(end * fraud_ratio) - round(start * fraud_ratio)
+            chunk = self.generate_synthetic_data(n_fraud, (end - start) - n_fraud)
+            yield chunk.iloc[self.rng.permutation(len(chunk))].reset_index(drop=True)
+
+    def _generate_block(self, n, label):
+        """n perturbed rows drawn (with replacement) from the rows with this label."""
+        pool = self._pool_for(label)
+        if n <= 0 or len(pool) == 0:
+            return self._empty_block(n, label)
+
+        block = self.df.iloc[pool[self.rng.integers(0, len(pool), n)]].reset_index(drop=True)
+        self._perturb_numeric(block, is_fraud=label == 1)
+        self._resample_categoricals(block)
+        for col in self.id_columns:
+            if col in block.columns:
+                block[col] = self._random_uuids(n)
+        block[self.fraud_col] = label
+        return block
+
+    def _pool_for(self, label):
+        return self._pools.get(label, np.empty(0, dtype=np.int64))
+
+    def _empty_block(self, n, label):
+        return self.df.iloc[0:0].copy()
+
+    def _perturb_numeric(self, block, is_fraud=False):
+        """Scale every numeric column at once with one (rows x columns) factor matrix."""
+        if not self._perturbed_cols:
+            return
+        values = block[self._perturbed_cols].to_numpy(dtype=np.float64, copy=True)
+        low, high = self.fraud_perturbation if is_fraud and self.fraud_perturbation else self.perturbation
+        factors = 1 + self.rng.uniform(low, high, size=values.shape)
+
+        present = ~np.isnan(values)
+        scaled = present & ((values > 0) if self.positive_only else (values != 0))
+        values[scaled] *= factors[scaled]
+        if self.zero_fill is not None:
+            zeros = present & (values == 0)
+            values[zeros] = self.rng.uniform(*self.zero_fill, size=int(zeros.sum()))
+
+        block[self._perturbed_cols] = values
+
+    def _resample_categoricals(self, block):
+        """Replace each categorical value with a random seen value at categorical_rate."""
+        if self.categorical_rate <= 0:
+            return
+        n = len(block)
+        for col, choices in self._category_values.items():
+            if len(choices) == 0:
+                continue
+            changed = self.rng.random(n) < self.categorical_rate
+            column = block[col].to_numpy(dtype=object, copy=True)
+            column[changed] = choices[self.rng.integers(0, len(choices), int(changed.sum()))]
+            block[col] = column
+
+    def _random_uuids(self, n):
+        """n random version-4 UUID strings, formatted without a per-row Python loop."""
+        raw = self.rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+        digits = np.stack([raw >> 4, raw & 0x0F], axis=-1).reshape(n, 32)
+        text = np.full((n, 36), ord('-'), dtype=np.uint8)
+        text[:, _UUID_DIGIT_POSITIONS] = _HEX_DIGITS[digits]
+        return text.view('S36').ravel().astype(str)
+
+    # ============= Output =============
+
+    def save(self, df, output_dir=OUTPUT_DIR):
         """Save to CSV with all columns preserved."""
-        output_path = os.path.join(OUTPUT_DIR, 'vehicle_test_data.csv')
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, self.output_file)
         df.to_csv(output_path, index=False)
-        print(f"✓ Saved Vehicle: {output_path} ({len(df)} rows, {len(df.columns)} columns)")
+        print(f"✓ Saved {self.name}: {output_path} ({len(df)} rows, {len(df.columns)} columns)")
         return output_path
 
+    def write(self, output_path, n_rows, fraud_ratio=0.5, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream n_rows synthetic rows to a .csv or .parquet file, one chunk in
+        memory at a time. Returns the number of rows written.
+        """
+        if output_path.endswith('.parquet') and not HAS_ARROW:
+            raise ImportError("Writing Parquet requires pyarrow")
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
 
-class BankDataGenerator:
+        written = 0
+        writer = None
+        try:
+            for chunk in self.iter_chunks(n_rows, fraud_ratio=fraud_ratio, chunk_size=chunk_size):
+                if output_path.endswith('.parquet'):
+                    if writer is None:
+                        table = pa.Table.from_pandas(chunk, preserve_index=False)
+                        writer = pq.ParquetWriter(output_path, table.schema)
+                    else:
+                        table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+                    writer.write_table(table)
+                else:
+                    chunk.to_csv(output_path, mode='w' if written == 0 else 'a',
+                                 header=written == 0, index=False)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        print(f"✓ Wrote {self.name}: {output_path} ({written} rows)")
+        return written
+
+
+class VehicleDataGenerator(SyntheticDataGenerator):
+    """Generate synthetic vehicle insurance fraud test data."""
+
+    name = 'Vehicle'
+    output_file = 'vehicle_test_data.csv'
+    # Perturb numeric columns by ±10-30%
+    perturbation = (-0.3, 0.3)
+
+    def __init__(self, csv_path='data/vehicle_insurance_fraud.csv', seed=DEFAULT_SEED):
+        """Load and analyze vehicle insurance dataset."""
+        super().__init__(pd.read_csv(csv_path), 'FraudFound_P', seed=seed)
+        self.describe()
+
+
+class BankDataGenerator(SyntheticDataGenerator):
     """Generate synthetic bank account fraud test data."""
-    
-    def __init__(self, csv_path='data/bank_fraud.csv'):
-        """Load and analyze bank fraud dataset."""
-        self.df = pd.read_csv(csv_path, nrows=50000)  # Load subset for speed
-        self.fraud_col = 'fraud_bool'
-        self.categorical_cols = self.df.select_dtypes(include='object').columns.tolist()
-        self.numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        
-        print(f"\nBank Dataset: {len(self.df)} rows, {len(self.df.columns)} columns")
-        print(f"Fraud samples: {(self.df[self.fraud_col]==1).sum()}")
-        print(f"Non-fraud samples: {(self.df[self.fraud_col]==0).sum()}")
-    
-    def generate_synthetic_data(self, n_fraud=25, n_non_fraud=25):
-        """Generate synthetic bank data with perturbations."""
-        fraud_data = self.df[self.df[self.fraud_col] == 1]
-        non_fraud_data = self.df[self.df[self.fraud_col] == 0]
-        
-        synthetic_records = []
-        
-        # Sample and perturb fraud records
-        for _ in range(min(n_fraud, len(fraud_data))):
-            record = fraud_data.sample(1).iloc[0].copy()
-            record = self._perturb_record(record)
-            record[self.fraud_col] = 1
-            synthetic_records.append(record)
-        
-        # Sample and perturb non-fraud records
-        for _ in range(min(n_non_fraud, len(non_fraud_data))):
-            record = non_fraud_data.sample(1).iloc[0].copy()
-            record = self._perturb_record(record)
-            record[self.fraud_col] = 0
-            synthetic_records.append(record)
-        
-        return pd.DataFrame(synthetic_records)
-    
-    def _perturb_record(self, record):
-        """Apply randomization to numeric and categorical features."""
-        # Perturb numeric columns by ±20-40%
-        for col in self.numeric_cols:
-            if col != self.fraud_col:
-                try:
-                    if pd.notna(record[col]):
-                        if record[col] == 0:
-                            record[col] = np.random.uniform(0, 100)
-                        else:
-                            perturbation = np.random.uniform(-0.4, 0.4)
-                            record[col] = record[col] * (1 + perturbation)
-                except:
-                    pass
-        
-        # Randomly select categorical values from dataset
-        for col in self.categorical_cols:
-            if np.random.random() < 0.3:  # 30% chance to change
-                unique_vals = self.df[col].dropna().unique()
-                if len(unique_vals) > 0:
-                    record[col] = np.random.choice(unique_vals)
-        
-        return record
-    
-    def save(self, df):
-        """Save to CSV with all columns preserved."""
-        output_path = os.path.join(OUTPUT_DIR, 'bank_test_data.csv')
-        df.to_csv(output_path, index=False)
-        print(f"✓ Saved Bank: {output_path} ({len(df)} rows, {len(df.columns)} columns)")
-        return output_path
 
+    name = 'Bank'
+    output_file = 'bank_test_data.csv'
+    # Perturb numeric columns by ±20-40%, zeros become U(0, 100)
+    perturbation = (-0.4, 0.4)
+    zero_fill = (0, 100)
+    # Randomly select categorical values from dataset
+    categorical_rate = 0.3
+
+    def __init__(self, csv_path='data/bank_fraud.csv', seed=DEFAULT_SEED,
+                 reservoir_size=25_000, chunksize=DEFAULT_CHUNKSIZE):
+        """Stream the whole bank fraud dataset, keeping reservoir_size rows per class."""
+        sample_seed, row_seed = spawn_seeds(seed, 2)
+        source = sample_source(csv_path, label_col='fraud_bool', per_class=reservoir_size,
+                               chunksize=chunksize, seed=sample_seed)
+        super().__init__(source.frame, 'fraud_bool', seed=row_seed, source=source)
+        self.describe()
 
-class EcommerceDataGenerator:
+
+class EcommerceDataGenerator(SyntheticDataGenerator):
     """Generate synthetic e-commerce fraud test data."""
-    
-    def __init__(self, csv_path='data/ecommerce_fraud_lite.csv'):
+
+    name = 'E-commerce'
+    output_file = 'ecommerce_test_data.csv'
+    perturbation = (-0.3, 0.3)
+    # Frauds tend to have higher amounts or odd patterns
+    fraud_perturbation = (0.5, 1.5)
+    positive_only = True
+    categorical_rate = 0.2
+    # Regenerate IDs for uniqueness
+    id_columns = ('Transaction ID', 'Customer ID')
+
+    def __init__(self, csv_path='data/ecommerce_fraud_lite.csv', seed=DEFAULT_SEED):
         """Load and analyze e-commerce dataset."""
-        self.df = pd.read_csv(csv_path)
-        self.fraud_col = 'Is Fraudulent'
-        self.categorical_cols = self.df.select_dtypes(include='object').columns.tolist()
-        self.numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        
-        print(f"\nE-commerce Dataset: {len(self.df)} rows, {len(self.df.columns)} columns")
-        print(f"Fraud samples: {(self.df[self.fraud_col]==1).sum()}")
-        print(f"Non-fraud samples: {(self.df[self.fraud_col]==0).sum()}")
-    
-    def generate_synthetic_data(self, n_fraud=25, n_non_fraud=25):
-        """Generate synthetic e-commerce data with perturbations."""
-        fraud_data = self.df[self.df[self.fraud_col] == 1]
-        non_fraud_data = self.df[self.df[self.fraud_col] == 0]
-        
-        synthetic_records = []
-        
-        # Sample and perturb fraud records
-        for _ in range(min(n_fraud, len(fraud_data))):
-            record = fraud_data.sample(1).iloc[0].copy()
-            record = self._perturb_record(record, is_fraud=True)
-            record[self.fraud_col] = 1
-            synthetic_records.append(record)
-        
-        # Sample and perturb non-fraud records
-        for _ in range(min(n_non_fraud, len(non_fraud_data))):
-            record = non_fraud_data.sample(1).iloc[0].copy()
-            record = self._perturb_record(record, is_fraud=False)
-            record[self.fraud_col] = 0
-            synthetic_records.append(record)
-        
-        return pd.DataFrame(synthetic_records)
-    
-    def _perturb_record(self, record, is_fraud=False):
-        """Apply randomization with fraud-aware transformations."""
-        # Perturb numeric columns
-        for col in self.numeric_cols:
-            if col != self.fraud_col:
-                try:
-                    if pd.notna(record[col]) and record[col] > 0:
-                        if is_fraud:
-                            # Frauds tend to have higher amounts or odd patterns
-                            perturbation = np.random.uniform(0.5, 1.5)
-                        else:
-                            perturbation = np.random.uniform(-0.3, 0.3)
-                        record[col] = record[col] * (1 + perturbation)
-                except:
-                    pass
-        
-        # Regenerate IDs for uniqueness
-        if 'Transaction ID' in record.index:
-            record['Transaction ID'] = str(uuid.uuid4())
-        if 'Customer ID' in record.index:
-            record['Customer ID'] = str(uuid.uuid4())
-        
-        # Randomly modify categorical fields
-        for col in self.categorical_cols:
-            if col not in ['Transaction ID', 'Customer ID'] and np.random.random() < 0.2:
-                unique_vals = self.df[col].dropna().unique()
-                if len(unique_vals) > 0:
-                    record[col] = np.random.choice(unique_vals)
-        
-        return record
-    
-    def save(self, df):
-        """Save to CSV with all columns preserved."""
-        output_path = os.path.join(OUTPUT_DIR, 'ecommerce_test_data.csv')
-        df.to_csv(output_path, index=False)
-        print(f"✓ Saved E-commerce: {output_path} ({len(df)} rows, {len(df.columns)} columns)")
-        return output_path
+        super().__init__(pd.read_csv(csv_path), 'Is Fraudulent', seed=seed)
+        self.describe()
 
 
-class EthereumDataGenerator:
+class EthereumDataGenerator(SyntheticDataGenerator):
     """Generate synthetic Ethereum fraud test data."""
-    
-    def __init__(self, txt_path='data/eth_fraud.txt'):
-        """Load and analyze Ethereum fraud dataset."""
+
+    name = 'Ethereum'
+    output_file = 'ethereum_test_data.csv'
+    # Perturb numeric columns by ±15-40%, zeros become U(0, 100)
+    perturbation = (-0.4, 0.4)
+    zero_fill = (0, 100)
+
+    def __init__(self, txt_path='data/eth_fraud.txt', seed=DEFAULT_SEED,
+                 reservoir_size=5_000, chunksize=DEFAULT_CHUNKSIZE):
+        """Stream the whole Ethereum fraud dataset, keeping reservoir_size rows per class."""
+        sample_seed, row_seed, label_seed = spawn_seeds(seed, 3)
+        sep = '\t'
         try:
-            self.df = pd.read_csv(txt_path, sep='\t', nrows=10000)
-        except:
+            columns = pd.read_csv(txt_path, sep=sep, nrows=5).columns
+        except Exception:
+            columns = pd.Index([])
+        if len(columns) <= 1:
             # Fallback if format differs
             print("Warning: Could not parse Ethereum data with tab separator")
-            self.df = pd.read_csv(txt_path, nrows=10000)
-        
-        self.fraud_col = 'flagged'  # Common fraud column name
-        
+            sep = ','
+            columns = pd.read_csv(txt_path, sep=sep, nrows=5).columns
+
+        fraud_col = 'flagged'  # Common fraud column name
+
         # If fraud column doesn't exist, create it based on available data
-        if self.fraud_col not in self.df.columns:
+        if fraud_col not in columns:
             # Try common alternatives
             for col in ['fraud', 'is_fraud', 'is_fraudulent', 'Fraud']:
-                if col in self.df.columns:
-                    self.fraud_col = col
+                if col in columns:
+                    fraud_col = col
                     break
             else:
-                # Default: assume last numeric column or create random
-                self.fraud_col = 'is_fraud'
-                self.df[self.fraud_col] = np.random.randint(0, 2, len(self.df))
-        
-        self.categorical_cols = self.df.select_dtypes(include='object').columns.tolist()
-        self.numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        
-        print(f"\nEthereum Dataset: {len(self.df)} rows, {len(self.df.columns)} columns")
-        print(f"Fraud column: {self.fraud_col}")
-        if self.fraud_col in self.df.columns:
-            print(f"Fraud samples: {(self.df[self.fraud_col]==1).sum()}")
-            print(f"Non-fraud samples: {(self.df[self.fraud_col]==0).sum()}")
-    
-    def generate_synthetic_data(self, n_fraud=25, n_non_fraud=25):
-        """Generate synthetic Ethereum data with perturbations."""
+                fraud_col = None
+
+        source = sample_source(txt_path, label_col=fraud_col, per_class=reservoir_size,
+                               sep=sep, chunksize=chunksize, seed=sample_seed)
+        df = source.frame
+        if fraud_col is None:
+            # Default: no label in the source, assign random ones
+            fraud_col = 'is_fraud'
+            df[fraud_col] = np.random.default_rng(label_seed).integers(0, 2, len(df))
+            source = None
+
+        super().__init__(df, fraud_col, seed=row_seed, source=source)
+        print(f"\nFraud column: {self.fraud_col}")
+        self.describe()
+
+    def _pool_for(self, label):
+        pool = super()._pool_for(label)
+        # If no fraud data, use non-fraud data instead
+        if label == 1 and len(pool) == 0:
+            return super()._pool_for(0)
+        return pool
+
+    def _empty_block(self, n, label):
+        """Fill with fully synthetic records when there is nothing to resample."""
+        if n <= 0:
+            return self.df.iloc[0:0].copy()
         if self.df.empty:
             print("Warning: Ethereum dataset is empty, creating minimal synthetic data")
-            return self._create_minimal_eth_data(n_fraud, n_non_fraud)
-        
-        if self.fraud_col not in self.df.columns:
-            self.df[self.fraud_col] = 0
-        
-        fraud_data = self.df[self.df[self.fraud_col] == 1]
-        non_fraud_data = self.df[self.df[self.fraud_col] == 0]
-        
-        synthetic_records = []
-        
-        # If no fraud data, use non-fraud data instead
-        if len(fraud_data) == 0:
-            fraud_data = non_fraud_data.sample(min(n_fraud, len(non_fraud_data)))
-        
-        # Sample and perturb fraud records
-        n_fraud_available = min(n_fraud, len(fraud_data))
-        for _ in range(n_fraud_available):
-            record = fraud_data.sample(1).iloc[0].copy()
-            record = self._perturb_record(record)
-            record[self.fraud_col] = 1
-            synthetic_records.append(record.to_dict())
-        
-        # Sample and perturb non-fraud records
-        n_non_fraud_available = min(n_non_fraud, len(non_fraud_data))
-        for _ in range(n_non_fraud_available):
-            record = non_fraud_data.sample(1).iloc[0].copy()
-            record = self._perturb_record(record)
-            record[self.fraud_col] = 0
-            synthetic_records.append(record.to_dict())
-        
-        # Fill remaining with synthetic data if needed
-        while len(synthetic_records) < (n_fraud + n_non_fraud):
-            record = self._create_synthetic_ethereum_record()
-            synthetic_records.append(record)
-        
-        return pd.DataFrame(synthetic_records)
-    
-    def _perturb_record(self, record):
-        """Apply randomization to numeric and categorical features."""
-        # Perturb numeric columns by ±15-40%
-        for col in self.numeric_cols:
-            try:
-                if pd.notna(record[col]):
-                    val = float(record[col])
-                    if val != 0:
-                        perturbation = np.random.uniform(-0.4, 0.4)
-                        record[col] = val * (1 + perturbation)
-                    else:
-                        record[col] = np.random.uniform(0, 100)
-            except:
-                pass
-        
-        return record
-    
-    def _create_synthetic_ethereum_record(self):
-        """Create a synthetic Ethereum record."""
-        record = {
-            'blockNumber': np.random.randint(16000000, 18000000),
-            'confirmations': np.random.randint(1, 1000),
-            'Month': np.random.randint(1, 13),
-            'Day': np.random.randint(1, 32),
-            'Hour': np.random.randint(0, 24),
-            'mean_value_received': np.random.exponential(0.5),
-            'variance_value_received': np.random.exponential(0.1),
-            'total_received_time_diff': np.random.exponential(1),
-            'total_tx_sent': np.random.randint(1, 1000),
-            self.fraud_col: np.random.randint(0, 2)
-        }
-        return record
-    
-    def _create_minimal_eth_data(self, n_fraud, n_non_fraud):
-        """Create minimal Ethereum data structure."""
-        records = []
-        for i in range(n_fraud):
-            records.append({
-                'blockNumber': 16000000 + i,
-                'confirmations': np.random.randint(1, 1000),
-                'Month': np.random.randint(1, 13),
-                'Day': np.random.randint(1, 32),
-                'Hour': np.random.randint(0, 24),
-                'mean_value_received': np.random.exponential(0.5),
-                'variance_value_received': np.random.exponential(0.1),
-                'total_received_time_diff': np.random.exponential(1),
-                'total_tx_sent': np.random.randint(1, 1000),
-                self.fraud_col: 1
-            })
-        for i in range(n_non_fraud):
-            records.append({
-                'blockNumber': 16000000 + n_fraud + i,
-                'confirmations': np.random.randint(1, 1000),
-                'Month': np.random.randint(1, 13),
-                'Day': np.random.randint(1, 32),
-                'Hour': np.random.randint(0, 24),
-                'mean_value_received': np.random.exponential(0.5),
-                'variance_value_received': np.random.exponential(0.1),
-                'total_received_time_diff': np.random.exponential(1),
-                'total_tx_sent': np.random.randint(1, 1000),
-                self.fraud_col: 0
-            })
-        return pd.DataFrame(records)
-    
-    def save(self, df):
-        """Save to CSV with all columns preserved."""
-        output_path = os.path.join(OUTPUT_DIR, 'ethereum_test_data.csv')
-        df.to_csv(output_path, index=False)
-        print(f"✓ Saved Ethereum: {output_path} ({len(df)} rows, {len(df.columns)} columns)")
-        return output_path
+        return self._create_synthetic_ethereum_records(n, label)
+
+    def _create_synthetic_ethereum_records(self, n, label):
+        """Create n synthetic Ethereum records with the given label."""
+        rng = self.rng
+        return pd.DataFrame({
+            'blockNumber': rng.integers(16000000, 18000000, n),
+            'confirmations': rng.integers(1, 1000, n),
+            'Month': rng.integers(1, 13, n),
+            'Day': rng.integers(1, 32, n),
+            'Hour': rng.integers(0, 24, n),
+            'mean_value_received': rng.exponential(0.5, n),
+            'variance_value_received': rng.exponential(0.1, n),
+            'total_received_time_diff': rng.exponential(1, n),
+            'total_tx_sent': rng.integers(1, 1000, n),
+            self.fraud_col: np.full(n, label)
+        })
+
+
+# ============= Parallel generation =============
+
+DOMAINS = {
+    'vehicle': VehicleDataGenerator,
+    'bank': BankDataGenerator,
+    'ecommerce': EcommerceDataGenerator,
+    'ethereum': EthereumDataGenerator,
+}
+
+
+def spawn_seeds(seed, n):
+    """
+    n independent child SeedSequences of seed (an int or a SeedSequence).
+    Children are derived from the spawn key rather than seed.spawn(), so
+    the same seed always yields the same children.
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (i,)) for i in range(n)]
+
+
+def domain_seeds(seed=DEFAULT_SEED):
+    """
+    One independent SeedSequence per domain, spawned in DOMAINS order.
+    A domain's stream depends only on the root seed, not on which other
+    domains run or in which worker.
+    """
+    return dict(zip(DOMAINS, np.random.SeedSequence(seed).spawn(len(DOMAINS))))
 
 
-def main():
-    """Generate test data for all 4 fraud detection models."""
+def generate_domain(domain, seed, n_fraud=25, n_non_fraud=25, n_rows=None, fraud_ratio=0.5,
+                    chunk_size=DEFAULT_CHUNK_SIZE, output_dir=OUTPUT_DIR, output_format='csv',
+                    source_path=None):
+    """
+    Build one domain's dataset and write it to output_dir (runs in a worker).
+
+    With n_rows set, the dataset is streamed to disk in chunks; otherwise
+    n_fraud + n_non_fraud rows are generated in memory and saved as CSV.
+    Returns a summary with timings.
+    """
+    started = time.perf_counter()
+    generator_cls = DOMAINS[domain]
+    generator = generator_cls(source_path, seed=seed) if source_path else generator_cls(seed=seed)
+    loaded = time.perf_counter()
+
+    if n_rows is None:
+        df = generator.generate_synthetic_data(n_fraud=n_fraud, n_non_fraud=n_non_fraud)
+        output_path = generator.save(df, output_dir=output_dir)
+        rows, columns = len(df), len(df.columns)
+        label_range = (df[generator.fraud_col].min(), df[generator.fraud_col].max()) if rows else (None, None)
+    else:
+        filename = os.path.splitext(generator.output_file)[0] + f'.{output_format}'
+        output_path = os.path.join(output_dir, filename)
+        rows = generator.write(output_path, n_rows, fraud_ratio=fraud_ratio, chunk_size=chunk_size)
+        columns = len(generator.df.columns)
+        label_range = None
+
+    finished = time.perf_counter()
+    generate_seconds = finished - loaded
+    return {
+        'domain': domain,
+        'path': output_path,
+        'rows': rows,
+        'columns': columns,
+        'label_range': label_range,
+        'load_seconds': loaded - started,
+        'generate_seconds': generate_seconds,
+        'seconds': finished - started,
+        'rows_per_sec': rows / generate_seconds if generate_seconds > 0 else float('inf'),
+    }
+
+
+def run_generation(domains=tuple(DOMAINS), workers=1, seed=DEFAULT_SEED, sources=None, **options):
+    """Generate the given domains, in parallel when workers > 1. Results follow `domains` order."""
+    seeds = domain_seeds(seed)
+    sources = sources or {}
+    jobs = [
+        dict(domain=domain, seed=seeds[domain], source_path=sources.get(domain), **options)
+        for domain in domains
+    ]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [pool.submit(generate_domain, **job) for job in jobs]
+            return [future.result() for future in futures]
+    return [generate_domain(**job) for job in jobs]
+
+
+def parse_sources(values):
+    sources = {}
+    for value in values or []:
+        domain, _, path = value.partition('=')
+        if domain not in DOMAINS or not path:
+            raise argparse.ArgumentTypeError(f"--source expects DOMAIN=PATH with DOMAIN in {list(DOMAINS)}")
+        sources[domain] = path
+    return sources
+
+
+def main(argv=None):
+    """Generate test data for the fraud detection models."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--domains', nargs='+', choices=list(DOMAINS), default=list(DOMAINS))
+    parser.add_argument('--workers', type=int, default=1, help='worker processes (one domain each)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--n-fraud', type=int, default=25)
+    parser.add_argument('--n-non-fraud', type=int, default=25)
+    parser.add_argument('--rows', type=int, help='stream this many rows per domain instead of --n-fraud/--n-non-fraud')
+    parser.add_argument('--fraud-ratio', type=float, default=0.5, help='fraud share of --rows')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help='output format for --rows')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--source', action='append', metavar='DOMAIN=PATH', help='override a source dataset path')
+    args = parser.parse_args(argv)
+
     print("\n" + "="*80)
     print("FRAUDPROOF LEDGER - TEST DATA GENERATOR")
     print("="*80)
-    
-    # Vehicle Insurance
-    print("\n[1/4] Generating Vehicle Insurance Test Data...")
-    vehicle_gen = VehicleDataGenerator()
-    vehicle_df = vehicle_gen.generate_synthetic_data(n_fraud=25, n_non_fraud=25)
-    vehicle_path = vehicle_gen.save(vehicle_df)
-    print(f"   Columns: {list(vehicle_df.columns)[:5]}... (total: {len(vehicle_df.columns)})")
-    print(f"   Sample fraud_score range: {vehicle_df['FraudFound_P'].min()}-{vehicle_df['FraudFound_P'].max()}")
-    
-    # Bank Account
-    print("\n[2/4] Generating Bank Account Test Data...")
-    bank_gen = BankDataGenerator()
-    bank_df = bank_gen.generate_synthetic_data(n_fraud=25, n_non_fraud=25)
-    bank_path = bank_gen.save(bank_df)
-    print(f"   Columns: {list(bank_df.columns)[:5]}... (total: {len(bank_df.columns)})")
-    print(f"   Sample fraud_score range: {bank_df['fraud_bool'].min()}-{bank_df['fraud_bool'].max()}")
-    
-    # E-commerce
-    print("\n[3/4] Generating E-commerce Test Data...")
-    ecom_gen = EcommerceDataGenerator()
-    ecom_df = ecom_gen.generate_synthetic_data(n_fraud=25, n_non_fraud=25)
-    ecom_path = ecom_gen.save(ecom_df)
-    print(f"   Columns: {list(ecom_df.columns)[:5]}... (total: {len(ecom_df.columns)})")
-    print(f"   Sample fraud_score range: {ecom_df['Is Fraudulent'].min()}-{ecom_df['Is Fraudulent'].max()}")
-    
-    # Ethereum
-    print("\n[4/4] Generating Ethereum Test Data...")
-    eth_gen = EthereumDataGenerator()
-    eth_df = eth_gen.generate_synthetic_data(n_fraud=25, n_non_fraud=25)
-    eth_path = eth_gen.save(eth_df)
-    print(f"   Columns: {list(eth_df.columns)[:5]}... (total: {len(eth_df.columns)})")
-    print(f"   Sample fraud_score range: {eth_df[eth_gen.fraud_col].min()}-{eth_df[eth_gen.fraud_col].max()}")
-    
+    print(f"Domains: {', '.join(args.domains)} | workers: {args.workers} | seed: {args.seed}")
+
+    started = time.perf_counter()
+    results = run_generation(
+        args.domains,
+        workers=args.workers,
+        seed=args.seed,
+        sources=parse_sources(args.source),
+        n_fraud=args.n_fraud,
+        n_non_fraud=args.n_non_fraud,
+        n_rows=args.rows,
+        fraud_ratio=args.fraud_ratio,
+        chunk_size=args.chunk_size,
+        output_dir=args.output_dir,
+        output_format=args.format,
+    )
+    elapsed = time.perf_counter() - started
+
     # Summary
     print("\n" + "="*80)
     print("SUMMARY")
     print("="*80)
-    print(f"✓ Vehicle: {len(vehicle_df)} rows × {len(vehicle_df.columns)} columns")
-    print(f"✓ Bank: {len(bank_df)} rows × {len(bank_df.columns)} columns")
-    print(f"✓ E-commerce: {len(ecom_df)} rows × {len(ecom_df.columns)} columns")
-    print(f"✓ Ethereum: {len(eth_df)} rows × {len(eth_df.columns)} columns")
-    print(f"\nAll test data saved to: {OUTPUT_DIR}/")
+    for result in results:
+        print(f"✓ {result['domain']}: {result['rows']} rows × {result['columns']} columns -> {result['path']}")
+        if result['label_range'] is not None:
+            print(f"   Label range: {result['label_range'][0]}-{result['label_range'][1]}")
+        print(f"   load {result['load_seconds']:.2f}s | generate {result['generate_seconds']:.2f}s "
+              f"| {result['rows_per_sec']:,.0f} rows/sec")
+    total_rows = sum(r['rows'] for r in results)
+    print(f"\nTotal: {total_rows} rows in {elapsed:.2f}s ({total_rows / elapsed:,.0f} rows/sec wall clock)")
+    print(f"All test data saved to: {args.output_dir}/")
     print("="*80)
-    
-    # Validation: Print sample from each
-    print("\nVALIDATION - Sample Records with All Columns:\n")
-    
-    print("VEHICLE (first row):")
-    print(vehicle_df.iloc[0])
-    print(f"\nVehicle dtypes:\n{vehicle_df.dtypes}\n")
-    
-    print("BANK (first row):")
-    print(bank_df.iloc[0])
-    print(f"\nBank dtypes:\n{bank_df.dtypes}\n")
-    
-    print("ECOMMERCE (first row):")
-    print(ecom_df.iloc[0])
-    print(f"\nEcommerce dtypes:\n{ecom_df.dtypes}\n")
-    
-    print("ETHEREUM (first row):")
-    print(eth_df.iloc[0])
-    print(f"\nEthereum dtypes:\n{eth_df.dtypes}\n")
+    return results
 
 
 if __name__ == '__main__':
@@ -0,0 +1,213 @@
+"""
+Dict-to-array fast-path transforms.
+
+Each function mirrors its pandas counterpart in utils/transforms.py for a
+single raw record, but writes straight into one row of a FeatureLayout
+matrix instead of building a DataFrame. One-hot columns are resolved through
+the layout's precomputed column index, so unseen categories cost a dict miss.
+"""
+
+import math
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils.transforms import (
+    categorize_age,
+    clean_vehicle_age,
+    VEHICLE_BINARY_MAPPINGS,
+    VEHICLE_ORDINAL_MAPPINGS,
+    VEHICLE_DROP_COLS,
+    VEHICLE_ONEHOT_COLS,
+    ECOMMERCE_DROP_COLS,
+    ECOMMERCE_ONEHOT_COLS,
+    ECOMMERCE_CYCLICAL_UNITS,
+    ECOMMERCE_FINAL_DROP,
+    ETHEREUM_DROP_COLS,
+)
+
+
+def is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def to_float(value):
+    """
+    A numeric record value as a float, with None (JSON null) as NaN, so
+    comparisons and arithmetic follow pandas on a float column
+    (NaN < 10 is False, NaN + 1 is NaN).
+    """
+    return math.nan if value is None else float(value)
+
+
+def is_numeric(value):
+    """Scalar equivalent of pd.api.types.is_numeric_dtype on a one-row column."""
+    return isinstance(value, (int, float, np.number, np.bool_)) and not isinstance(value, str)
+
+
+def set_feature(row, index, name, value):
+    """Write value into the row if the model uses this feature."""
+    idx = index.get(name)
+    if idx is not None:
+        row[idx] = value
+
+
+def set_onehot(row, index, col, value):
+    """Equivalent of pd.get_dummies for one value: sets column '<col>_<value>'."""
+    if not is_missing(value):
+        set_feature(row, index, f"{col}_{value}", 1.0)
+
+
+def set_cyclical(row, index, col, value, max_val):
+    set_feature(row, index, col + '_sin', math.sin(2 * math.pi * value / max_val))
+    set_feature(row, index, col + '_cos', math.cos(2 * math.pi * value / max_val))
+
+
+def set_passthrough(row, index, record, skip):
+    """Copy every remaining raw column the model uses as-is."""
+    for col, value in record.items():
+        if col not in skip and col in index:
+            row[index[col]] = np.nan if value is None else value
+
+
+# ==========================================
+# 1. VEHICLE
+# ==========================================
+VEHICLE_SKIP = (set(VEHICLE_BINARY_MAPPINGS) | set(VEHICLE_ORDINAL_MAPPINGS)
+                | set(VEHICLE_DROP_COLS) | set(VEHICLE_ONEHOT_COLS) | {'Age'})
+
+
+def fill_vehicle_row(record, row, index):
+    for col, mapping in VEHICLE_BINARY_MAPPINGS.items():
+        if col in record:
+            value = record[col]
+            set_feature(row, index, col, value if is_numeric(value) else mapping.get(value, 0))
+
+    for col, mapping in VEHICLE_ORDINAL_MAPPINGS.items():
+        if col in record:
+            value = record[col]
+            set_feature(row, index, col, value if is_numeric(value) else mapping.get(value, 0))
+
+    for col in VEHICLE_ONEHOT_COLS:
+        if col in record:
+            set_onehot(row, index, col, record[col])
+
+    if 'Age' in record:
+        set_feature(row, index, 'Age', categorize_age(clean_vehicle_age(to_float(record['Age']))))
+
+    set_passthrough(row, index, record, VEHICLE_SKIP)
+
+
+# ==========================================
+# 2. E-COMMERCE
+# ==========================================
+ECOMMERCE_SKIP = (set(ECOMMERCE_DROP_COLS) | set(ECOMMERCE_ONEHOT_COLS)
+                  | set(ECOMMERCE_FINAL_DROP) | {'Customer Age'})
+
+
+def parse_timestamp(value):
+    """datetime.fromisoformat covers generated data; pandas handles the rest."""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return pd.Timestamp(value)
+
+
+def fill_ecommerce_row(record, row, index):
+    if 'Customer Age' in record:
+        age = to_float(record['Customer Age'])
+        set_feature(row, index, 'Customer Age', 30 if age < 10 else age)
+
+    has_match = 'Shipping Address' in record and 'Billing Address' in record
+    # pandas: a missing address never equals anything, itself included
+    match = int(not is_missing(record['Shipping Address']) and not is_missing(record['Billing Address'])
+                and record['Shipping Address'] == record['Billing Address']) if has_match else None
+    if has_match:
+        set_feature(row, index, 'Address Match', match)
+
+    for col in ECOMMERCE_ONEHOT_COLS:
+        if col in record:
+            set_onehot(row, index, col, record[col])
+
+    if 'Transaction Amount' in record:
+        amount = to_float(record['Transaction Amount'])
+        if 'Customer ID' in record:
+            set_feature(row, index, 'Customer_Avg_Amount', amount)
+        set_feature(row, index, 'Amount_vs_Avg', 1.0)
+        if 'Account Age Days' in record:
+            set_feature(row, index, 'Risk_New_High_Spend', amount / (to_float(record['Account Age Days']) + 1))
+        if 'Quantity' in record:
+            set_feature(row, index, 'Amount_per_Item', amount / (to_float(record['Quantity']) + 1e-6))
+        if has_match:
+            set_feature(row, index, 'Risk_Mismatch', amount * (1 - match))
+
+    if 'Transaction Date' in record:
+        ts = parse_timestamp(record['Transaction Date'])
+        if pd.isna(ts):
+            parts = dict.fromkeys(('Month', 'Day', 'Hour', 'DayOfWeek'), math.nan)
+        else:
+            parts = {'Month': ts.month, 'Day': ts.day, 'Hour': ts.hour, 'DayOfWeek': ts.weekday()}
+        for unit, max_val in ECOMMERCE_CYCLICAL_UNITS:
+            set_feature(row, index, unit, parts[unit])
+            set_cyclical(row, index, unit, parts[unit], max_val)
+
+    set_passthrough(row, index, record, ECOMMERCE_SKIP)
+
+
+# ==========================================
+# 3. BANK
+# ==========================================
+def fill_bank_row(record, row, index):
+    for col, value in record.items():
+        idx = index.get(col)
+        if idx is None:
+            continue
+        # fillna(0), then category codes: a lone category always encodes to 0
+        if is_missing(value) or not is_numeric(value):
+            row[idx] = 0
+        else:
+            row[idx] = value
+
+
+# ==========================================
+# 4. ETHEREUM
+# ==========================================
+ETHEREUM_SKIP = set(ETHEREUM_DROP_COLS)
+
+
+def fill_ethereum_row(record, row, index):
+    epsilon = 1e-6
+
+    if 'total_tx_sent_unique' in record:
+        set_feature(row, index, 'ratio_unique_sent',
+                    to_float(record['total_tx_sent_unique']) / (to_float(record.get('total_tx_sent')) + epsilon))
+    if 'total_received' in record:
+        set_feature(row, index, 'velocity_value_received',
+                    to_float(record['total_received'])
+                    / (to_float(record.get('time_diff_first_last_received')) + epsilon))
+
+    if 'Hour' in record:
+        set_cyclical(row, index, 'Hour', to_float(record['Hour']), 24)
+    if 'Day' in record:
+        set_cyclical(row, index, 'Day', to_float(record['Day']), 31)
+
+    set_passthrough(row, index, record, ETHEREUM_SKIP)
+
+
+FAST_TRANSFORMS = {
+    "vehicle": fill_vehicle_row,
+    "bank": fill_bank_row,
+    "ecommerce": fill_ecommerce_row,
+    "ethereum": fill_ethereum_row
+}
+
+
+def records_to_matrix(records, transaction_type, layout):
+    """Transform raw record dicts straight into the model's float32 feature matrix."""
+    fill_row = FAST_TRANSFORMS[transaction_type]
+    out = layout.allocate(len(records))
+    index = layout.index
+    for i, record in enumerate(records):
+        fill_row(record, out[i], index)
+    return out
@@ -1,5 +1,16 @@
+import itertools
 import joblib
+import numpy as np
 import os
+import re
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from core.config import MODEL_MMAP, MODEL_BACKEND, MODEL_LOAD_RETRY_SECONDS, ONNX_INTRA_OP_THREADS
+from utils.tree_compiler import compiled_path_for, is_compiled_fresh, load_compiled
+from utils.onnx_backend import HAS_ONNXRUNTIME, OnnxModel, is_onnx_fresh, onnx_path_for
 
 # Get the absolute path to the project root
 # internal path: backend/utils/load_models.py -> go up 3 levels to root
@@ -18,38 +29,502 @@ def get_model_path(filename):
     """Get absolute path for model weights."""
     return os.path.join(MODEL_DIR, filename)
 
+def get_mmap_artifact_path(filename):
+    """Path of the memory-mappable copy of a model pickle."""
+    return mmap_path_for(get_model_path(filename))
+
+def mmap_path_for(path):
+    return os.path.splitext(path)[0] + '.mmap.joblib'
+
+def export_mmap_artifact(filename):
+    """
+    Re-dump a model pickle uncompressed so joblib can memory-map its arrays.
+    
+    Uncompressed joblib files store every NumPy array as a raw block, which
+    joblib.load(mmap_mode='r') maps read-only. Worker processes mapping the
+    same file then share those pages through the OS page cache.
+    """
+    model = joblib.load(get_model_path(filename))
+    path = get_mmap_artifact_path(filename)
+    joblib.dump(model, path, compress=0)
+    return path
+
+def load_model_file(filename, mmap=None):
+    """
+    Load a model pickle, preferring its memory-mapped artifact when enabled.
+    Falls back to the regular pickle if the artifact is missing or stale.
+    """
+    return load_model_path(get_model_path(filename), mmap)
+
+def load_model_path(path, mmap=None, backend=None):
+    """
+    load_model_file() for an absolute path.
+    With the compiled or onnx backend an up-to-date <name>.trees/ or
+    <name>.onnx export is loaded instead of the pickle, without importing
+    the library that trained it.
+    """
+    backend = MODEL_BACKEND if backend is None else backend
+    if backend == "compiled":
+        if is_compiled_fresh(path):
+            return load_compiled(compiled_path_for(path))
+        print(f"WARNING: No up-to-date compiled model for {os.path.basename(path)}, loading pickle")
+    elif backend == "onnx":
+        if not HAS_ONNXRUNTIME:
+            print("WARNING: onnxruntime is not installed, loading pickle")
+        elif is_onnx_fresh(path):
+            return OnnxModel(onnx_path_for(path), intra_op_threads=ONNX_INTRA_OP_THREADS)
+        else:
+            print(f"WARNING: No up-to-date ONNX model for {os.path.basename(path)}, loading pickle")
+    mmap = MODEL_MMAP if mmap is None else mmap
+    if mmap:
+        mmap_path = mmap_path_for(path)
+        stale = os.path.exists(path) and os.path.exists(mmap_path) and \
+            os.path.getmtime(mmap_path) < os.path.getmtime(path)
+        if os.path.exists(mmap_path) and not stale:
+            return joblib.load(mmap_path, mmap_mode='r')
+        if os.path.exists(path):
+            print(f"WARNING: No up-to-date mmap artifact for {os.path.basename(path)}, loading pickle")
+    return joblib.load(path)
+
+class FeatureLayout:
+    """
+    Fixed input-matrix layout for one model, compiled once from feature_names_in_.
+    
+    Maps feature names to column indices so transformed data can be written
+    straight into a preallocated float32 matrix in the model's column order.
+    
+    Requests are filled by utils.fast_transforms.records_to_matrix; the
+    DataFrame path (_plan / fill_from_frame) is kept only as the reference
+    that benchmarks/bench_stages.py times and test_fast_transforms checks
+    records_to_matrix against.
+    """
+    
+    def __init__(self, features):
+        self.features = list(features)
+        self.index = {name: i for i, name in enumerate(self.features)}
+        self.n_features = len(self.features)
+        # Column plans keyed by the exact source column tuple
+        self._plans = {}
+    
+    def allocate(self, n_rows):
+        """Zero-filled matrix; features absent from the input stay 0."""
+        return np.zeros((n_rows, self.n_features), dtype=np.float32)
+    
+    def _plan(self, columns):
+        """Source positions and target indices for a set of source columns."""
+        key = tuple(columns)
+        plan = self._plans.get(key)
+        if plan is None:
+            src, dst = [], []
+            for pos, name in enumerate(key):
+                idx = self.index.get(name)
+                if idx is not None:
+                    src.append(pos)
+                    dst.append(idx)
+            plan = (np.array(src, dtype=np.intp), np.array(dst, dtype=np.intp))
+            # Column sets are stable per transform, so this stays tiny
+            if len(self._plans) < 256:
+                self._plans[key] = plan
+        return plan
+    
+    def fill_from_frame(self, df, out=None):
+        """Write a transformed DataFrame into the layout's dense matrix."""
+        if out is None:
+            out = self.allocate(len(df))
+        src, dst = self._plan(df.columns)
+        if len(src):
+            out[:, dst] = df.iloc[:, src].to_numpy(dtype=np.float32)
+        return out
+
+
+def predict_dense(model, X):
+    """
+    predict_proba on a FeatureLayout matrix. The matrix has no column
+    names by design, so sklearn's feature-name warning is silenced for
+    this call only.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return model.predict_proba(X)
+
+
+def compile_feature_layout(model):
+    """Build a FeatureLayout from the model's feature_names_in_ (None if absent)."""
+    try:
+        names = model.feature_names_in_
+    except AttributeError:
+        return None
+    return FeatureLayout(str(name) for name in names)
+
+
 def load_model_vehicle():
-    """Load vehicle model and extract feature names from the model itself."""
-    model = joblib.load(get_model_path('vehicle_model_weights.pkl'))
-    # Extract features from model instead of corrupted feature files
-    features = model.feature_names_in_.tolist() if hasattr(model, 'feature_names_in_') else None
-    if features:
-        print(f"✓ Vehicle model loaded with {len(features)} features")
-    return model, features
+    """Load vehicle model and compile its feature layout from the model itself."""
+    model = load_model_file('vehicle_model_weights.pkl')
+    # Compile the feature layout from the model instead of corrupted feature files
+    layout = compile_feature_layout(model)
+    if layout:
+        print(f"✓ Vehicle model loaded with {layout.n_features} features")
+    return model, layout
 
 def load_model_bank():
-    """Load bank model and extract feature names from the model itself."""
-    model = joblib.load(get_model_path('bank_model_weights.pkl'))
-    # Extract features from model instead of corrupted feature files
-    features = model.feature_names_in_.tolist() if hasattr(model, 'feature_names_in_') else None
-    if features:
-        print(f"✓ Bank model loaded with {len(features)} features")
-    return model, features
+    """Load bank model and compile its feature layout from the model itself."""
+    model = load_model_file('bank_model_weights.pkl')
+    # Compile the feature layout from the model instead of corrupted feature files
+    layout = compile_feature_layout(model)
+    if layout:
+        print(f"✓ Bank model loaded with {layout.n_features} features")
+    return model, layout
 
 def load_model_ecommerce():
-    """Load ecommerce model and extract feature names from the model itself."""
-    model = joblib.load(get_model_path('ecommerce_model_weights.pkl'))
-    # Extract features from model instead of corrupted feature files
-    features = model.feature_names_in_.tolist() if hasattr(model, 'feature_names_in_') else None
-    if features:
-        print(f"✓ Ecommerce model loaded with {len(features)} features")
-    return model, features
+    """Load ecommerce model and compile its feature layout from the model itself."""
+    model = load_model_file('ecommerce_model_weights.pkl')
+    # Compile the feature layout from the model instead of corrupted feature files
+    layout = compile_feature_layout(model)
+    if layout:
+        print(f"✓ Ecommerce model loaded with {layout.n_features} features")
+    return model, layout
 
 def load_model_eth():
-    """Load ethereum model and extract feature names from the model itself."""
-    model = joblib.load(get_model_path('ethereum_model_weights.pkl'))
-    # Extract features from model instead of corrupted feature files
-    features = model.feature_names_in_.tolist() if hasattr(model, 'feature_names_in_') else None
-    if features:
-        print(f"✓ Ethereum model loaded with {len(features)} features")
-    return model, features
\ No newline at end of file
+    """Load ethereum model and compile its feature layout from the model itself."""
+    model = load_model_file('ethereum_model_weights.pkl')
+    # Compile the feature layout from the model instead of corrupted feature files
+    layout = compile_feature_layout(model)
+    if layout:
+        print(f"✓ Ethereum model loaded with {layout.n_features} features")
+    return model, layout
+
+
+# ==========================================
+# MODEL REGISTRY (lazy / parallel loading)
+# ==========================================
+MODEL_LOADERS = {
+    "vehicle": load_model_vehicle,
+    "bank": load_model_bank,
+    "ecommerce": load_model_ecommerce,
+    "ethereum": load_model_eth
+}
+
+MODEL_FILES = {
+    "vehicle": 'vehicle_model_weights.pkl',
+    "bank": 'bank_model_weights.pkl',
+    "ecommerce": 'ecommerce_model_weights.pkl',
+    "ethereum": 'ethereum_model_weights.pkl'
+}
+
+
+# ==========================================
+# VERSIONED ARTIFACTS
+# ==========================================
+# Version recorded for the original, un-suffixed <type>_model_weights.pkl files
+LEGACY_VERSION = "v1.0"
+
+# Retrained weights are dropped next to them as <type>_model_weights-<version>.pkl
+ARTIFACT_PATTERN = re.compile(r'^(?P<type>[a-z]+)_model_weights(?:-(?P<version>[\w.]+))?\.pkl$')
+
+
+class ModelArtifact:
+    """One weights file in the model directory."""
+    
+    def __init__(self, transaction_type, version, path, mtime_ns):
+        self.transaction_type = transaction_type
+        self.version = version
+        self.path = path
+        self.mtime_ns = mtime_ns
+    
+    @property
+    def key(self):
+        """Identity of the file contents; changes when the file is replaced."""
+        return (self.version, self.mtime_ns)
+    
+    def load(self):
+        """Load the weights and compile their feature layout."""
+        model = load_model_path(self.path)
+        layout = compile_feature_layout(model)
+        if layout:
+            print(f"✓ {self.transaction_type.capitalize()} model {self.version} loaded "
+                  f"with {layout.n_features} features")
+        return model, layout
+
+
+def discover_artifacts(model_dir=None):
+    """
+    Weights files per transaction type, oldest first.
+    The last entry of each list is the one that should be serving.
+    """
+    model_dir = model_dir or MODEL_DIR
+    found = {}
+    try:
+        names = os.listdir(model_dir)
+    except FileNotFoundError:
+        return found
+    for name in names:
+        match = ARTIFACT_PATTERN.match(name)
+        if not match:
+            continue
+        path = os.path.join(model_dir, name)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        transaction_type = match.group('type')
+        version = match.group('version') or LEGACY_VERSION
+        found.setdefault(transaction_type, []).append(
+            ModelArtifact(transaction_type, version, path, mtime_ns)
+        )
+    for artifacts in found.values():
+        artifacts.sort(key=lambda a: (a.mtime_ns, a.version))
+    return found
+
+
+def current_rss_bytes():
+    """Resident set size of this process (None where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Loads (model, FeatureLayout) pairs on demand.
+    
+    Each transaction type is loaded at most once, either lazily on first
+    use or up front with load_all() in a thread pool. Every load can be
+    followed by a warm-up inference on synthetic rows so the first real
+    request doesn't pay cold-cache costs.
+    
+    With a model directory (the default for the built-in loaders) each
+    type serves the newest weights file found by discover_artifacts() and
+    its version is taken from the file name; otherwise every load gets a
+    new "<type>-load<n>" version. install()/reload() load the replacement
+    off the request path and swap it in with a single assignment, then
+    notify reload listeners (e.g. to drop cached predictions). The last
+    keep_versions versions stay in memory for shadow scoring. install()
+    refuses a file whose version is already in memory, so a version name
+    always refers to one set of weights.
+
+    Versions are display names; every load also gets a registry-unique
+    load token (see get_serving()) for keying anything derived from the
+    exact weights, such as cached predictions.
+    
+    A failed load is remembered for retry_seconds: requests in that window
+    fail fast instead of rescanning the directory and retrying the load.
+    """
+    
+    def __init__(self, loaders=None, warmup_rows=0, model_dir=None, keep_versions=3,
+                 retry_seconds=MODEL_LOAD_RETRY_SECONDS):
+        self.model_dir = model_dir if model_dir is not None else (MODEL_DIR if loaders is None else None)
+        self.loaders = loaders or MODEL_LOADERS
+        self.warmup_rows = warmup_rows
+        self.keep_versions = max(1, keep_versions)
+        self.retry_seconds = retry_seconds
+        self._models = {}
+        # (entry, version, load token) set in one assignment, so all three always match
+        self._versioned = {}
+        self._load_tokens = itertools.count(1)
+        self._artifact_keys = {}
+        self._retained = {t: OrderedDict() for t in self.loaders}
+        self._load_counts = {}
+        # transaction_type -> (time.monotonic() of the failure, error message)
+        self._failures = {}
+        self._listeners = []
+        self._stats = {t: {"loaded": False} for t in self.loaders}
+        self._locks = {t: threading.Lock() for t in self.loaders}
+    
+    def __contains__(self, transaction_type):
+        return transaction_type in self.loaders
+    
+    def is_loaded(self, transaction_type):
+        return transaction_type in self._models
+    
+    def get(self, transaction_type):
+        """Return (model, layout), loading it on first use."""
+        entry = self._models.get(transaction_type)
+        if entry is not None:
+            return entry
+        if transaction_type not in self.loaders:
+            raise ValueError(f"Unknown transaction type: {transaction_type}")
+        self._check_failure(transaction_type)
+        with self._locks[transaction_type]:
+            # Another thread may have finished loading (or failed) while we waited
+            entry = self._models.get(transaction_type)
+            if entry is None:
+                self._check_failure(transaction_type)
+                try:
+                    entry = self._load(transaction_type, *self._source(transaction_type))
+                except Exception as e:
+                    self._failures[transaction_type] = (time.monotonic(), str(e))
+                    raise
+        return entry
+    
+    def _check_failure(self, transaction_type):
+        """Raise if the last load of a type failed less than retry_seconds ago."""
+        failure = self._failures.get(transaction_type)
+        if failure is None:
+            return
+        failed_at, error = failure
+        remaining = self.retry_seconds - (time.monotonic() - failed_at)
+        if remaining > 0:
+            raise RuntimeError(f"{transaction_type} model unavailable (retrying in {remaining:.0f}s): {error}")
+    
+    def get_versioned(self, transaction_type):
+        """Return ((model, layout), version), loading it on first use."""
+        entry, version, _ = self.get_serving(transaction_type)
+        return entry, version
+    
+    def get_serving(self, transaction_type):
+        """Return ((model, layout), version, load token), loading it on first use."""
+        self.get(transaction_type)
+        return self._versioned[transaction_type]
+    
+    def version(self, transaction_type):
+        """Version token of the loaded model (None if not loaded)."""
+        versioned = self._versioned.get(transaction_type)
+        return versioned[1] if versioned else None
+    
+    def artifact_key(self, transaction_type):
+        """ModelArtifact.key of the serving weights (None for loader-based models)."""
+        return self._artifact_keys.get(transaction_type)
+    
+    def versions(self, transaction_type):
+        """Versions held in memory, oldest first."""
+        return list(self._retained.get(transaction_type, {}))
+    
+    def get_version(self, transaction_type, version):
+        """(model, layout) of a retained version, or None."""
+        return self._retained.get(transaction_type, {}).get(version)
+    
+    def add_reload_listener(self, listener):
+        """Call listener(transaction_type) after a model is reloaded."""
+        self._listeners.append(listener)
+    
+    def reload(self, transaction_type):
+        """
+        Load the model again and swap it in. Requests already holding the
+        old entry finish with it; new requests get the new one.
+        """
+        if transaction_type not in self.loaders:
+            raise ValueError(f"Unknown transaction type: {transaction_type}")
+        with self._locks[transaction_type]:
+            entry = self._load(transaction_type, *self._source(transaction_type))
+        self._notify(transaction_type)
+        return entry
+    
+    def install(self, artifact):
+        """
+        Load a weights file and make it the serving version of its type.
+        Returns False if exactly that file is already serving; raises
+        ValueError if its version is already in memory with other weights
+        (a file replaced in place, or retrained weights reusing a version).
+        """
+        transaction_type = artifact.transaction_type
+        if transaction_type not in self.loaders:
+            raise ValueError(f"Unknown transaction type: {transaction_type}")
+        with self._locks[transaction_type]:
+            if self._artifact_keys.get(transaction_type) == artifact.key:
+                return False
+            if artifact.version in self._retained[transaction_type]:
+                raise ValueError(f"{transaction_type} model {artifact.version} is already loaded; "
+                                 f"retrained weights need a new version")
+            self._load(transaction_type, artifact.load, artifact.version, artifact)
+        self._notify(transaction_type)
+        return True
+    
+    def _notify(self, transaction_type):
+        for listener in self._listeners:
+            listener(transaction_type)
+    
+    def _source(self, transaction_type):
+        """(loader, version, artifact) for the next load of a type."""
+        if self.model_dir is not None:
+            artifacts = discover_artifacts(self.model_dir).get(transaction_type)
+            if artifacts:
+                newest = artifacts[-1]
+                return newest.load, newest.version, newest
+            return self.loaders[transaction_type], LEGACY_VERSION, None
+        count = self._load_counts.get(transaction_type, 0) + 1
+        return self.loaders[transaction_type], f"{transaction_type}-load{count}", None
+    
+    def _load(self, transaction_type, loader, version, artifact=None):
+        stats = {"loaded": False}
+        if not self.is_loaded(transaction_type):
+            self._stats[transaction_type] = stats
+        
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            entry = loader()
+        except Exception as e:
+            # A failed reload leaves the current model (and its stats) in place
+            if self.is_loaded(transaction_type):
+                self._stats[transaction_type]["reload_error"] = str(e)
+            else:
+                stats["error"] = str(e)
+            raise
+        stats["load_seconds"] = round(time.perf_counter() - start, 4)
+        
+        rss_after = current_rss_bytes()
+        # Exact when loading lazily; overlapping loads in load_all share the delta
+        if rss_before is not None and rss_after is not None:
+            stats["rss_delta_bytes"] = rss_after - rss_before
+        filename = MODEL_FILES.get(transaction_type)
+        path = artifact.path if artifact is not None else (filename and get_model_path(filename))
+        if path and os.path.exists(path):
+            stats["artifact_bytes"] = os.path.getsize(path)
+        
+        if self.warmup_rows > 0:
+            stats["warmup_seconds"] = round(self._warm_up(entry, self.warmup_rows), 4)
+        
+        self._load_counts[transaction_type] = self._load_counts.get(transaction_type, 0) + 1
+        retained = self._retained[transaction_type]
+        retained.pop(version, None)
+        retained[version] = entry
+        while len(retained) > self.keep_versions:
+            retained.popitem(last=False)
+        
+        self._failures.pop(transaction_type, None)
+        stats["version"] = version
+        stats["retained_versions"] = list(retained)
+        stats["loaded"] = True
+        self._stats[transaction_type] = stats
+        self._artifact_keys[transaction_type] = artifact.key if artifact is not None else None
+        self._models[transaction_type] = entry
+        self._versioned[transaction_type] = (entry, version, next(self._load_tokens))
+        return entry
+    
+    @staticmethod
+    def _warm_up(entry, n_rows):
+        """Run one inference on synthetic rows and return its duration."""
+        model, layout = entry
+        if layout is None:
+            return 0.0
+        rng = np.random.default_rng(0)
+        rows = rng.random((n_rows, layout.n_features), dtype=np.float32)
+        start = time.perf_counter()
+        predict_dense(model, rows)
+        return time.perf_counter() - start
+    
+    def load_all(self, transaction_types=None, max_workers=4):
+        """
+        Load several transaction types in parallel.
+        Failures are recorded in stats() instead of raised.
+        """
+        types = [t for t in (transaction_types or self.loaders) if t in self.loaders]
+        
+        def load_one(transaction_type):
+            try:
+                self.get(transaction_type)
+            except Exception as e:
+                print(f"WARNING: Could not load {transaction_type} model: {e}")
+        
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(types) or 1))) as pool:
+            list(pool.map(load_one, types))
+        print(f"✓ Loaded {sum(self.is_loaded(t) for t in types)}/{len(types)} models "
+              f"in {time.perf_counter() - start:.2f}s")
+        return self.stats()
+    
+    def stats(self):
+        """Per-model load time, memory and warm-up information."""
+        return {t: dict(s) for t, s in self._stats.items()}
@@ -0,0 +1,80 @@
+"""
+Merkle trees over fraud decisions for batch anchoring.
+
+Leaves and internal nodes are hashed exactly like FraudProofLedger does
+on-chain, so a proof built here also passes the contract's verifyInclusion:
+  record = keccak256(abi.encodePacked(bytes32 txHash, uint256 score, string version))
+  leaf   = keccak256(record)
+  parent = keccak256(min(a, b) ++ max(a, b))   (sorted pair, no left/right flags)
+An unpaired node at the end of a level is carried up unchanged.
+
+Leaves are hashed twice: a leaf is the hash of 32 bytes and a parent the
+hash of 64, so an internal node can never be passed off as a leaf.
+verifyInclusion takes the record hash and applies the leaf hash itself.
+"""
+
+from typing import List
+from eth_utils import keccak
+from web3 import Web3
+
+
+def record_hash(reference_id: str, fraud_score: int, model_version: str) -> bytes:
+    """Hash of one decision (same payload as logFraud); what verifyInclusion takes."""
+    return Web3.solidity_keccak(
+        ['bytes32', 'uint256', 'string'],
+        [keccak(text=reference_id), int(fraud_score), str(model_version)]
+    )
+
+
+def leaf_from_record(record: bytes) -> bytes:
+    return keccak(record)
+
+
+def fraud_leaf(reference_id: str, fraud_score: int, model_version: str) -> bytes:
+    """Leaf hash of one decision."""
+    return leaf_from_record(record_hash(reference_id, fraud_score, model_version))
+
+
+def hash_pair(a: bytes, b: bytes) -> bytes:
+    return keccak(a + b) if a <= b else keccak(b + a)
+
+
+def build_tree(leaves: List[bytes]) -> List[List[bytes]]:
+    """All levels of the tree, leaves first and the root level last."""
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(levels: List[List[bytes]]) -> bytes:
+    return levels[-1][0]
+
+
+def merkle_proof(levels: List[List[bytes]], index: int) -> List[bytes]:
+    """Sibling hashes from the leaf at index up to the root."""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_record(record: bytes, proof: List[bytes], root: bytes) -> bool:
+    """verify_proof() from a record hash, as the contract's verifyInclusion does."""
+    return verify_proof(leaf_from_record(record), proof, root)
+
+
+def verify_proof(leaf: bytes, proof: List[bytes], root: bytes) -> bool:
+    computed = leaf
+    for sibling in proof:
+        computed = hash_pair(computed, sibling)
+    return computed == root
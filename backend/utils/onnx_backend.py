@@ -0,0 +1,280 @@
+"""
+Optional ONNX export and onnxruntime inference backend.
+
+Each model pickle in model_wts is converted to <name>.onnx next to it
+(LightGBM and XGBoost through onnxmltools, scikit-learn through skl2onnx),
+with a single float32 "input" of the model's feature count and the
+probabilities as a plain tensor. The feature names are stored in the
+model metadata, so the FeatureLayout is compiled from the .onnx file alone.
+
+The converters round float64 split thresholds to float32 and skl2onnx
+drops scikit-learn's learned missing-value directions; convert_model()
+corrects both from the source model, so float32 feature matrices are
+scored as the pickle scores them. An export is only written after a
+parity check against the pickle's predict_proba. With MODEL_BACKEND=onnx
+the loaders serve fresh .onnx files through OnnxModel (CPU execution
+provider, ONNX_INTRA_OP_THREADS threads per inference).
+
+Requires onnxruntime to serve and onnx, skl2onnx and onnxmltools to
+export:
+    pip install onnxruntime onnx skl2onnx onnxmltools
+
+Usage (from the repo root):
+    PYTHONPATH=backend python -m utils.onnx_backend
+    PYTHONPATH=backend python -m utils.onnx_backend --types vehicle --rows 50000
+"""
+
+import copy
+import json
+import os
+import sys
+import time
+import numpy as np
+from utils.tree_compiler import (
+    boundary_rows,
+    compile_model,
+    export_all,
+    export_parser,
+    float32_floor,
+    is_export_fresh,
+    model_feature_names
+)
+
+try:
+    import onnxruntime
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    HAS_ONNXRUNTIME = False
+
+ONNX_SUFFIX = ".onnx"
+INPUT_NAME = "input"
+PROBABILITIES = "probabilities"
+FEATURE_NAMES_KEY = "feature_names"
+ZERO_THRESHOLD_KEY = "zero_threshold"
+TARGET_OPSET = 15
+
+# ONNX tree ensembles accumulate in float32
+DEFAULT_TOLERANCE = 1e-5
+
+
+def onnx_path_for(path: str) -> str:
+    """ONNX export of a model pickle."""
+    return os.path.splitext(path)[0] + ONNX_SUFFIX
+
+
+def is_onnx_fresh(path: str) -> bool:
+    """True when the ONNX copy of a pickle exists and is newer than it."""
+    return is_export_fresh(onnx_path_for(path), path)
+
+
+def _tree_ensembles(onx):
+    """Attributes ({name: AttributeProto}) of each tree-ensemble node in onx."""
+    for node in onx.graph.node:
+        if node.domain == "ai.onnx.ml" and node.op_type.startswith("TreeEnsemble"):
+            attributes = {attribute.name: attribute for attribute in node.attribute}
+            if "nodes_values" in attributes:
+                yield attributes
+
+
+def float32_thresholds(compiled) -> dict:
+    """
+    {(feature, float32 threshold): float32 threshold to use} for the
+    "x <= threshold" splits of a compiled tree ensemble.
+
+    The converters round each float64 threshold to the nearest float32;
+    when that rounds up, a float32 input equal to the rounded value goes
+    left in ONNX but right in the source model. float32_floor() splits
+    every float32 input the same way as the source model. Rounded values
+    shared by thresholds that need different corrections are left out.
+    """
+    internal = np.asarray(compiled.feature) >= 0
+    features = np.asarray(compiled.feature)[internal]
+    threshold = np.asarray(compiled.threshold, dtype=np.float64)[internal]
+    rounded = threshold.astype(np.float32)
+    corrected = float32_floor(threshold)
+
+    corrections, conflicts = {}, set()
+    for feature, value, fixed in set(zip(features.tolist(), rounded.tolist(), corrected.tolist())):
+        if corrections.setdefault((feature, value), fixed) != fixed:
+            conflicts.add((feature, value))
+    for key in conflicts:
+        del corrections[key]
+    return corrections
+
+
+def correct_thresholds(onx, corrections: dict) -> int:
+    """Apply float32_thresholds() to the BRANCH_LEQ nodes of onx. Returns the number of nodes changed."""
+    changed = 0
+    for attributes in _tree_ensembles(onx):
+        feature_ids = attributes["nodes_featureids"].ints
+        values = attributes["nodes_values"].floats
+        for i, mode in enumerate(attributes["nodes_modes"].strings):
+            if mode != b"BRANCH_LEQ":
+                continue
+            key = (feature_ids[i], float(np.float32(values[i])))
+            fixed = corrections.get(key)
+            if fixed is not None and fixed != key[1]:
+                values[i] = fixed
+                changed += 1
+    return changed
+
+
+def route_sklearn_missing(onx, model):
+    """
+    skl2onnx sends NaN right at every split; copy scikit-learn's learned
+    missing_go_to_left (>= 1.3) onto the nodes, which skl2onnx numbers with
+    the estimator index and scikit-learn's own node ids.
+    """
+    if hasattr(model, "tree_"):
+        trees = [model.tree_]
+    elif hasattr(model, "estimators_"):
+        trees = [estimator.tree_ for estimator in np.ravel(model.estimators_)]
+    else:
+        return
+    if getattr(trees[0], "missing_go_to_left", None) is None:
+        return
+    for attributes in _tree_ensembles(onx):
+        if "nodes_missing_value_tracks_true" not in attributes:
+            continue
+        tree_ids = attributes["nodes_treeids"].ints
+        node_ids = attributes["nodes_nodeids"].ints
+        tracks_true = attributes["nodes_missing_value_tracks_true"].ints
+        for i, mode in enumerate(attributes["nodes_modes"].strings):
+            if mode == b"BRANCH_LEQ":
+                tracks_true[i] = int(trees[tree_ids[i]].missing_go_to_left[node_ids[i]])
+
+
+def convert_model(model):
+    """
+    ONNX ModelProto of a fitted binary classifier, with split thresholds
+    and missing-value routing aligned to the source model and the feature
+    names in its metadata.
+    """
+    n_features = model.n_features_in_
+    names = model_feature_names(model, n_features)
+    module = type(model).__module__
+    if module.startswith(("lightgbm", "xgboost")):
+        import onnxmltools
+        from onnxmltools.convert.common.data_types import FloatTensorType
+        initial_types = [(INPUT_NAME, FloatTensorType([None, n_features]))]
+        if module.startswith("lightgbm"):
+            onx = onnxmltools.convert_lightgbm(model, initial_types=initial_types, zipmap=False,
+                                               target_opset=TARGET_OPSET)
+        else:
+            # The XGBoost converter only understands f0, f1, ... feature names
+            model = copy.deepcopy(model)
+            model.get_booster().feature_names = None
+            onx = onnxmltools.convert_xgboost(model, initial_types=initial_types, target_opset=TARGET_OPSET)
+    elif module.startswith("sklearn"):
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+        onx = convert_sklearn(model, initial_types=[(INPUT_NAME, FloatTensorType([None, n_features]))],
+                              options={id(model): {"zipmap": False}}, target_opset=TARGET_OPSET)
+        route_sklearn_missing(onx, model)
+    else:
+        raise NotImplementedError(f"Cannot convert {module}.{type(model).__name__} to ONNX")
+
+    metadata = {FEATURE_NAMES_KEY: json.dumps(names)}
+    try:
+        compiled = compile_model(model)
+    except NotImplementedError:
+        compiled = None
+    if compiled is not None:
+        correct_thresholds(onx, float32_thresholds(compiled))
+        if compiled.zero_threshold:
+            metadata[ZERO_THRESHOLD_KEY] = repr(compiled.zero_threshold)
+    for key, value in metadata.items():
+        meta = onx.metadata_props.add()
+        meta.key = key
+        meta.value = value
+    return onx
+
+
+class OnnxModel:
+    """onnxruntime session with the predict_proba / feature_names_in_ interface of the source model."""
+
+    def __init__(self, source, intra_op_threads: int = 1):
+        """source: path of an .onnx file or the serialized model bytes."""
+        if not HAS_ONNXRUNTIME:
+            raise ImportError("onnxruntime is not installed")
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        # Requests are already spread over threads; one inference at a time per call
+        options.inter_op_num_threads = 1
+        options.log_severity_level = 3
+        self.session = onnxruntime.InferenceSession(source, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        outputs = [output.name for output in self.session.get_outputs()]
+        self.output_name = PROBABILITIES if PROBABILITIES in outputs else outputs[-1]
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if FEATURE_NAMES_KEY in metadata:
+            self.feature_names_in_ = np.array(json.loads(metadata[FEATURE_NAMES_KEY]), dtype=object)
+            self.n_features_in_ = len(self.feature_names_in_)
+        # LightGBM treats |x| <= 1e-35 as 0; the ONNX tree ensemble does not
+        self.zero_threshold = float(metadata.get(ZERO_THRESHOLD_KEY, 0.0))
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if self.zero_threshold:
+            X = np.where(np.abs(X) <= self.zero_threshold, np.float32(0), X)
+        return self.session.run([self.output_name], {self.input_name: X})[0].astype(np.float64)
+
+
+def parity_rows(model, n_rows: int, seed: int = 0) -> np.ndarray:
+    """
+    Validation rows: the tree compiler's threshold-boundary rows when the
+    model is a supported tree ensemble, standard-normal rows otherwise.
+    """
+    try:
+        return boundary_rows(compile_model(model), n_rows, seed=seed)
+    except NotImplementedError:
+        rng = np.random.default_rng(seed)
+        return rng.normal(size=(n_rows, model.n_features_in_)).astype(np.float32)
+
+
+def export_artifact(artifact, rows: int = 20_000, tolerance: float = DEFAULT_TOLERANCE,
+                    seed: int = 0, intra_op_threads: int = 1) -> dict:
+    """Convert one model pickle, check parity and write <name>.onnx next to it."""
+    from utils.load_models import load_model_path
+
+    model = load_model_path(artifact.path, mmap=False, backend="pickle")
+    start = time.perf_counter()
+    serialized = convert_model(model).SerializeToString()
+    convert_seconds = time.perf_counter() - start
+
+    onnx_model = OnnxModel(serialized, intra_op_threads=intra_op_threads)
+    X = parity_rows(model, rows, seed=seed)
+    expected = model.predict_proba(X)[:, 1]
+    actual = onnx_model.predict_proba(X)[:, 1]
+    max_diff = float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+
+    result = {
+        "transaction_type": artifact.transaction_type,
+        "version": artifact.version,
+        "source": f"{type(model).__module__}.{type(model).__name__}",
+        "convert_seconds": round(convert_seconds, 4),
+        "bytes": len(serialized),
+        "max_abs_diff": max_diff,
+        "validated": max_diff <= tolerance
+    }
+    if result["validated"]:
+        path = onnx_path_for(artifact.path)
+        # Renamed into place so a watcher or worker never reads half a file
+        with open(path + ".tmp", "wb") as f:
+            f.write(serialized)
+        os.replace(path + ".tmp", path)
+        result["path"] = path
+    return result
+
+
+def main(argv=None):
+    args = export_parser(__doc__, "export", DEFAULT_TOLERANCE).parse_args(argv)
+    if not HAS_ONNXRUNTIME:
+        print("onnxruntime is not installed (pip install onnxruntime onnx skl2onnx onnxmltools)")
+        return 1
+    return export_all(args, export_artifact, lambda result: f"{result['bytes'] / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
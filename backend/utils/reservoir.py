@@ -0,0 +1,207 @@
+"""
+Out-of-core sampling of large source datasets.
+
+Reads a CSV in chunks and keeps, in bounded memory:
+- a uniform random sample (reservoir) of at most `per_class` rows per label
+- running per-column statistics over every row of the file
+
+so the data generator can draw from multi-GB files without loading them.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Rows read per chunk
+DEFAULT_CHUNKSIZE = 100_000
+
+# Distinct values tracked per categorical column before it is marked overflowed
+MAX_CATEGORIES = 1000
+
+
+class ReservoirSampler:
+    """
+    Algorithm R over a stream of DataFrame chunks.
+
+    After n rows every row has been kept with probability capacity / n,
+    wherever it appears in the file. A chunk is processed with one vector of
+    slot draws instead of one random number per Python iteration.
+    """
+
+    def __init__(self, capacity: int, rng: np.random.Generator):
+        self.capacity = capacity
+        self.rng = rng
+        self.seen = 0
+        self.sample = None
+
+    def add(self, chunk: pd.DataFrame):
+        if len(chunk) == 0 or self.capacity <= 0:
+            return
+        chunk = chunk.reset_index(drop=True)
+        kept = 0 if self.sample is None else len(self.sample)
+
+        # Fill phase: the first `capacity` rows are kept as-is
+        fill = min(self.capacity - kept, len(chunk))
+        if fill > 0:
+            head = chunk.iloc[:fill]
+            self.sample = head.copy() if self.sample is None else pd.concat([self.sample, head], ignore_index=True)
+            self.seen += fill
+            chunk = chunk.iloc[fill:].reset_index(drop=True)
+            if len(chunk) == 0:
+                return
+
+        # Replacement phase: row number i (0-based) goes to slot randint(0, i] if < capacity
+        positions = self.seen + np.arange(len(chunk))
+        slots = self.rng.integers(0, positions + 1)
+        accepted = np.flatnonzero(slots < self.capacity)
+        self.seen += len(chunk)
+        if len(accepted) == 0:
+            return
+
+        # When several rows land in one slot, the latest one wins (as in the sequential algorithm)
+        reversed_slots = slots[accepted][::-1]
+        unique_slots, first = np.unique(reversed_slots, return_index=True)
+        winners = accepted[::-1][first]
+
+        source = np.arange(len(self.sample))
+        source[unique_slots] = len(self.sample) + np.arange(len(winners))
+        combined = pd.concat([self.sample, chunk.iloc[winners]], ignore_index=True)
+        self.sample = combined.iloc[source].reset_index(drop=True)
+
+
+class RunningStats:
+    """
+    Per-column statistics merged chunk by chunk.
+
+    Numeric columns keep count / mean / variance (Chan et al. parallel
+    update) / min / max. Categorical columns keep value counts for up to
+    max_categories distinct values.
+    """
+
+    def __init__(self, max_categories: int = MAX_CATEGORIES):
+        self.max_categories = max_categories
+        self.rows = 0
+        self.numeric = {}
+        self.categories = {}
+        self.overflowed = set()
+
+    def update(self, chunk: pd.DataFrame):
+        self.rows += len(chunk)
+        for col in chunk.select_dtypes(include=[np.number]).columns:
+            self._update_numeric(col, chunk[col].to_numpy(dtype=np.float64))
+        for col in chunk.select_dtypes(include=['object', 'string', 'category']).columns:
+            self._update_categorical(col, chunk[col])
+
+    def _update_numeric(self, col, values):
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        n_b, mean_b = len(values), values.mean()
+        m2_b = ((values - mean_b) ** 2).sum()
+        stats = self.numeric.get(col)
+        if stats is None:
+            self.numeric[col] = {"count": n_b, "mean": mean_b, "m2": m2_b,
+                                 "min": values.min(), "max": values.max()}
+            return
+        n_a = stats["count"]
+        n = n_a + n_b
+        delta = mean_b - stats["mean"]
+        stats["mean"] += delta * n_b / n
+        stats["m2"] += m2_b + delta ** 2 * n_a * n_b / n
+        stats["count"] = n
+        stats["min"] = min(stats["min"], values.min())
+        stats["max"] = max(stats["max"], values.max())
+
+    def _update_categorical(self, col, series):
+        counts = self.categories.setdefault(col, {})
+        for value, count in series.value_counts(dropna=True).items():
+            if value in counts:
+                counts[value] += int(count)
+            elif len(counts) < self.max_categories:
+                counts[value] = int(count)
+            else:
+                self.overflowed.add(col)
+
+    def summary(self, col) -> dict:
+        """mean / std / min / max / count of a numeric column."""
+        stats = self.numeric[col]
+        return {
+            "count": stats["count"],
+            "mean": stats["mean"],
+            "std": np.sqrt(stats["m2"] / (stats["count"] - 1)) if stats["count"] > 1 else 0.0,
+            "min": stats["min"],
+            "max": stats["max"]
+        }
+
+    def category_values(self, col) -> np.ndarray:
+        """Distinct values seen in a categorical column, most frequent first."""
+        counts = self.categories.get(col, {})
+        return np.array(sorted(counts, key=counts.get, reverse=True), dtype=object)
+
+
+class SourceSample:
+    """Result of sample_source: the reservoir rows plus whole-file statistics."""
+
+    def __init__(self, frame: pd.DataFrame, stats: RunningStats, class_counts: dict):
+        self.frame = frame
+        self.stats = stats
+        self.class_counts = class_counts
+
+
+def infer_dtypes(path: str, sep: str = ',', sample_rows: int = 10_000) -> dict:
+    """
+    Explicit read dtypes from the head of the file: numeric columns as
+    float64 (so a missing value later on cannot change the type of a chunk)
+    and text columns as category.
+    """
+    head = pd.read_csv(path, sep=sep, nrows=sample_rows)
+    return {
+        col: 'float64' if pd.api.types.is_numeric_dtype(head[col]) else 'category'
+        for col in head.columns
+    }
+
+
+def sample_source(path: str, label_col=None, per_class: int = 25_000, sep: str = ',',
+                  dtype: dict = None, chunksize: int = DEFAULT_CHUNKSIZE,
+                  seed=None, max_categories: int = MAX_CATEGORIES) -> SourceSample:
+    """
+    Stream a CSV once and keep up to per_class uniformly sampled rows per
+    label value (a single reservoir when label_col is None).
+
+    Memory is bounded by one chunk plus the reservoirs, regardless of file size.
+    Category columns come back with the categories seen across the whole file
+    (or as plain values if the column overflowed max_categories).
+    """
+    rng = np.random.default_rng(seed)
+    dtype = infer_dtypes(path, sep=sep) if dtype is None else dtype
+    stats = RunningStats(max_categories=max_categories)
+    reservoirs = {}
+    class_counts = {}
+
+    for chunk in pd.read_csv(path, sep=sep, dtype=dtype, chunksize=chunksize):
+        stats.update(chunk)
+        if label_col is None:
+            groups = {None: chunk}
+        else:
+            labels = pd.to_numeric(chunk[label_col].astype(object), errors='coerce')
+            groups = {label: chunk[(labels == label).to_numpy()] for label in labels.dropna().unique()}
+        for label, rows in groups.items():
+            if label is not None:
+                label = int(label) if float(label).is_integer() else label
+            class_counts[label] = class_counts.get(label, 0) + len(rows)
+            reservoir = reservoirs.get(label)
+            if reservoir is None:
+                reservoir = reservoirs[label] = ReservoirSampler(per_class, rng)
+            reservoir.add(rows)
+
+    samples = [r.sample for _, r in sorted(reservoirs.items(), key=lambda item: str(item[0])) if r.sample is not None]
+    frame = pd.concat(samples, ignore_index=True) if samples else pd.DataFrame(columns=list(dtype))
+
+    # Chunks disagree on categories, so restore one dtype per column from the full-file counts
+    for col, kind in dtype.items():
+        if kind == 'category' and col in frame.columns:
+            if col in stats.overflowed:
+                frame[col] = frame[col].astype(object)
+            else:
+                frame[col] = pd.Categorical(frame[col].astype(object), categories=list(stats.categories.get(col, {})))
+
+    return SourceSample(frame, stats, class_counts)
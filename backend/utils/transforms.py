@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder
 
 def categorize_age(age):
     if age <= 20: return 0
@@ -16,20 +15,41 @@ def encode_cyclical(df, col, max_val):
 # ==========================================
 # 1. VEHICLE TRANSFORM (Smart Mapping)
 # ==========================================
+VEHICLE_BINARY_MAPPINGS = {
+    'AccidentArea': {'Rural': 0, 'Urban': 1},
+    'Sex': {'Female': 0, 'Male': 1},
+    'Fault': {'Policy Holder': 0, 'Third Party': 1},
+    'PoliceReportFiled': {'No': 0, 'Yes': 1},
+    'WitnessPresent': {'No': 0, 'Yes': 1},
+    'AgentType': {'External': 0, 'Internal': 1}
+}
+
+VEHICLE_ORDINAL_MAPPINGS = {
+    'VehiclePrice': {
+        'more than 69000': 1, '20000 to 29000': 0, '30000 to 39000': 0, 
+        'less than 20000': 1, '40000 to 59000': 1, '60000 to 69000': 0
+    },
+    'AgeOfVehicle': {
+        'new': 2, '2 years': 0, '3 years': 2, '4 years': 2, 
+        '5 years': 1, '6 years': 1, '7 years': 0, 'more than 7': 0
+    },
+    'BasePolicy': {'Liability': 0, 'Collision': 1, 'All Perils': 2}
+}
+
+VEHICLE_DROP_COLS = ['Month', 'WeekOfMonth', 'DayOfWeek', 'DayOfWeekClaimed', 'WeekOfMonthClaimed', 'PolicyNumber']
+
+VEHICLE_ONEHOT_COLS = ['Make', 'MonthClaimed', 'MaritalStatus', 'PolicyType', 'VehicleCategory', 'RepNumber', 'Deductible', 'Days_Policy_Accident', 'Days_Policy_Claim', 'PastNumberOfClaims', 'AgeOfPolicyHolder', 'NumberOfSuppliments', 'AddressChange_Claim', 'NumberOfCars', 'Year']
+
+
+def clean_vehicle_age(x):
+    return 40 if x == 0 or x > 74 else x
+
+
 def transform_vehicle_fraud_data(raw_data, selected_features=None):
     df = raw_data.copy()
     
     # FIX: Check if columns are already numeric (from test_data) before mapping
-    binary_mappings = {
-        'AccidentArea': {'Rural': 0, 'Urban': 1},
-        'Sex': {'Female': 0, 'Male': 1},
-        'Fault': {'Policy Holder': 0, 'Third Party': 1},
-        'PoliceReportFiled': {'No': 0, 'Yes': 1},
-        'WitnessPresent': {'No': 0, 'Yes': 1},
-        'AgentType': {'External': 0, 'Internal': 1}
-    }
-    
-    for col, mapping in binary_mappings.items():
+    for col, mapping in VEHICLE_BINARY_MAPPINGS.items():
         if col in df.columns:
             # Only apply map if data is NOT numeric (i.e., it's a string like "Urban")
             if not pd.api.types.is_numeric_dtype(df[col]):
@@ -37,48 +57,41 @@ def transform_vehicle_fraud_data(raw_data, selected_features=None):
 
     # Ordered Categorical Mappings
     # Same logic: only map if it's a string
-    if 'VehiclePrice' in df.columns and not pd.api.types.is_numeric_dtype(df['VehiclePrice']):
-        df['VehiclePrice'] = df['VehiclePrice'].map({
-            'more than 69000': 1, '20000 to 29000': 0, '30000 to 39000': 0, 
-            'less than 20000': 1, '40000 to 59000': 1, '60000 to 69000': 0
-        }).fillna(0)
-    
-    if 'AgeOfVehicle' in df.columns and not pd.api.types.is_numeric_dtype(df['AgeOfVehicle']):
-        df['AgeOfVehicle'] = df['AgeOfVehicle'].map({
-            'new': 2, '2 years': 0, '3 years': 2, '4 years': 2, 
-            '5 years': 1, '6 years': 1, '7 years': 0, 'more than 7': 0
-        }).fillna(0)
-
-    if 'BasePolicy' in df.columns and not pd.api.types.is_numeric_dtype(df['BasePolicy']):
-        df['BasePolicy'] = df['BasePolicy'].map({'Liability': 0, 'Collision': 1, 'All Perils': 2}).fillna(0)
+    for col, mapping in VEHICLE_ORDINAL_MAPPINGS.items():
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].map(mapping).fillna(0)
 
     # Drop Useless Columns
-    drop_cols = ['Month', 'WeekOfMonth', 'DayOfWeek', 'DayOfWeekClaimed', 'WeekOfMonthClaimed', 'PolicyNumber']
-    df = df.drop(columns=[c for c in drop_cols if c in df.columns])
+    df = df.drop(columns=[c for c in VEHICLE_DROP_COLS if c in df.columns])
 
     # One-Hot Encoding
-    onehot_cols = ['Make', 'MonthClaimed', 'MaritalStatus', 'PolicyType', 'VehicleCategory', 'RepNumber', 'Deductible', 'Days_Policy_Accident', 'Days_Policy_Claim', 'PastNumberOfClaims', 'AgeOfPolicyHolder', 'NumberOfSuppliments', 'AddressChange_Claim', 'NumberOfCars', 'Year']
-    existing_cols = [c for c in onehot_cols if c in df.columns]
+    existing_cols = [c for c in VEHICLE_ONEHOT_COLS if c in df.columns]
     if existing_cols:
         df = pd.get_dummies(df, columns=existing_cols, drop_first=False)
 
     # Age Cleanup
     if 'Age' in df.columns:
-        df['Age'] = df['Age'].apply(lambda x: 40 if x == 0 or x > 74 else x)
+        df['Age'] = df['Age'].apply(clean_vehicle_age)
         df['Age'] = df['Age'].apply(categorize_age)
 
     # Feature Selection
     if selected_features is not None:
-        missing = list(set(selected_features) - set(df.columns))
-        if missing:
-            df[missing] = 0
-        df = df[selected_features]
+        df = df.reindex(columns=selected_features, fill_value=0)
         
     return df
 
 # ==========================================
 # 2. E-COMMERCE TRANSFORM
 # ==========================================
+ECOMMERCE_DROP_COLS = ['Transaction ID', 'Customer Location', 'Shipping Address', 'Billing Address']
+
+ECOMMERCE_ONEHOT_COLS = ['Payment Method', 'Product Category', 'Device Used']
+
+ECOMMERCE_CYCLICAL_UNITS = [('Month', 12), ('Day', 31), ('Hour', 24), ('DayOfWeek', 7)]
+
+ECOMMERCE_FINAL_DROP = ['Transaction Date', 'Transaction Hour', 'IP Address', 'Customer ID', 'Account Age Days']
+
+
 def transform_ecommerce_fraud_data(raw_data, selected_features=None):
     df = raw_data.copy()
     
@@ -88,10 +101,9 @@ def transform_ecommerce_fraud_data(raw_data, selected_features=None):
     if 'Shipping Address' in df.columns and 'Billing Address' in df.columns:
         df['Address Match'] = (df['Shipping Address'] == df['Billing Address']).astype(int)
     
-    drop_cols = ['Transaction ID', 'Customer Location', 'Shipping Address', 'Billing Address']
-    df = df.drop(columns=[c for c in drop_cols if c in df.columns])
+    df = df.drop(columns=[c for c in ECOMMERCE_DROP_COLS if c in df.columns])
     
-    cols_to_encode = [c for c in ['Payment Method', 'Product Category', 'Device Used'] if c in df.columns]
+    cols_to_encode = [c for c in ECOMMERCE_ONEHOT_COLS if c in df.columns]
     if cols_to_encode:
         df = pd.get_dummies(df, columns=cols_to_encode, drop_first=False)
     
@@ -110,18 +122,14 @@ def transform_ecommerce_fraud_data(raw_data, selected_features=None):
     
     if 'Transaction Date' in df.columns:
         df['Transaction Date'] = pd.to_datetime(df['Transaction Date'])
-        for unit, max_val in [('Month', 12), ('Day', 31), ('Hour', 24), ('DayOfWeek', 7)]:
-            val = getattr(df['Transaction Date'].dt, unit.lower())
+        for unit, max_val in ECOMMERCE_CYCLICAL_UNITS:
+            df[unit] = getattr(df['Transaction Date'].dt, unit.lower())
             df = encode_cyclical(df, unit, max_val)
     
-    final_drop = ['Transaction Date', 'Transaction Hour', 'IP Address', 'Customer ID', 'Account Age Days']
-    df = df.drop(columns=[c for c in final_drop if c in df.columns], axis=1)
+    df = df.drop(columns=[c for c in ECOMMERCE_FINAL_DROP if c in df.columns])
     
     if selected_features is not None:
-        missing = list(set(selected_features) - set(df.columns))
-        if missing:
-            df[missing] = 0
-        df = df[selected_features]
+        df = df.reindex(columns=selected_features, fill_value=0)
     
     return df
 
@@ -137,16 +145,17 @@ def transform_bank_fraud_data(raw_data, selected_features=None):
         df[col] = df[col].astype('category').cat.codes
 
     if selected_features is not None:
-        missing = list(set(selected_features) - set(df.columns))
-        if missing:
-            df[missing] = 0
-        df = df[selected_features]
+        df = df.reindex(columns=selected_features, fill_value=0)
         
     return df
 
 # ==========================================
 # 4. ETHEREUM TRANSFORM
 # ==========================================
+ETHEREUM_DROP_COLS = ['confirmations', 'variance_value_received', 'total_tx_sent_malicious', 
+                      'total_tx_sent_unique', 'blockNumber', 'Month', 'Hour', 'Day', 'Fraud', 'ratio_malicious_sent']
+
+
 def transform_ethereum_fraud_data(raw_data, selected_features=None):
     df = raw_data.copy()
     epsilon = 1e-6
@@ -161,14 +170,9 @@ def transform_ethereum_fraud_data(raw_data, selected_features=None):
     if 'Hour' in df.columns: df = encode_cyclical(df, 'Hour', 24)
     if 'Day' in df.columns: df = encode_cyclical(df, 'Day', 31)
     
-    drop_cols = ['confirmations', 'variance_value_received', 'total_tx_sent_malicious', 
-                 'total_tx_sent_unique', 'blockNumber', 'Month', 'Hour', 'Day', 'Fraud', 'ratio_malicious_sent']
-    df = df.drop(columns=[c for c in drop_cols if c in df.columns])
+    df = df.drop(columns=[c for c in ETHEREUM_DROP_COLS if c in df.columns])
     
     if selected_features is not None:
-        missing = list(set(selected_features) - set(df.columns))
-        if missing:
-            df[missing] = 0
-        df = df[selected_features]
+        df = df.reindex(columns=selected_features, fill_value=0)
     
     return df
\ No newline at end of file
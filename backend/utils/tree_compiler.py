@@ -0,0 +1,597 @@
+"""
+Compile tree-ensemble classifiers to flat NumPy arrays.
+
+LightGBM, XGBoost and scikit-learn tree ensembles (decision tree, random
+forest, extra trees, gradient boosting) are flattened into one set of node
+arrays covering every tree:
+
+    feature      int32    split feature index, -1 for a leaf
+    threshold    float64  go left when x <= threshold
+    left, right  int32    absolute child indices
+    default_left bool     direction for missing values
+    missing      uint8    MISSING_NAN / MISSING_ZERO / MISSING_NONE (LightGBM)
+    value        float64  leaf output, already scaled by the learning rate
+    roots        int32    root node of each tree
+
+CompiledEnsemble evaluates all trees of a row block at once: each step
+moves every (row, tree) pair one level down. Leaves point to themselves,
+and pairs that reached a leaf are dropped every few steps, so the work
+follows the real path lengths rather than the deepest tree.
+It exposes predict_proba / feature_names_in_ like the original model, so
+it plugs into ModelRegistry and FeatureLayout unchanged.
+
+A compiled model is saved as a directory of .npy files plus meta.json next
+to its pickle (<name>.trees/) and loaded with mmap_mode='r'. Loading it
+imports NumPy only: serving workers never import lightgbm, xgboost or
+scikit-learn.
+
+Usage (from the repo root):
+    PYTHONPATH=backend python -m utils.tree_compiler
+    PYTHONPATH=backend python -m utils.tree_compiler --types vehicle --rows 50000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+
+# How a split treats a missing (NaN) feature value
+MISSING_NAN = 0    # NaN goes to the default child, other values are compared
+MISSING_ZERO = 1   # NaN is read as 0, and 0 goes to the default child (LightGBM "Zero")
+MISSING_NONE = 2   # NaN is read as 0 and compared (LightGBM "None")
+
+# LightGBM reads any |x| <= kZeroThreshold as exactly zero
+ZERO_THRESHOLD = 1e-35
+
+OUTPUT_LOGISTIC = "logistic"   # p = sigmoid(base_score + sum of leaves)
+OUTPUT_MEAN = "mean"           # p = mean of leaves (forests of probability trees)
+
+NODE_ARRAYS = ("feature", "threshold", "left", "right", "default_left", "missing", "value", "roots")
+
+COMPILED_SUFFIX = ".trees"
+
+# Rows evaluated per block; keeps the (rows x trees) working arrays in cache
+BLOCK_ROWS = 256
+
+
+class CompiledEnsemble:
+    """Flat-array tree ensemble with a vectorized predict_proba."""
+
+    def __init__(self, arrays: dict, base_score: float, output: str, feature_names, source: str = None,
+                 zero_threshold: float = 0.0):
+        for name in NODE_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.base_score = float(base_score)
+        self.output = output
+        self.zero_threshold = float(zero_threshold)
+        self.feature_names_in_ = np.array(list(feature_names), dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        self.source = source
+        self.max_depth = tree_depth(self.feature, self.left, self.right, self.roots)
+        # Zero-as-missing splits need the default-direction check even without NaNs
+        self._zero_splits = bool(np.any(np.asarray(self.missing) == MISSING_ZERO))
+        self._compile_paths()
+    
+    def _compile_paths(self):
+        """Evaluation-only arrays derived from the stored node arrays."""
+        feature = np.asarray(self.feature)
+        leaf = feature < 0
+        index = np.arange(len(feature), dtype=np.intp)
+        # Leaves loop back to themselves, so finished pairs can keep stepping
+        self._split_feature = np.where(leaf, 0, feature).astype(np.intp)
+        self._children = np.empty(2 * len(feature), dtype=np.intp)
+        self._children[0::2] = np.where(leaf, index, self.left)
+        self._children[1::2] = np.where(leaf, index, self.right)
+        threshold = np.asarray(self.threshold, dtype=np.float64)
+        self._threshold = {np.dtype(np.float32): float32_floor(threshold), np.dtype(np.float64): threshold}
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def decision_function(self, X) -> np.ndarray:
+        """Raw ensemble output per row (margin for boosting, mean probability for forests)."""
+        X = np.asarray(X)
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), BLOCK_ROWS):
+            out[start:start + BLOCK_ROWS] = self._leaf_sum(X[start:start + BLOCK_ROWS])
+        if self.output == OUTPUT_MEAN:
+            return out / self.n_trees
+        return out + self.base_score
+
+    def predict_proba(self, X) -> np.ndarray:
+        raw = self.decision_function(X)
+        p = 1.0 / (1.0 + np.exp(-raw)) if self.output == OUTPUT_LOGISTIC else raw
+        return np.column_stack([1.0 - p, p])
+
+    def _leaf_sum(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X)
+        if X.dtype not in (np.float32, np.float64):
+            X = X.astype(np.float64)
+        if self.zero_threshold:
+            X = np.where(np.abs(X) <= self.zero_threshold, X.dtype.type(0), X)
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        thresholds = self._threshold[X.dtype]
+        # Position r * n_trees + t holds the current node of tree t for row r
+        nodes = np.tile(np.asarray(self.roots, dtype=np.intp), n_rows)
+        offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, self.n_trees)
+        check_missing = self._zero_splits or bool(np.isnan(flat).any())
+
+        active = None  # None: every pair
+        for step in range(self.max_depth):
+            node = nodes if active is None else nodes[active]
+            x = flat[(offsets if active is None else offsets[active]) + self._split_feature[node]]
+            if check_missing:
+                go_right = ~self._go_left(x, node, thresholds)
+            else:
+                go_right = x > thresholds[node]
+            node = self._children[2 * node + go_right]
+            if active is None:
+                nodes = node
+            else:
+                nodes[active] = node
+            # Dropping finished pairs costs a pass of its own; do it every other level
+            if step % 2 == 1 and step + 1 < self.max_depth:
+                internal = self.feature[node] >= 0
+                active = np.flatnonzero(internal) if active is None else active[internal]
+                if len(active) == 0:
+                    break
+        return self.value[nodes].reshape(n_rows, self.n_trees).sum(axis=1)
+    
+    def _go_left(self, x, node, thresholds) -> np.ndarray:
+        """Split decisions with missing-value routing."""
+        go_left = x <= thresholds[node]
+        missing = self.missing[node]
+        nan = np.isnan(x)
+        # LightGBM "None": NaN is compared as 0
+        go_left |= nan & (missing == MISSING_NONE) & (self.threshold[node] >= 0.0)
+        use_default = np.where(missing == MISSING_NAN, nan,
+                               (missing == MISSING_ZERO) & (nan | (x == 0)))
+        return np.where(use_default, self.default_left[node], go_left)
+
+
+def float32_floor(threshold) -> np.ndarray:
+    """
+    Largest float32 not above each float64 threshold: for float32 inputs
+    x <= t exactly when x <= float32_floor(t), whereas plain rounding to
+    float32 can round up and flip ties.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    floor = threshold.astype(np.float32)
+    too_high = floor.astype(np.float64) > threshold
+    floor[too_high] = np.nextafter(floor[too_high], np.float32(-np.inf))
+    return floor
+
+
+def tree_depth(feature, left, right, roots) -> int:
+    """Deepest root-to-leaf path over all trees (number of splits)."""
+    depth = 0
+    frontier = np.asarray(roots)
+    while len(frontier):
+        frontier = frontier[feature[frontier] >= 0]
+        if len(frontier) == 0:
+            break
+        depth += 1
+        frontier = np.concatenate([left[frontier], right[frontier]])
+    return depth
+
+
+class _Builder:
+    """Accumulates nodes of successive trees into flat lists."""
+
+    def __init__(self):
+        self.columns = {name: [] for name in NODE_ARRAYS if name != "roots"}
+        self.roots = []
+
+    def add_tree(self, feature, threshold, left, right, default_left, missing, value):
+        """Add one tree given per-node lists with tree-local child indices (-1 for none)."""
+        offset = len(self.columns["feature"])
+        self.roots.append(offset)
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        self.columns["feature"].extend(feature)
+        self.columns["threshold"].extend(threshold)
+        self.columns["left"].extend(np.where(left >= 0, left + offset, -1))
+        self.columns["right"].extend(np.where(right >= 0, right + offset, -1))
+        self.columns["default_left"].extend(default_left)
+        self.columns["missing"].extend(missing)
+        self.columns["value"].extend(value)
+
+    def arrays(self) -> dict:
+        return {
+            "feature": np.asarray(self.columns["feature"], dtype=np.int32),
+            "threshold": np.asarray(self.columns["threshold"], dtype=np.float64),
+            "left": np.asarray(self.columns["left"], dtype=np.int32),
+            "right": np.asarray(self.columns["right"], dtype=np.int32),
+            "default_left": np.asarray(self.columns["default_left"], dtype=bool),
+            "missing": np.asarray(self.columns["missing"], dtype=np.uint8),
+            "value": np.asarray(self.columns["value"], dtype=np.float64),
+            "roots": np.asarray(self.roots, dtype=np.int32)
+        }
+
+
+def model_feature_names(model, n_features):
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        return [f"f{i}" for i in range(n_features)]
+    return [str(name) for name in names]
+
+
+# ==========================================
+# LIGHTGBM
+# ==========================================
+LIGHTGBM_MISSING = {"NaN": MISSING_NAN, "Zero": MISSING_ZERO, "None": MISSING_NONE}
+
+
+def compile_lightgbm(model) -> CompiledEnsemble:
+    booster = getattr(model, "booster_", model)
+    # Dumps best_iteration when set, the same trees predict_proba uses
+    dump = booster.dump_model()
+    if dump.get("num_class", 1) != 1:
+        raise NotImplementedError("Only binary LightGBM models can be compiled")
+    objective = dump.get("objective", "")
+    if not objective.startswith(("binary", "cross_entropy")):
+        raise NotImplementedError(f"Unsupported LightGBM objective: {objective}")
+    sigmoid = 1.0
+    for token in objective.split():
+        if token.startswith("sigmoid:"):
+            sigmoid = float(token.split(":", 1)[1])
+
+    builder = _Builder()
+    for tree in dump["tree_info"]:
+        nodes = {"feature": [], "threshold": [], "left": [], "right": [],
+                 "default_left": [], "missing": [], "value": []}
+
+        def visit(node):
+            index = len(nodes["feature"])
+            for column in nodes.values():
+                column.append(None)
+            if "leaf_value" in node:
+                values = (-1, 0.0, -1, -1, False, MISSING_NAN, node["leaf_value"])
+            else:
+                if node["decision_type"] != "<=":
+                    raise NotImplementedError("Categorical LightGBM splits are not supported")
+                left = visit(node["left_child"])
+                right = visit(node["right_child"])
+                values = (node["split_feature"], node["threshold"], left, right,
+                          node["default_left"], LIGHTGBM_MISSING[node["missing_type"]], 0.0)
+            for name, value in zip(nodes, values):
+                nodes[name][index] = value
+            return index
+
+        visit(tree["tree_structure"])
+        builder.add_tree(**nodes)
+
+    arrays = builder.arrays()
+    # sigmoid(sigmoid_param * raw): fold the scale into the leaves
+    arrays["value"] *= sigmoid
+    output = OUTPUT_MEAN if dump.get("average_output") else OUTPUT_LOGISTIC
+    if output == OUTPUT_MEAN:
+        raise NotImplementedError("LightGBM random-forest mode is not supported")
+    return CompiledEnsemble(arrays, 0.0, output, dump["feature_names"], zero_threshold=ZERO_THRESHOLD)
+
+
+# ==========================================
+# XGBOOST
+# ==========================================
+def _xgb_float(value) -> float:
+    """Parse XGBoost's config numbers, which may be written as '[5E-1]'."""
+    if isinstance(value, str):
+        value = value.strip("[]").split(",")[0]
+    return float(value)
+
+
+def compile_xgboost(model) -> CompiledEnsemble:
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise NotImplementedError(f"Unsupported XGBoost objective: {objective}")
+    gbm = learner["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise NotImplementedError(f"Unsupported XGBoost booster: {gbm['name']}")
+
+    trees = gbm["model"]["trees"]
+    # predict_proba stops at best_iteration when early stopping was used
+    best_iteration = booster.attributes().get("best_iteration")
+    if best_iteration is not None:
+        per_round = int(gbm["model"]["gbtree_model_param"].get("num_parallel_tree", 1))
+        trees = trees[:(int(best_iteration) + 1) * per_round]
+
+    builder = _Builder()
+    for tree in trees:
+        if any(tree["split_type"]):
+            raise NotImplementedError("Categorical XGBoost splits are not supported")
+        left = np.asarray(tree["left_children"])
+        leaf = left == -1
+        # XGBoost splits are `x < t` in float32; every float32 x satisfies
+        # x < t exactly when x <= the float32 just below t
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        thresholds = np.nextafter(conditions, np.float32(-np.inf)).astype(np.float64)
+        builder.add_tree(
+            feature=np.where(leaf, -1, tree["split_indices"]),
+            threshold=np.where(leaf, 0.0, thresholds),
+            left=left,
+            right=tree["right_children"],
+            default_left=np.asarray(tree["default_left"], dtype=bool),
+            missing=np.full(len(left), MISSING_NAN),
+            # Leaf outputs are stored in split_conditions
+            value=np.where(leaf, conditions.astype(np.float64), 0.0)
+        )
+
+    base_probability = _xgb_float(learner["learner_model_param"]["base_score"])
+    base_margin = float(np.log(base_probability / (1.0 - base_probability)))
+    n_features = int(learner["learner_model_param"]["num_feature"])
+    return CompiledEnsemble(builder.arrays(), base_margin, OUTPUT_LOGISTIC,
+                            model_feature_names(model, n_features))
+
+
+# ==========================================
+# SCIKIT-LEARN
+# ==========================================
+def _sklearn_tree(builder, tree, value, scale=1.0):
+    leaf = tree.children_left == -1
+    missing_left = getattr(tree, "missing_go_to_left", None)
+    builder.add_tree(
+        feature=np.where(leaf, -1, tree.feature),
+        threshold=np.where(leaf, 0.0, tree.threshold),
+        left=tree.children_left,
+        right=tree.children_right,
+        # Before NaN support (< 1.3) a NaN fails `x <= t` and goes right
+        default_left=np.zeros(len(leaf), dtype=bool) if missing_left is None else missing_left.astype(bool),
+        missing=np.full(len(leaf), MISSING_NAN),
+        value=np.where(leaf, value * scale, 0.0)
+    )
+
+
+def compile_sklearn(model) -> CompiledEnsemble:
+    classes = getattr(model, "classes_", None)
+    if classes is None or len(classes) != 2:
+        raise NotImplementedError("Only binary scikit-learn classifiers can be compiled")
+    builder = _Builder()
+    names = model_feature_names(model, model.n_features_in_)
+
+    if hasattr(model, "tree_"):
+        estimators = [model]
+    elif hasattr(model, "estimators_") and hasattr(model, "loss"):
+        # Gradient boosting: one regression tree per stage, margin output
+        if model.estimators_.shape[1] != 1:
+            raise NotImplementedError("Only binary gradient boosting can be compiled")
+        for stage in model.estimators_[:, 0]:
+            _sklearn_tree(builder, stage.tree_, stage.tree_.value[:, 0, 0], model.learning_rate)
+        # Constant init prediction (the class prior log-odds by default)
+        base = float(model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0, 0])
+        return CompiledEnsemble(builder.arrays(), base, OUTPUT_LOGISTIC, names)
+    elif hasattr(model, "estimators_"):
+        estimators = list(model.estimators_)
+    else:
+        raise NotImplementedError(f"Unsupported scikit-learn model: {type(model).__name__}")
+
+    # Trees and forests average the leaf class frequencies
+    for estimator in estimators:
+        counts = estimator.tree_.value[:, 0, :]
+        totals = counts.sum(axis=1)
+        _sklearn_tree(builder, estimator.tree_, counts[:, 1] / np.where(totals > 0, totals, 1.0))
+    return CompiledEnsemble(builder.arrays(), 0.0, OUTPUT_MEAN, names)
+
+
+def compile_model(model) -> CompiledEnsemble:
+    """Compile a fitted tree-ensemble classifier; NotImplementedError if unsupported."""
+    module = type(model).__module__
+    if module.startswith("lightgbm"):
+        compiled = compile_lightgbm(model)
+    elif module.startswith("xgboost"):
+        compiled = compile_xgboost(model)
+    elif module.startswith("sklearn"):
+        compiled = compile_sklearn(model)
+    else:
+        raise NotImplementedError(f"Cannot compile {module}.{type(model).__name__}")
+    compiled.source = f"{module}.{type(model).__name__}"
+    return compiled
+
+
+# ==========================================
+# SAVE / LOAD
+# ==========================================
+def compiled_path_for(path: str) -> str:
+    """Directory holding the compiled arrays of a model pickle."""
+    return os.path.splitext(path)[0] + COMPILED_SUFFIX
+
+
+def save_compiled(compiled: CompiledEnsemble, directory: str):
+    """
+    Write the arrays to a fresh temporary directory and rename it into
+    place. Files of an existing export are never rewritten, so processes
+    that have them memory-mapped keep reading the old, complete arrays.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=os.path.basename(directory) + ".", suffix=".tmp", dir=parent)
+    for name in NODE_ARRAYS:
+        np.save(os.path.join(staging, f"{name}.npy"), getattr(compiled, name))
+    meta = {
+        "base_score": compiled.base_score,
+        "output": compiled.output,
+        "feature_names": [str(name) for name in compiled.feature_names_in_],
+        "source": compiled.source,
+        "zero_threshold": compiled.zero_threshold,
+        "n_trees": compiled.n_trees,
+        "n_nodes": compiled.n_nodes
+    }
+    # meta.json is written last: its presence marks a complete export
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    # A directory can't be renamed over a non-empty one: move the old export aside first
+    retired = None
+    if os.path.exists(directory):
+        retired = staging[:-len(".tmp")] + ".old"
+        os.replace(directory, retired)
+    os.replace(staging, directory)
+    if retired:
+        shutil.rmtree(retired, ignore_errors=True)
+
+
+def load_compiled(directory: str, mmap: bool = True) -> CompiledEnsemble:
+    """Load a compiled model; arrays are memory-mapped read-only by default."""
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+        for name in NODE_ARRAYS
+    }
+    return CompiledEnsemble(arrays, meta["base_score"], meta["output"], meta["feature_names"],
+                            meta.get("source"), meta.get("zero_threshold", 0.0))
+
+
+def is_export_fresh(export_path: str, path: str) -> bool:
+    """True when an export of a model pickle exists and is not older than the pickle."""
+    return os.path.exists(export_path) and \
+        (not os.path.exists(path) or os.path.getmtime(export_path) >= os.path.getmtime(path))
+
+
+def is_compiled_fresh(path: str) -> bool:
+    """True when the compiled copy of a pickle exists and is newer than it."""
+    return is_export_fresh(os.path.join(compiled_path_for(path), "meta.json"), path)
+
+
+# ==========================================
+# VALIDATION
+# ==========================================
+def boundary_rows(compiled: CompiledEnsemble, n_rows: int, seed=0) -> np.ndarray:
+    """
+    float32 rows built from the model's own split thresholds: every cell is
+    a threshold, a neighbouring float32, 0 or NaN, so ties and missing-value
+    routing are exercised on every split feature.
+    """
+    rng = np.random.default_rng(seed)
+    rows = np.zeros((n_rows, compiled.n_features_in_), dtype=np.float32)
+    internal = np.asarray(compiled.feature) >= 0
+    features = np.asarray(compiled.feature)[internal]
+    thresholds = np.asarray(compiled.threshold)[internal]
+    for col in range(compiled.n_features_in_):
+        # Infinite thresholds (sklearn's "missing vs. present" splits) are covered by NaN
+        used = thresholds[(features == col) & np.isfinite(thresholds)]
+        split_values = np.unique(used.astype(np.float32))
+        candidates = np.concatenate([
+            split_values,
+            np.nextafter(split_values, np.float32(np.inf)),
+            np.nextafter(split_values, np.float32(-np.inf)),
+            np.array([0.0, np.nan], dtype=np.float32)
+        ])
+        rows[:, col] = rng.choice(candidates, size=n_rows)
+    return rows
+
+
+def validate(model, compiled: CompiledEnsemble, X, timings: dict = None) -> float:
+    """
+    Largest absolute difference between the two fraud probabilities.
+    If timings is given, the model_seconds / compiled_seconds spent
+    scoring X are stored in it.
+    """
+    start = time.perf_counter()
+    expected = model.predict_proba(X)[:, 1]
+    model_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = compiled.predict_proba(X)[:, 1]
+    compiled_seconds = time.perf_counter() - start
+    if timings is not None:
+        timings.update(model_seconds=model_seconds, compiled_seconds=compiled_seconds)
+    return float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+
+
+def compile_artifact(artifact, rows: int = 20_000, tolerance: float = 1e-6, seed: int = 0) -> dict:
+    """Compile one model pickle, validate it and save it next to the pickle."""
+    from utils.load_models import load_model_path
+
+    model = load_model_path(artifact.path, mmap=False, backend="pickle")
+    start = time.perf_counter()
+    compiled = compile_model(model)
+    compile_seconds = time.perf_counter() - start
+
+    timings = {}
+    max_diff = validate(model, compiled, boundary_rows(compiled, rows, seed=seed), timings)
+
+    result = {
+        "transaction_type": artifact.transaction_type,
+        "version": artifact.version,
+        "source": compiled.source,
+        "trees": compiled.n_trees,
+        "nodes": compiled.n_nodes,
+        "max_depth": compiled.max_depth,
+        "compile_seconds": round(compile_seconds, 4),
+        "max_abs_diff": max_diff,
+        "model_seconds": round(timings["model_seconds"], 4),
+        "compiled_seconds": round(timings["compiled_seconds"], 4),
+        "validated": max_diff <= tolerance
+    }
+    if result["validated"]:
+        directory = compiled_path_for(artifact.path)
+        save_compiled(compiled, directory)
+        result["path"] = directory
+    return result
+
+
+# ==========================================
+# COMMAND LINE
+# ==========================================
+def export_parser(description: str, verb: str, tolerance: float) -> argparse.ArgumentParser:
+    """Arguments shared by the model export CLIs (this module and utils/onnx_backend.py)."""
+    from utils.load_models import MODEL_DIR
+
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--types', nargs='+', help=f'transaction types to {verb} (default: all found)')
+    parser.add_argument('--rows', type=int, default=20_000, help='validation rows per model')
+    parser.add_argument('--tolerance', type=float, default=tolerance, help='max allowed probability difference')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser
+
+
+def export_all(args, export, describe) -> int:
+    """
+    Run export(artifact, rows=, tolerance=, seed=) on every model pickle
+    selected by export_parser() arguments and print one line per pickle
+    (describe(result) gives the details). Returns the exit status: 1 if
+    any export failed validation.
+    """
+    from utils.load_models import discover_artifacts
+
+    failed = 0
+    for transaction_type, artifacts in sorted(discover_artifacts(args.model_dir).items()):
+        if args.types and transaction_type not in args.types:
+            continue
+        for artifact in artifacts:
+            name = os.path.basename(artifact.path)
+            try:
+                result = export(artifact, rows=args.rows, tolerance=args.tolerance, seed=args.seed)
+            except NotImplementedError as e:
+                print(f"- {name}: skipped ({e})")
+                continue
+            status = "✓" if result["validated"] else "✗"
+            failed += not result["validated"]
+            print(f"{status} {name}: {result['source']}, {describe(result)}, "
+                  f"max |Δp| {result['max_abs_diff']:.2e} on {args.rows} rows "
+                  + (f"-> {result['path']}" if result["validated"] else "(not saved)"))
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    args = export_parser(__doc__, "compile", 1e-6).parse_args(argv)
+    return export_all(args, compile_artifact, lambda result: (
+        f"{result['trees']} trees, depth {result['max_depth']}, "
+        f"{result['compiled_seconds'] * 1000:.1f} ms vs {result['model_seconds'] * 1000:.1f} ms"
+    ))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
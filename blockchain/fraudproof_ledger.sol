@@ -12,6 +12,12 @@ contract FraudProofLedger {
 
     FraudRecord[] public records;
 
+    // The backend account that deployed the ledger; the only one allowed to anchor batches
+    address public immutable owner;
+
+    // Batch mode: Merkle root of a batch of decisions => block timestamp it was anchored at
+    mapping(bytes32 => uint256) public anchoredRoots;
+
     event FraudLogged(
         bytes32 transactionHash,
         uint256 fraudScore,
@@ -19,6 +25,16 @@ contract FraudProofLedger {
         uint256 timestamp
     );
 
+    event BatchAnchored(
+        bytes32 merkleRoot,
+        uint256 batchSize,
+        uint256 timestamp
+    );
+
+    constructor() {
+        owner = msg.sender;
+    }
+
     function logFraud(
         bytes32 _transactionHash,
         uint256 _fraudScore,
@@ -44,4 +60,44 @@ contract FraudProofLedger {
     function getRecordsCount() public view returns (uint256) {
         return records.length;
     }
+
+    // Commit a whole batch of decisions with one fixed-size write.
+    // Leaves are keccak256(recordHash), recordHash being
+    // keccak256(abi.encodePacked(transactionHash, fraudScore, modelVersion)).
+    // Owner only, so nobody can front-run the backend's root and make its anchor revert.
+    function anchorBatch(
+        bytes32 _merkleRoot,
+        uint256 _batchSize
+    ) public {
+        require(msg.sender == owner, "Only owner can anchor");
+        require(anchoredRoots[_merkleRoot] == 0, "Root already anchored");
+        anchoredRoots[_merkleRoot] = block.timestamp;
+
+        emit BatchAnchored(
+            _merkleRoot,
+            _batchSize,
+            block.timestamp
+        );
+    }
+
+    // Check a decision against an anchored root (sibling pairs hashed in sorted order).
+    // Takes the record hash and hashes it into the leaf here, so an internal
+    // node of the tree can't be presented as a leaf.
+    function verifyInclusion(
+        bytes32 _recordHash,
+        bytes32[] calldata _proof,
+        bytes32 _merkleRoot
+    ) public view returns (bool) {
+        if (anchoredRoots[_merkleRoot] == 0) {
+            return false;
+        }
+        bytes32 computed = keccak256(abi.encodePacked(_recordHash));
+        for (uint256 i = 0; i < _proof.length; i++) {
+            bytes32 sibling = _proof[i];
+            computed = computed <= sibling
+                ? keccak256(abi.encodePacked(computed, sibling))
+                : keccak256(abi.encodePacked(sibling, computed));
+        }
+        return computed == _merkleRoot;
+    }
 }
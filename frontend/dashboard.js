@@ -78,36 +78,32 @@ let trafficChart = new Chart(ctx, {
 
 async function fetchDashboardData() {
   try {
-    // FIX: Point to the specific /stats endpoint
-    const response = await fetch(`${API_BASE_URL}/stats/`);
+    // Histogram comes from the aggregate endpoint; the feed only needs
+    // the newest page of records
+    const [summaryResponse, recordsResponse] = await Promise.all([
+      fetch(`${API_BASE_URL}/stats/summary`),
+      fetch(`${API_BASE_URL}/stats/?limit=10`),
+    ]);
 
-    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+    if (!summaryResponse.ok) throw new Error(`HTTP error! status: ${summaryResponse.status}`);
+    if (!recordsResponse.ok) throw new Error(`HTTP error! status: ${recordsResponse.status}`);
 
-    const data = await response.json();
-    let records = data.records || [];
+    const summary = await summaryResponse.json();
+    const data = await recordsResponse.json();
 
-    records.reverse();
-    updateChartData(records);
+    currentHistogram = summary.histogram || Array(10).fill(0);
+    currentRecords = data.records || [];
+    updateChartData(currentHistogram);
 
-    updateLiveFeed(records);
+    updateLiveFeed(currentRecords);
   } catch (error) {
     console.error("Failed to fetch dashboard data:", error);
   }
 }
 
-function updateChartData(records) {
-  // Initialize 10 bins with 0
-  const bins = Array(10).fill(0);
-  
-
-  records.forEach((record) => {
-    // Ensure score is within 0-100
-    const score = Math.max(0, Math.min(record.fraud_score, 100));
-
-    // Calculate index: Score 85 -> index 8. Score 100 -> index 9.
-    const binIndex = score === 100 ? 9 : Math.floor(score / 10);
-    bins[binIndex]++;
-  });
+function updateChartData(histogram) {
+  // 10 bins of counts: 0-9, 10-19, ..., 90-100
+  const bins = Array(10).fill(0).map((_, index) => histogram[index] || 0);
 
   const backgroundColors = bins.map((_, index) => {
     const lower = index * 10;
@@ -196,11 +192,66 @@ function getTimeAgo(dateString) {
   return Math.floor(seconds) + "s ago";
 }
 
+// ============= Live updates (Server-Sent Events) =============
+
+// Current state, patched in place by stream events
+let currentHistogram = Array(10).fill(0);
+let currentRecords = [];
+let snapshotLastId = 0;
+let pollTimer = null;
+
+function applySnapshot(snapshot) {
+  currentHistogram = (snapshot.summary && snapshot.summary.histogram) || Array(10).fill(0);
+  currentRecords = snapshot.records || [];
+  snapshotLastId = snapshot.last_id || 0;
+  updateChartData(currentHistogram);
+  updateLiveFeed(currentRecords);
+}
+
+function applyCreated(event) {
+  // Already counted by the snapshot, or delivered twice
+  if (event.record.id <= snapshotLastId) return;
+  if (currentRecords.some((r) => r.id === event.record.id)) return;
+  const delta = event.summary_delta;
+  if (delta) {
+    currentHistogram[delta.histogram_bin] = (currentHistogram[delta.histogram_bin] || 0) + 1;
+    updateChartData(currentHistogram);
+  }
+  currentRecords = [event.record, ...currentRecords].slice(0, 10);
+  updateLiveFeed(currentRecords);
+}
+
+function applyUpdated(event) {
+  const index = currentRecords.findIndex((r) => r.id === event.record.id);
+  if (index === -1) return;
+  currentRecords[index] = event.record;
+  updateLiveFeed(currentRecords);
+}
+
+// Fallback for browsers without EventSource: poll every 5 seconds
+function startPolling() {
+  if (pollTimer) return;
+  fetchDashboardData();
+  pollTimer = setInterval(fetchDashboardData, 5000);
+}
+
+function connectStream() {
+  if (!window.EventSource) {
+    startPolling();
+    return;
+  }
+
+  // The browser reconnects on its own; every (re)connect starts with a snapshot
+  const source = new EventSource(`${API_BASE_URL}/stats/stream`);
+  source.addEventListener("snapshot", (e) => applySnapshot(JSON.parse(e.data)));
+  source.addEventListener("created", (e) => applyCreated(JSON.parse(e.data)));
+  source.addEventListener("updated", (e) => applyUpdated(JSON.parse(e.data)));
+  source.addEventListener("resync", () => fetchDashboardData());
+  source.onerror = () => console.warn("Dashboard stream interrupted, reconnecting...");
+}
+
 // Initialisation
 document.addEventListener("DOMContentLoaded", () => {
   console.log("Dashboard initialized. Connecting to:", API_BASE_URL);
-  fetchDashboardData();
-
-  // Auto-refresh every 5 seconds
-  setInterval(fetchDashboardData, 5000);
+  connectStream();
 });
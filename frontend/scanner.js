@@ -135,6 +135,11 @@ function renderResults(result) {
     if (result.blockchain_tx) {
         proofHash.innerText = result.blockchain_tx;
         proofHash.style.color = "#4ade80"; // Green for success
+    } else if (result.blockchain_status === "pending" && result.database_id) {
+        // Chain writes run in the background; poll until the worker sends it
+        proofHash.innerText = "Pending blockchain write...";
+        proofHash.style.color = "#facc15"; // Yellow while queued
+        pollChainStatus(result.database_id);
     } else {
         proofHash.innerText = "Failed to write to chain (Check Backend Logs)";
         proofHash.style.color = "#f87171"; // Red for failure
@@ -146,6 +151,34 @@ function renderResults(result) {
     commitBtn.style.background = "#334155";
 }
 
+// ===============================
+// BLOCKCHAIN STATUS POLLING
+// ===============================
+async function pollChainStatus(databaseId, attempt = 0) {
+    const proofHash = document.getElementById("proofHash");
+    if (attempt > 30 || state.lastResult?.database_id !== databaseId) return;
+
+    try {
+        const response = await fetch(`${API_BASE_URL}/test/chain-status/${databaseId}`);
+        if (response.ok) {
+            const status = await response.json();
+            if (status.blockchain_tx) {
+                proofHash.innerText = status.blockchain_tx;
+                proofHash.style.color = status.status === "confirmed" ? "#4ade80" : "#facc15";
+            }
+            if (status.status === "confirmed") return;
+            if (status.status === "failed") {
+                proofHash.innerText = `Failed to write to chain: ${status.error || "unknown error"}`;
+                proofHash.style.color = "#f87171";
+                return;
+            }
+        }
+    } catch (error) {
+        console.error("Chain status error:", error);
+    }
+    setTimeout(() => pollChainStatus(databaseId, attempt + 1), 2000);
+}
+
 // ... (Spinner Styles) ...
 document.addEventListener("DOMContentLoaded", () => {
     const style = document.createElement("style");